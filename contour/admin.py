@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import MeasureFileModel
 from .models import ProbabilisticModel, DistributionModel, ParameterModel, \
     EnvironmentalContour, AdditionalContourOption, ContourPath, \
-    ExtremeEnvDesignCondition, EEDCScalar
+    ExtremeEnvDesignCondition, EEDCScalar, ComputeJob, FitCacheEntry, \
+    ContourCacheEntry
 
 
 # Register your models here.
@@ -14,4 +15,7 @@ admin.site.register(EnvironmentalContour),
 admin.site.register(AdditionalContourOption),
 admin.site.register(ContourPath),
 admin.site.register(ExtremeEnvDesignCondition),
-admin.site.register(EEDCScalar)
+admin.site.register(EEDCScalar),
+admin.site.register(ComputeJob),
+admin.site.register(FitCacheEntry),
+admin.site.register(ContourCacheEntry)
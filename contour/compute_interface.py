@@ -1,28 +1,27 @@
 """
 Interface between viroconweb and the package viroconcom.
 
-The package viroconcom handles the statistical computations and is imported
-in this module.
+The package viroconcom handles the statistical computations. It pulls in
+scipy and statsmodels, thus it is imported when it is used for the first time
+and not with this module. Like this, e.g. a web worker, which only serves
+pages, does not load it.
 """
-import pandas as pd
+import threading
+import warnings
+import numpy as np
 
+from collections import OrderedDict
+from django.db.models import Prefetch
+from . import measure_data
 from .models import MeasureFileModel, ParameterModel, DistributionModel, \
     ProbabilisticModel
-from .settings import MAX_COMPUTING_TIME
-
-from viroconcom.fitting import Fit
-from viroconcom.contours import IFormContour, HighestDensityContour
-from viroconcom.params import ConstantParam, FunctionParam
-from viroconcom.distributions import (NormalDistribution,
-                                      LognormalDistribution,
-                                      WeibullDistribution,
-                                      KernelDensityDistribution,
-                                      MultivariateDistribution)
+from .settings import MAX_COMPUTING_TIME, MUL_DIST_CACHE_SIZE
 
 
 class ComputeInterface:
     @staticmethod
-    def fit_curves(mfm_item: MeasureFileModel, fit_settings, var_number):
+    def fit_curves(mfm_item: MeasureFileModel, fit_settings, var_number,
+                   timeout=MAX_COMPUTING_TIME):
         """
         Interface to fit a probabilistic model to a measurement file with
         the viroconcom package.
@@ -36,6 +35,9 @@ class ComputeInterface:
             distribution, which should be fitted to the data, is specified.
         var_number : int,
             Number of random variables that the probabilistic model should have.
+        timeout : float, optional
+            The maximum time in seconds the fit is allowed to take.
+            Defaults to MAX_COMPUTING_TIME.
 
         Returns
         -------
@@ -43,14 +45,38 @@ class ComputeInterface:
             The fit contains the probabilistic model, which was fitted to the
             measurement data, as well as data describing how well the fit worked.
         """
-        data_path = mfm_item.measure_file.url
-        if data_path[0] == '/':
-            data_path = data_path[1:]
-        data = pd.read_csv(data_path, sep=';', header=1).as_matrix()
+        from viroconcom.fitting import Fit
+
+        # The samples are read-only, memory-mapped columns, which are not
+        # copied to lists.
+        samples = measure_data.load_columns(mfm_item, var_number)
+        dists = ComputeInterface.fit_settings_to_dists(fit_settings,
+                                                       var_number)
+        fit = Fit(samples, dists, timeout=timeout)
+        return fit
+
+    @staticmethod
+    def fit_settings_to_dists(fit_settings, var_number):
+        """
+        Converts the settings of a MeasureFileFitForm to viroconcom's format.
+
+        Parameters
+        ----------
+        fit_settings : dict,
+            The settings how the fit should be performed, e.g. the
+            distribution, which should be fitted to the data.
+        var_number : int,
+            Number of random variables that the probabilistic model should have.
+
+        Returns
+        -------
+        dists : list of dict,
+            The distributions' descriptions as they are used by
+            viroconcom.fitting.Fit. Unused parameters are set to None such
+            that equal fits lead to equal lists.
+        """
         dists = []
-        dates = []
         for i in range(0, var_number):
-            dates.append(data[:, i].tolist())
             if i == 0:
                 dists.append(
                     {'name': fit_settings['distribution_%s' % i],
@@ -95,13 +121,11 @@ class ComputeInterface:
             elif dists[i].get('name') == 'Normal' and i > 0:
                 dists[i].get('dependency')[0] = None
                 dists[i].get('functions')[0] = None
-
-        fit = Fit(dates, dists, timeout=MAX_COMPUTING_TIME)
-        return fit
+        return dists
 
     @staticmethod
     def iform(probabilistic_model: ProbabilisticModel, return_period, state_duration,
-              n_points):
+              n_points, timeout=MAX_COMPUTING_TIME):
         """
         Interface to viroconcom to compute an IFORM contour.
 
@@ -117,6 +141,9 @@ class ComputeInterface:
             in hours.
         n_points : int,
             Number of points along the contour that should be calculated.
+        timeout : float, optional
+            The maximum time in seconds the calculation is allowed to take.
+            Defaults to MAX_COMPUTING_TIME.
 
         Returns
         -------
@@ -128,18 +155,92 @@ class ComputeInterface:
             The values of the arrays are the coordinates in the corresponding
             dimension.
         """
+        from viroconcom.contours import IFormContour
+
         mul_dist = setup_mul_dist(probabilistic_model)
         contour = IFormContour(mul_var_distribution=mul_dist,
                                return_period=return_period,
                                state_duration=state_duration,
                                n_points=n_points,
-                               timeout=MAX_COMPUTING_TIME)
+                               timeout=timeout)
         contour_coordinates = contour.coordinates
         return contour_coordinates
 
+    @staticmethod
+    def iform_sweep(probabilistic_model: ProbabilisticModel, return_periods,
+                    state_duration, n_points, timeout=MAX_COMPUTING_TIME):
+        """
+        Interface to viroconcom to compute IFORM contours for several return
+        periods at once.
+
+        The multivariate distribution is built once. The contour of the first
+        return period is computed with viroconcom. The directions on the unit
+        sphere, which it sampled, are reused for all other return periods,
+        whose points are transformed to the environmental space together.
+
+        Parameters
+        ----------
+        probabilistic_model : ProbabilisticModel,
+            The probabilistic model, i.e. the joint distribution function,
+            which should be evaluated.
+        return_periods : list of float,
+            The return periods of the contours in years.
+        state_duration : float,
+            The sea state's or more general the environmental state's duration
+            in hours.
+        n_points : int,
+            Number of points along each contour that should be calculated.
+        timeout : float, optional
+            The maximum time in seconds the calculation of the first contour
+            is allowed to take. Defaults to MAX_COMPUTING_TIME.
+
+        Returns
+        -------
+        contours_coordinates : list of list of list of numpy.ndarray,
+            The coordinates of one contour per return period, each in the
+            format of iform().
+        """
+        import scipy.stats as sts
+        from viroconcom.contours import IFormContour
+
+        mul_dist = setup_mul_dist(probabilistic_model)
+        first_contour = IFormContour(mul_var_distribution=mul_dist,
+                                     return_period=return_periods[0],
+                                     state_duration=state_duration,
+                                     n_points=n_points,
+                                     timeout=timeout)
+        contours_coordinates = [first_contour.coordinates]
+        if len(return_periods) == 1:
+            return contours_coordinates
+
+        # The points of the first contour lie on a sphere with the radius
+        # beta in the standard normal space.
+        directions = first_contour.sphere_points / first_contour.beta
+        n_directions = len(directions)
+        betas = [sts.norm.ppf(1 - exceedance_probability(return_period,
+                                                         state_duration))
+                 for return_period in return_periods[1:]]
+        sphere_points = np.concatenate([beta * directions for beta in betas])
+
+        # Inverse procedure like in viroconcom: the coordinates are computed
+        # dimension by dimension since a dimension's distribution may depend
+        # on the previous dimensions.
+        data = [None] * mul_dist.n_dim
+        for i, distribution in enumerate(mul_dist.distributions):
+            data[i] = distribution.i_cdf(
+                sts.norm.cdf(sphere_points[:, i]), rv_values=data,
+                dependencies=mul_dist.dependencies[i])
+
+        for k in range(len(betas)):
+            points = slice(k * n_directions, (k + 1) * n_directions)
+            contours_coordinates.append(
+                [[np.asarray(dimension_data)[points] for dimension_data
+                  in data]])
+        return contours_coordinates
+
     @staticmethod
     def hdc(probabilistic_model: ProbabilisticModel, return_period,
-            state_duration, limits, deltas):
+            state_duration, limits, deltas, timeout=MAX_COMPUTING_TIME):
         """
         Interface to viroconcom to compute an highest density contour (HDC).
 
@@ -162,6 +263,9 @@ class ComputeInterface:
             If a single float is supplied it is used for all dimensions.
             If a list of float is supplied it has to be of the same length
             as there are dimensions in mul_var_dist.
+        timeout : float, optional
+            The maximum time in seconds the calculation is allowed to take.
+            Defaults to MAX_COMPUTING_TIME.
 
         Returns
         -------
@@ -173,16 +277,171 @@ class ComputeInterface:
             The values of the arrays are the coordinates in the corresponding
             dimension.
         """
+        from viroconcom.contours import HighestDensityContour
+
         mul_dist = setup_mul_dist(probabilistic_model)
         contour = HighestDensityContour(mul_var_distribution=mul_dist,
                                         return_period=return_period,
                                         state_duration=state_duration,
                                         limits=limits,
                                         deltas=deltas,
-                                        timeout=MAX_COMPUTING_TIME)
+                                        timeout=timeout)
         contour_coordinates = contour.coordinates
         return contour_coordinates
 
+    @staticmethod
+    def hdc_sweep(probabilistic_model: ProbabilisticModel, return_periods,
+                  state_duration, limits, deltas, timeout=MAX_COMPUTING_TIME):
+        """
+        Computes highest density contours (HDCs) for several return periods
+        at once.
+
+        Evaluating the joint probability density function on the grid is the
+        expensive part of a HDC and it does not depend on the return period.
+        Thus, the grid is evaluated and its cells are sorted by probability
+        once. Per return period, only the density level, the highest density
+        region and its boundary are computed, like in viroconcom.
+
+        Like in viroconcom, the contours are computed in a pool of one
+        process, which is given up after timeout seconds.
+
+        Parameters
+        ----------
+        probabilistic_model : ProbabilisticModel,
+            The probabilistic model, i.e. the joint distribution function,
+            which should be evaluated.
+        return_periods : list of float,
+            The return periods of the contours in years.
+        state_duration : float,
+            The sea state's or more general the environmental state's duration
+            in hours.
+        limits : list of tuple,
+            One 2-element tuple per dimension in mul_var_distribution,
+            containing min and max limits for calculation ((min, max)).
+            The smaller value is always assumed minimum.
+        deltas : list of float,
+            The grid cell size per dimension.
+        timeout : float, optional
+            The maximum time in seconds the calculation is allowed to take.
+            If None, the contours are computed in this process. Defaults to
+            MAX_COMPUTING_TIME.
+
+        Returns
+        -------
+        contours_coordinates : list of list of list of numpy.ndarray,
+            The coordinates of one contour per return period, each in the
+            format of hdc().
+
+        Raises
+        ------
+        ValueError
+            If the joint probability density function contains nan.
+        TimeoutError
+            If the calculation takes longer than timeout seconds.
+        """
+        from multiprocessing import Pool, TimeoutError
+
+        mul_dist = setup_mul_dist(probabilistic_model)
+        args = (mul_dist, return_periods, state_duration, limits, deltas)
+        if not timeout:
+            return _hdc_sweep(*args)
+        with Pool(processes=1) as pool:
+            result = pool.apply_async(_call_recording_warnings,
+                                      (_hdc_sweep, ) + args)
+            try:
+                contours_coordinates, caught_warnings = result.get(
+                    timeout=timeout)
+            except TimeoutError:
+                raise TimeoutError("The calculation takes too long. It takes "
+                                   "longer than the given value for a "
+                                   "timeout, which is '{} seconds'."
+                                   .format(timeout))
+        # The warnings, e.g. that the grid is too small, are shown like the
+        # warnings of a computation in this process.
+        for message, category in caught_warnings:
+            warnings.warn(message, category)
+        return contours_coordinates
+
+
+def _hdc_sweep(mul_dist, return_periods, state_duration, limits, deltas):
+    """
+    Computes the contours of ComputeInterface.hdc_sweep(), can be called in a
+    worker process.
+    """
+    import scipy.ndimage as ndi
+
+    sample_coords = [np.arange(min(limit), max(limit) + delta, delta)
+                     for limit, delta in zip(limits, deltas)]
+    cell_prob = mul_dist.cell_averaged_joint_pdf(sample_coords)
+    if np.isnan(cell_prob).any():
+        raise ValueError('Encountered nan in cell averaged probabilty '
+                         'joint pdf. Possibly invalid distribution '
+                         'parameters?')
+    cell_prob = cell_prob * np.prod(deltas)
+
+    # The cells sorted by descending probability and the cumulated
+    # probabilities are shared by all return periods.
+    flat_prob = np.ravel(cell_prob)
+    sort_inds = np.argsort(flat_prob, kind='mergesort')[::-1]
+    cum_sum = np.cumsum(flat_prob[sort_inds])
+
+    structure = np.ones((3, ) * cell_prob.ndim, dtype=bool)
+    contours_coordinates = []
+    for return_period in return_periods:
+        limit = 1 - exceedance_probability(return_period, state_duration)
+        if cum_sum[-1] < limit:
+            hdr = np.ones(cell_prob.shape, dtype=bool)
+            warnings.warn('A probability of 1-alpha could not be reached. '
+                          'Consider enlarging the area defined by limits '
+                          'or setting n_years to a smaller value.',
+                          RuntimeWarning, stacklevel=2)
+        else:
+            # The most probable cells, whose probabilities sum up to at
+            # most 1-alpha, form the highest density region.
+            n_cells = np.searchsorted(cum_sum, limit, side='right')
+            hdr = np.zeros(flat_prob.shape, dtype=bool)
+            hdr[sort_inds[:n_cells]] = True
+            hdr = hdr.reshape(cell_prob.shape)
+        hdc = hdr & ~ndi.binary_erosion(hdr, structure=structure)
+        labeled_array, n_modes = ndi.label(hdc, structure=structure)
+        paths = []
+        for mode in range(1, n_modes + 1):
+            path_indices = np.nonzero(labeled_array == mode)
+            paths.append([sample_coords[dim][indices] for dim, indices
+                          in enumerate(path_indices)])
+        contours_coordinates.append(paths)
+    return contours_coordinates
+
+
+def _call_recording_warnings(function, *args):
+    """
+    Calls a function in a worker process and returns its result together with
+    the warnings it raised as (message, category) tuples.
+    """
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter('always')
+        result = function(*args)
+    return result, [(str(caught_warning.message), caught_warning.category)
+                    for caught_warning in caught_warnings]
+
+def exceedance_probability(return_period, state_duration):
+    """
+    Returns the probability that an environmental state exceeds a contour.
+
+    Parameters
+    ----------
+    return_period : float,
+        The return period of the contour in years.
+    state_duration : float,
+        The environmental state's duration in hours.
+
+    Returns
+    -------
+    alpha : float,
+        The exceedance probability per environmental state.
+    """
+    return state_duration / (return_period * 365.25 * 24)
+
 
 def adjust(var):
     """
@@ -198,6 +457,12 @@ def adjust(var):
         return var
 
 
+# Per-process cache of the distributions built by setup_mul_dist(). The key
+# is (primary key, version stamp) of the probabilistic model.
+_mul_dist_cache = OrderedDict()
+_mul_dist_cache_lock = threading.Lock()
+
+
 def setup_mul_dist(probabilistic_model: ProbabilisticModel):
     """
     Generates a MultiVariateDistribution from a ProbabilisticModel.
@@ -206,6 +471,11 @@ def setup_mul_dist(probabilistic_model: ProbabilisticModel):
     computations in the viroconcom package. ProbabilisticModel objects are used
     in the viroconweb package to be saved in the data base.
 
+    Built distributions are kept in a least recently used cache, which holds
+    up to MUL_DIST_CACHE_SIZE entries. The cache key contains the model's
+    version stamp, which changes whenever one of the model's distributions or
+    parameters is changed (see signals.py).
+
     Parameters
     ----------
     probabilistic_model : ProbabilisticModel,
@@ -217,15 +487,54 @@ def setup_mul_dist(probabilistic_model: ProbabilisticModel):
         The object, which can be used in the viroconcom package.
 
     """
+    key = (probabilistic_model.pk, probabilistic_model.version)
+    with _mul_dist_cache_lock:
+        if key in _mul_dist_cache:
+            _mul_dist_cache.move_to_end(key)
+            return _mul_dist_cache[key]
+    mutivar_distribution = _build_mul_dist(probabilistic_model)
+    with _mul_dist_cache_lock:
+        _mul_dist_cache[key] = mutivar_distribution
+        while len(_mul_dist_cache) > MUL_DIST_CACHE_SIZE:
+            _mul_dist_cache.popitem(last=False)
+    return mutivar_distribution
+
+
+def forget_mul_dist(probabilistic_model_pk):
+    """
+    Removes all cached distributions of a probabilistic model.
+
+    Parameters
+    ----------
+    probabilistic_model_pk : int,
+        Primary key of the probabilistic model.
+    """
+    with _mul_dist_cache_lock:
+        for key in [key for key in _mul_dist_cache
+                    if key[0] == probabilistic_model_pk]:
+            del _mul_dist_cache[key]
+
+
+def _build_mul_dist(probabilistic_model):
+    from viroconcom.params import ConstantParam, FunctionParam
+    from viroconcom.distributions import (NormalDistribution,
+                                          LognormalDistribution,
+                                          WeibullDistribution,
+                                          KernelDensityDistribution,
+                                          MultivariateDistribution)
+
+    # The parameters of all distributions are loaded with a single query.
     distributions_model = DistributionModel.objects.filter(
-        probabilistic_model=probabilistic_model)
+        probabilistic_model=probabilistic_model).order_by('pk').prefetch_related(
+        Prefetch('parametermodel_set',
+                 queryset=ParameterModel.objects.order_by('pk')))
     distributions = []
     dependencies = []
 
     for dist in distributions_model:
         dependency = []
         parameters = []
-        parameters_model = ParameterModel.objects.filter(distribution=dist)
+        parameters_model = dist.parametermodel_set.all()
         for param in parameters_model:
             dependency.append(adjust(param.dependency))
 
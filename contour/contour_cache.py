@@ -0,0 +1,117 @@
+"""
+Cache for environmental contours, which were computed before.
+
+Computing a contour, especially a highest density contour, is expensive. The
+cache key is a canonical hash of the probabilistic model (primary key and
+version stamp), the user and the contour settings. A cache entry points to
+the environmental contour, which was computed with these inputs. On a cache
+hit its coordinates, figure and report are reused instead of calling
+viroconcom again.
+
+Since the key contains the probabilistic model's version stamp, entries of a
+changed model are not hit anymore. The cache holds at most
+settings.CONTOUR_CACHE_MAX_ENTRIES entries. If it is full, the least recently
+used entries are evicted.
+"""
+import hashlib
+import json
+
+from django.utils import timezone
+
+from .models import ComputeJob, ContourCacheEntry
+from .settings import CONTOUR_CACHE_MAX_ENTRIES
+
+
+def contour_cache_key(job):
+    """
+    Computes the cache key of a contour job.
+
+    Parameters
+    ----------
+    job : ComputeJob,
+        A job of the type ComputeJob.IFORM or ComputeJob.HDC.
+
+    Returns
+    -------
+    key : str,
+        The cache key as a hexadecimal string.
+    """
+    parameters = job.get_parameters()
+    inputs = {
+        'job_type': job.job_type,
+        'user': job.primary_user_id,
+        'probabilistic_model': job.probabilistic_model.pk,
+        'version': job.probabilistic_model.version,
+        'return_period': float(parameters['return_period']),
+        'state_duration': float(parameters['state_duration']),
+    }
+    if 'return_periods' in parameters:
+        inputs['return_periods'] = [float(return_period) for return_period
+                                    in parameters['return_periods']]
+    if job.job_type == ComputeJob.IFORM:
+        inputs['n_steps'] = int(parameters['n_steps'])
+    else:
+        inputs['limits'] = [[float(limit) for limit in limits]
+                            for limits in parameters['limits']]
+        inputs['deltas'] = [float(delta) for delta in parameters['deltas']]
+    canonical_inputs = json.dumps(inputs, sort_keys=True)
+    return hashlib.sha256(canonical_inputs.encode('utf-8')).hexdigest()
+
+
+def lookup(key):
+    """
+    Returns the cache entry of a contour.
+
+    Parameters
+    ----------
+    key : str,
+        The cache key as returned by contour_cache_key().
+
+    Returns
+    -------
+    entry : ContourCacheEntry or None,
+        The entry, which holds the environmental contour, or None if the
+        contour is not cached.
+    """
+    entry = ContourCacheEntry.objects.select_related(
+        'environmental_contour').filter(key=key).first()
+    if entry is None:
+        return None
+    ContourCacheEntry.objects.filter(pk=entry.pk).update(
+        last_used=timezone.now())
+    return entry
+
+
+def store(key, environmental_contour):
+    """
+    Adds a computed environmental contour to the cache and evicts old entries.
+
+    Parameters
+    ----------
+    key : str,
+        The cache key as returned by contour_cache_key().
+    environmental_contour : EnvironmentalContour,
+        The computed environmental contour, whose report has been created.
+    """
+    ContourCacheEntry.objects.update_or_create(
+        key=key,
+        defaults={'environmental_contour': environmental_contour,
+                  'last_used': timezone.now()})
+    evict(CONTOUR_CACHE_MAX_ENTRIES)
+
+
+def evict(max_entries):
+    """
+    Deletes the least recently used entries such that max_entries remain.
+
+    Only the cache entries are deleted, not the environmental contours.
+
+    Parameters
+    ----------
+    max_entries : int,
+        The maximum number of entries, which should remain in the cache.
+    """
+    evicted_pks = list(ContourCacheEntry.objects.order_by(
+        '-last_used', '-pk').values_list('pk', flat=True)[max_entries:])
+    if evicted_pks:
+        ContourCacheEntry.objects.filter(pk__in=evicted_pks).delete()
@@ -0,0 +1,256 @@
+"""
+Content-addressed cache for probabilistic models, which were fitted to
+measurement files.
+
+Users often fit the same measurement file with the same settings again. The
+cache key is a hash of the measurement file's content and the normalized
+distributions, which are passed to viroconcom.fitting.Fit (see
+ComputeInterface.fit_settings_to_dists()). A cache entry points to the
+probabilistic model, which was fitted first. On a cache hit this model's
+parameters and figures are copied instead of computing the fit again.
+
+The cache holds at most settings.FIT_CACHE_MAX_ENTRIES entries. If it is full,
+the least recently used entries are evicted. If a measurement file gets
+deleted, all entries based on its content are invalidated (see signals.py).
+"""
+import hashlib
+import json
+import os
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FitCacheEntry, ProbabilisticModel, DistributionModel, \
+    ParameterModel, PlottedFigure
+from .settings import FIT_CACHE_MAX_ENTRIES, MEDIA_CHUNK_SIZE
+
+
+def measure_file_hash(measure_file_model):
+    """
+    Computes the SHA-256 hash of a measurement file's content.
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file, which should be hashed.
+
+    Returns
+    -------
+    file_hash : str,
+        The hash as a hexadecimal string.
+    """
+    sha = hashlib.sha256()
+    measure_file = measure_file_model.measure_file
+    path = measure_file.storage.cached_path(measure_file.name)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(MEDIA_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def content_hash(measure_file_model):
+    """
+    Returns the stored hash of a measurement file's content.
+
+    The hash is stored when the file is uploaded (see
+    measure_data.convert_measure_file()). Files, which were uploaded before,
+    are hashed once and their hash is stored.
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file.
+
+    Returns
+    -------
+    file_hash : str,
+        The hash as a hexadecimal string.
+    """
+    if measure_file_model.content_hash is None:
+        measure_file_model.content_hash = measure_file_hash(measure_file_model)
+        measure_file_model.save(update_fields=['content_hash'])
+    return measure_file_model.content_hash
+
+
+def fit_cache_key(file_hash, dists):
+    """
+    Computes the cache key of a fit.
+
+    Parameters
+    ----------
+    file_hash : str,
+        The hash of the measurement file's content.
+    dists : list of dict,
+        The normalized distributions as returned by
+        ComputeInterface.fit_settings_to_dists().
+
+    Returns
+    -------
+    key : str,
+        The cache key as a hexadecimal string.
+    """
+    sha = hashlib.sha256()
+    sha.update(file_hash.encode('utf-8'))
+    sha.update(json.dumps(dists, sort_keys=True).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def lookup(key):
+    """
+    Returns the cached probabilistic model of a fit.
+
+    Parameters
+    ----------
+    key : str,
+        The cache key as returned by fit_cache_key().
+
+    Returns
+    -------
+    probabilistic_model : ProbabilisticModel or None,
+        The probabilistic model, which was fitted with the same file and
+        settings, or None if the fit is not cached.
+    """
+    entry = FitCacheEntry.objects.select_related(
+        'probabilistic_model').filter(key=key).first()
+    if entry is None:
+        return None
+    FitCacheEntry.objects.filter(pk=entry.pk).update(
+        last_used=timezone.now())
+    return entry.probabilistic_model
+
+
+def store(key, file_hash, probabilistic_model):
+    """
+    Adds a fitted probabilistic model to the cache and evicts old entries.
+
+    Parameters
+    ----------
+    key : str,
+        The cache key as returned by fit_cache_key().
+    file_hash : str,
+        The hash of the measurement file's content.
+    probabilistic_model : ProbabilisticModel,
+        The probabilistic model, which was fitted.
+    """
+    FitCacheEntry.objects.update_or_create(
+        key=key,
+        defaults={'file_hash': file_hash,
+                  'probabilistic_model': probabilistic_model,
+                  'last_used': timezone.now()})
+    evict(FIT_CACHE_MAX_ENTRIES)
+
+
+def evict(max_entries):
+    """
+    Deletes the least recently used entries such that max_entries remain.
+
+    Only the cache entries are deleted, not the probabilistic models.
+
+    Parameters
+    ----------
+    max_entries : int,
+        The maximum number of entries, which should remain in the cache.
+    """
+    evicted_pks = list(FitCacheEntry.objects.order_by(
+        '-last_used', '-pk').values_list('pk', flat=True)[max_entries:])
+    if evicted_pks:
+        FitCacheEntry.objects.filter(pk__in=evicted_pks).delete()
+
+
+def invalidate(file_hash):
+    """
+    Deletes all cache entries, which are based on a file's content.
+
+    Parameters
+    ----------
+    file_hash : str,
+        The hash of the measurement file's content.
+    """
+    FitCacheEntry.objects.filter(file_hash=file_hash).delete()
+
+
+def copy_fitted_prob_model(source, model_title, user, measure_file):
+    """
+    Copies a cached probabilistic model including its parameters and figures.
+
+    Parameters
+    ----------
+    source : ProbabilisticModel,
+        The cached probabilistic model.
+    model_title : str,
+        Title of the new probabilistic model.
+    user : User,
+        The user who should own the new probabilistic model.
+    measure_file : MeasureFileModel,
+        MeasureFileModel object linked to the new probabilistic model.
+
+    Returns
+    -------
+    probabilistic_model : ProbabilisticModel,
+        The copy, which has its own figures such that it can be deleted
+        independently of the cached model.
+    """
+    # signals.py imports this module, thus it is imported here.
+    from .signals import versions_in_batch, storage_bytes_in_batch
+
+    with transaction.atomic(), versions_in_batch():
+        probabilistic_model = ProbabilisticModel(
+            primary_user=user,
+            collection_name=model_title,
+            measure_file_model=measure_file)
+        probabilistic_model.save()
+        copied_dists = {}
+        copied_params = {}
+        for dist in DistributionModel.objects.filter(
+                probabilistic_model=source).order_by('pk'):
+            copied_dists[dist.pk] = DistributionModel.objects.create(
+                name=dist.name,
+                symbol=dist.symbol,
+                distribution=dist.distribution,
+                probabilistic_model=probabilistic_model)
+        for param in ParameterModel.objects.filter(
+                distribution__probabilistic_model=source).order_by('pk'):
+            copied_params[param.pk] = ParameterModel.objects.create(
+                function=param.function,
+                x0=param.x0,
+                x1=param.x1,
+                x2=param.x2,
+                dependency=param.dependency,
+                name=param.name,
+                distribution=copied_dists[param.distribution_id])
+        # Like in plot.save_fit_figures(), only the image files are saved one
+        # by one, the figures are inserted in one query.
+        plotted_figures = []
+        with storage_bytes_in_batch():
+            for figure in PlottedFigure.objects.filter(
+                    probabilistic_model=source).order_by('pk'):
+                plotted_figure = PlottedFigure(
+                    probabilistic_model=probabilistic_model,
+                    distribution_model=copied_dists.get(
+                        figure.distribution_model_id),
+                    parameter_model=copied_params.get(
+                        figure.parameter_model_id),
+                    role=figure.role)
+                figure.image.open('rb')
+                try:
+                    content_file = ContentFile(figure.image.read())
+                finally:
+                    figure.image.close()
+                plotted_figure.image.save(
+                    original_file_name(figure.image.name), content_file,
+                    save=False)
+                plotted_figures.append(plotted_figure)
+        PlottedFigure.objects.bulk_create(plotted_figures)
+    return probabilistic_model
+
+
+def original_file_name(path):
+    """
+    Returns the file name, which was used to save a media file.
+
+    media_directory_path() prefixes the name with a time stamp and a random
+    hash, e.g. '2018-04-18-10-04_jx7Hs8Sd_fit_01_00_02.png'. The prefix is
+    removed such that a copied file gets a fresh one.
+    """
+    return os.path.basename(path).split('_', 2)[-1]
@@ -4,6 +4,7 @@ Forms to handle user input.
 from django.forms import ModelForm
 from django import forms
 from .models import MeasureFileModel
+from .settings import MAX_RETURN_PERIODS
 from .validators import validate_csv_upload
 
 # For subscript text
@@ -293,6 +294,38 @@ class VariableNumber(forms.Form):
         label='Number of environmental variables')
 
 
+class ReturnPeriodsField(forms.CharField):
+    """
+    Return periods in years separated by commas, e.g. '10, 50, 100'.
+
+    The cleaned value is a list of floats, which is empty if no return period
+    was entered.
+    """
+    def to_python(self, value):
+        value = super(ReturnPeriodsField, self).to_python(value)
+        return_periods = []
+        for item in value.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                return_period = float(item)
+            except ValueError:
+                raise forms.ValidationError(
+                    "'%(value)s' is not a number.", code='invalid',
+                    params={'value': item})
+            if not 0.01 <= return_period <= 10000:
+                raise forms.ValidationError(
+                    'Return periods must be between 0.01 and 10000 years.',
+                    code='invalid')
+            return_periods.append(return_period)
+        if len(return_periods) >= MAX_RETURN_PERIODS:
+            raise forms.ValidationError(
+                'At most %(max)s return periods can be computed together.',
+                code='invalid', params={'max': MAX_RETURN_PERIODS})
+        return return_periods
+
+
 class HDCForm(forms.Form):
     def __init__(self, var_names, *args, **kwargs):
         super(HDCForm, self).__init__(*args, **kwargs)
@@ -335,6 +368,10 @@ class HDCForm(forms.Form):
         widget=forms.NumberInput(
             attrs={'value': '1.0',
                    'class': 'contour_input_field'}))
+    further_return_periods = ReturnPeriodsField(
+        label='Further return periods [years], e.g. 10, 50, 100',
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'contour_input_field'}))
     sea_state = forms.DecimalField(
         label='Environmental state duration [hours]',
         required=True,
@@ -357,6 +394,10 @@ class IFormForm(forms.Form):
         widget=forms.NumberInput(
             attrs={'value': '1.0',
                    'class': 'contour_input_field'}))
+    further_return_periods = ReturnPeriodsField(
+        label='Further return periods [years], e.g. 10, 50, 100',
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'contour_input_field'}))
     sea_state = forms.DecimalField(
         label='Environmental state duration [hours]',
         required=True,
@@ -0,0 +1,856 @@
+"""
+Runs computations, e.g. environmental contours, as background jobs.
+
+A job is represented by a ComputeJob object in the data base. The view, which
+receives the user's request, creates the job and submits it. Worker processes,
+which are started with 'python manage.py run_compute_workers', claim pending
+jobs and run them. If settings.RUN_JOBS_IN_BACKGROUND is False, a submitted
+job is run directly instead.
+
+A job runs through stages (see ComputeJob.stages()), e.g. a fit is computed,
+then saved and finally its figures are rendered. The current stage is saved
+such that the job's page can show the progress. Each stage is timed on its own.
+
+The worker processes are forked after viroconcom, scipy and matplotlib have
+been imported. Since a computation only stops itself at its timeout, the pool
+kills a worker, whose job runs longer than settings.MAX_JOB_WALL_CLOCK_TIME,
+and replaces it. Jobs, which were left running, e.g. since the pool was
+restarted during a deploy, are marked as failed when the pool starts.
+"""
+import importlib
+import json
+import os
+import signal
+import time
+import warnings
+
+from contextlib import contextmanager
+from multiprocessing import Process, Value
+from django.db import connections, close_old_connections, transaction
+from django.utils import timezone
+
+from . import plot
+from . import fit_cache
+from . import contour_cache
+from .models import ComputeJob, EnvironmentalContour, ContourPath, \
+    ExtremeEnvDesignCondition, EEDCScalar, AdditionalContourOption, \
+    ProbabilisticModel, DistributionModel, ParameterModel
+from .compute_interface import ComputeInterface
+from .signals import versions_in_batch
+from .validators import validate_contour_coordinates
+from .settings import PATH_MEDIA, PATH_USER_GENERATED, MAX_COMPUTING_TIME, \
+    MAX_JOB_COMPUTING_TIME, MAX_JOB_WALL_CLOCK_TIME, RUN_JOBS_IN_BACKGROUND, \
+    JOB_POLLING_INTERVAL, DO_SAVE_CONTOUR_COORDINATES_IN_DB, \
+    SAVE_CONTOUR_COORDINATES_IN_BULK, CONTOUR_COORDINATES_BATCH_SIZE
+
+# Modules, which the worker pool imports before it starts its workers.
+WARM_UP_MODULES = ['viroconcom.fitting', 'viroconcom.contours',
+                   'viroconcom.distributions', 'scipy.stats', 'pandas',
+                   'contour.plot_generic', 'descartes', 'mpl_toolkits.mplot3d']
+# Time in seconds a terminated worker gets to exit before it is killed with
+# SIGKILL.
+WORKER_TERMINATION_TIMEOUT = 5.0
+INTERRUPTED_JOB_MSG = 'The job was interrupted since the worker processes ' \
+                      'were restarted. Please submit it again.'
+
+
+def submit_job(job):
+    """
+    Saves a job such that a worker process can pick it up.
+
+    If settings.RUN_JOBS_IN_BACKGROUND is False, the job is run directly.
+
+    Parameters
+    ----------
+    job : ComputeJob,
+        The job, which should be run. Its status must be ComputeJob.PENDING.
+
+    Returns
+    -------
+    job : ComputeJob,
+        The submitted job.
+    """
+    job.save()
+    if not RUN_JOBS_IN_BACKGROUND and claim_job(job.pk):
+        job.refresh_from_db()
+        run_job(job)
+    return job
+
+
+def claim_job(pk):
+    """
+    Marks a pending job as running.
+
+    The status is changed with a single conditional UPDATE such that only one
+    worker can claim a job, even if multiple workers try it at the same time.
+
+    Parameters
+    ----------
+    pk : int,
+        Primary key of the job.
+
+    Returns
+    -------
+    is_claimed : bool,
+        True if the job was claimed, False if another worker was faster.
+    """
+    n_updated = ComputeJob.objects.filter(
+        pk=pk, status=ComputeJob.PENDING).update(status=ComputeJob.RUNNING,
+                                                 started=timezone.now())
+    return n_updated == 1
+
+
+def claim_next_job(current_job=None, job_started=None):
+    """
+    Claims the oldest pending job.
+
+    Parameters
+    ----------
+    current_job : multiprocessing.Value, optional
+        Is set to the primary key of a job before the job is claimed and to 0
+        if no job was claimed. Like this, the worker pool knows the job of a
+        worker, which dies right after it claimed the job.
+    job_started : multiprocessing.Value, optional
+        Is set to the time.monotonic() time before a job is claimed.
+
+    Returns
+    -------
+    job : ComputeJob or None,
+        The claimed job or None if no job is pending.
+    """
+    pending_pks = ComputeJob.objects.filter(
+        status=ComputeJob.PENDING).order_by('created', 'pk').values_list(
+        'pk', flat=True)
+    for pk in pending_pks[:10]:
+        if current_job is not None:
+            job_started.value = time.monotonic()
+            current_job.value = pk
+        if claim_job(pk):
+            return ComputeJob.objects.get(pk=pk)
+    if current_job is not None:
+        current_job.value = 0
+    return None
+
+
+def run_job(job):
+    """
+    Runs a claimed job and saves its result or the error that occured.
+
+    Parameters
+    ----------
+    job : ComputeJob,
+        The job, which should be run. Its status must be ComputeJob.RUNNING.
+    """
+    job_function = JOB_FUNCTIONS[job.job_type]
+    # The warnings, e.g. that a HDC's grid is too small, are shown on the
+    # job's page.
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter('always')
+        try:
+            job_function(job)
+        except Exception as err:
+            job.status = ComputeJob.FAILED
+            job.error_message = str(err)
+        else:
+            job.status = ComputeJob.DONE
+    warning_messages = []
+    for caught_warning in caught_warnings:
+        message = str(caught_warning.message)
+        if message not in warning_messages:
+            warning_messages.append(message)
+    job.warning_messages = json.dumps(warning_messages)
+    job.finished = timezone.now()
+    job.save()
+
+
+def cancel_job(pk, error_message):
+    """
+    Marks a running job as failed, e.g. if its worker process was killed.
+
+    Parameters
+    ----------
+    pk : int,
+        Primary key of the job.
+    error_message : str,
+        Why the job was cancelled.
+
+    Returns
+    -------
+    is_cancelled : bool,
+        True if the job was cancelled, False if it was not running anymore.
+    """
+    n_updated = ComputeJob.objects.filter(
+        pk=pk, status=ComputeJob.RUNNING).update(status=ComputeJob.FAILED,
+                                                 error_message=error_message,
+                                                 finished=timezone.now())
+    return n_updated == 1
+
+
+def fail_interrupted_jobs():
+    """
+    Marks all running jobs as failed.
+
+    The worker pool calls this function before it starts its workers. Jobs,
+    which are still running then, were interrupted, e.g. since the pool was
+    restarted during a deploy. Only one worker pool must run at a time.
+
+    Returns
+    -------
+    n_failed : int,
+        Number of jobs, which were marked as failed.
+    """
+    return ComputeJob.objects.filter(status=ComputeJob.RUNNING).update(
+        status=ComputeJob.FAILED, error_message=INTERRUPTED_JOB_MSG,
+        finished=timezone.now())
+
+
+def warm_up():
+    """
+    Imports the packages, which jobs need to compute and to plot.
+
+    The worker pool calls this function before it starts its workers such
+    that they inherit the imported packages and their first job does not pay
+    for importing them.
+    """
+    for module_name in WARM_UP_MODULES:
+        importlib.import_module(module_name)
+    plot.pyplot()
+
+
+def run_worker(polling_interval=JOB_POLLING_INTERVAL, current_job=None,
+               job_started=None):
+    """
+    Runs pending jobs one after another until the process gets terminated.
+
+    The worker starts its own process group such that the worker pool can
+    kill it together with the processes it started, e.g. viroconcom's pool of
+    processes or the processes, which render figures.
+
+    Parameters
+    ----------
+    polling_interval : float, optional
+        Time in seconds to wait before checking for pending jobs again if
+        no job is pending.
+    current_job : multiprocessing.Value, optional
+        Is set to the primary key of the running job and to 0 if no job is
+        running such that the worker pool can cancel jobs, which run too long.
+    job_started : multiprocessing.Value, optional
+        Is set to the time.monotonic() time when the running job started.
+    """
+    os.setsid()
+    plot.enable_parallel_rendering()
+    while True:
+        close_old_connections()
+        job = claim_next_job(current_job, job_started)
+        if job is None:
+            time.sleep(polling_interval)
+            continue
+        try:
+            run_job(job)
+        finally:
+            if current_job is not None:
+                current_job.value = 0
+
+
+class WorkerProcess:
+    """
+    A worker process of the pool and the job, which it runs.
+
+    Attributes
+    ----------
+    process : multiprocessing.Process,
+        The worker process, which runs run_worker().
+    current_job : multiprocessing.Value,
+        Primary key of the running job or 0 if no job is running.
+    job_started : multiprocessing.Value,
+        The time.monotonic() time when the running job started.
+    """
+    def __init__(self, polling_interval):
+        self.current_job = Value('i', 0)
+        self.job_started = Value('d', 0.0)
+        self.process = Process(target=run_worker,
+                               args=(polling_interval, self.current_job,
+                                     self.job_started))
+
+    def start(self):
+        # The worker process must not share the parent's data base
+        # connection.
+        connections.close_all()
+        self.process.start()
+        return self
+
+    def running_time(self):
+        """
+        Returns the time in seconds the current job runs or None if the
+        worker is idle.
+        """
+        if self.current_job.value == 0:
+            return None
+        return time.monotonic() - self.job_started.value
+
+    def send_signal(self, signum):
+        """
+        Sends a signal to the worker process and to the processes it started.
+
+        The worker's process group has the worker's process id (see
+        run_worker()).
+        """
+        try:
+            os.killpg(self.process.pid, signum)
+        except ProcessLookupError:
+            # The worker has not started its process group yet or the group
+            # has no processes anymore.
+            if self.process.is_alive():
+                os.kill(self.process.pid, signum)
+
+    def kill(self):
+        """
+        Stops the worker process and the processes it started, even if they
+        run a computation, which does not react to signals.
+        """
+        self.send_signal(signal.SIGTERM)
+        self.process.join(WORKER_TERMINATION_TIMEOUT)
+        if self.process.is_alive():
+            self.send_signal(signal.SIGKILL)
+            self.process.join()
+        # Processes, which the worker started, might have outlived it.
+        self.send_signal(signal.SIGKILL)
+
+
+def supervise_workers(workers, polling_interval,
+                      max_time=MAX_JOB_WALL_CLOCK_TIME):
+    """
+    Kills workers, whose job runs longer than max_time, and replaces them as
+    well as workers, which died.
+
+    A killed worker's job is marked as failed. The processes, which a killed
+    or dead worker started, are killed as well.
+
+    Parameters
+    ----------
+    workers : list of WorkerProcess,
+        The workers of the pool. Replaced workers are replaced in the list.
+    polling_interval : float,
+        Passed to the started workers, see run_worker().
+    max_time : float, optional
+        Maximum wall-clock time in seconds of a job.
+    """
+    for i, worker in enumerate(workers):
+        running_time = worker.running_time()
+        if running_time is not None and running_time > max_time:
+            job_pk = worker.current_job.value
+            worker.kill()
+            cancel_job(job_pk, 'The job was cancelled since it ran longer '
+                               'than {:.0f} s.'.format(max_time))
+        elif worker.process.is_alive():
+            continue
+        else:
+            # Processes, which the dead worker started, might still run.
+            worker.send_signal(signal.SIGKILL)
+            job_pk = worker.current_job.value
+            # The worker may have died while it tried to claim a job, which
+            # another worker claimed.
+            if job_pk != 0 and not any(
+                    other.current_job.value == job_pk
+                    and other.process.is_alive() for other in workers):
+                cancel_job(job_pk,
+                           'The worker process, which ran the job, died.')
+        workers[i] = WorkerProcess(polling_interval).start()
+
+
+def run_worker_pool(number_of_workers, polling_interval=JOB_POLLING_INTERVAL):
+    """
+    Starts a pool of worker processes, which run the pending jobs.
+
+    The packages, which the jobs need, are imported before the workers are
+    forked such that every worker starts with them (see warm_up()). Jobs,
+    which run longer than MAX_JOB_WALL_CLOCK_TIME, are cancelled by killing
+    their worker. Killed workers and workers that died are replaced. Jobs,
+    which a previous pool left running, are marked as failed.
+
+    Parameters
+    ----------
+    number_of_workers : int,
+        Number of worker processes, i.e. number of jobs that can run at the
+        same time.
+    polling_interval : float, optional
+        Time in seconds to wait before checking for pending jobs again if
+        no job is pending.
+    """
+    warm_up()
+    fail_interrupted_jobs()
+    workers = [WorkerProcess(polling_interval).start()
+               for _ in range(number_of_workers)]
+    try:
+        while True:
+            supervise_workers(workers, polling_interval)
+            time.sleep(polling_interval)
+    finally:
+        for worker in workers:
+            worker.send_signal(signal.SIGTERM)
+        for worker in workers:
+            worker.kill()
+
+
+def computing_time():
+    """
+    Returns the maximum time in seconds a computation is allowed to take.
+    """
+    if RUN_JOBS_IN_BACKGROUND:
+        return MAX_JOB_COMPUTING_TIME
+    else:
+        return MAX_COMPUTING_TIME
+
+
+@contextmanager
+def job_stage(job, stage):
+    """
+    Marks the job to be in the given stage and measures the stage's duration.
+
+    Parameters
+    ----------
+    job : ComputeJob,
+        The running job.
+    stage : str,
+        Name of the stage, must be one of job.stages().
+    """
+    job.stage = stage
+    job.save(update_fields=['stage'])
+    start_time = time.time()
+    yield
+    stage_timings = job.get_stage_timings()
+    stage_timings[stage] = round(time.time() - start_time, 3)
+    job.stage_timings = json.dumps(stage_timings)
+    job.save(update_fields=['stage_timings'])
+
+
+def compute_contour(job):
+    """
+    Computes an environmental contour, saves it and creates its report.
+
+    If the same contour was computed before, the cached contour, including
+    its figure and report, is reused (see contour_cache.py).
+
+    Parameters
+    ----------
+    job : ComputeJob,
+        A job of the type ComputeJob.IFORM or ComputeJob.HDC. Its parameters
+        contain the contour settings.
+    """
+    cache_key = contour_cache.contour_cache_key(job)
+    cache_entry = contour_cache.lookup(cache_key)
+    if cache_entry is not None:
+        reuse_cached_contour(job, cache_entry)
+        return
+
+    parameters = job.get_parameters()
+    probabilistic_model = job.probabilistic_model
+    return_period = parameters['return_period']
+    state_duration = parameters['state_duration']
+    # Only set if the contour is computed for several return periods at once.
+    return_periods = parameters.get('return_periods')
+    path_return_periods = None
+    additional_options = []
+    with job_stage(job, 'compute'):
+        if job.job_type == ComputeJob.IFORM:
+            if return_periods:
+                contours_coordinates = ComputeInterface.iform_sweep(
+                    probabilistic_model, return_periods, state_duration,
+                    parameters['n_steps'], timeout=computing_time())
+                contour_coordinates, path_return_periods = join_contours(
+                    contours_coordinates, return_periods)
+            else:
+                contour_coordinates = ComputeInterface.iform(
+                    probabilistic_model, return_period, state_duration,
+                    parameters['n_steps'], timeout=computing_time())
+            contour_method = "Inverse first order reliability method (IFORM)"
+            additional_options.append(("Number of points on the contour",
+                                       parameters['n_steps']))
+        else:
+            limits = [tuple(limit) for limit in parameters['limits']]
+            deltas = parameters['deltas']
+            if return_periods:
+                contours_coordinates = ComputeInterface.hdc_sweep(
+                    probabilistic_model, return_periods, state_duration,
+                    limits, deltas, timeout=computing_time())
+                contour_coordinates, path_return_periods = join_contours(
+                    contours_coordinates, return_periods)
+            else:
+                contour_coordinates = ComputeInterface.hdc(
+                    probabilistic_model, return_period, state_duration,
+                    limits, deltas, timeout=computing_time())
+            contour_method = "Highest density contour (HDC) method"
+            additional_options.append(("Limits of the grid",
+                                       " ".join(map(str, limits))))
+            additional_options.append(("Grid cell size ($\Delta x_i$)",
+                                       " ".join(map(str, deltas))))
+        validate_contour_coordinates(contour_coordinates)
+
+    with job_stage(job, 'persist'):
+        environmental_contour = EnvironmentalContour(
+            primary_user=job.primary_user,
+            fitting_method="",
+            contour_method=contour_method,
+            return_period=return_period,
+            return_periods=json.dumps(return_periods or []),
+            state_duration=state_duration,
+            probabilistic_model=probabilistic_model
+        )
+        # Save the environmental contour here that it gets a primary key.
+        environmental_contour.save()
+        additional_contour_options = []
+        for option_key, option_value in additional_options:
+            additional_contour_options.append(AdditionalContourOption(
+                option_key=option_key,
+                option_value=option_value,
+                environmental_contour=environmental_contour))
+        save_environmental_contour(environmental_contour,
+                                   additional_contour_options,
+                                   contour_coordinates,
+                                   str(job.primary_user),
+                                   path_return_periods)
+        job.environmental_contour = environmental_contour
+        job.save(update_fields=['environmental_contour'])
+
+    with job_stage(job, 'report'):
+        var_names = []
+        var_symbols = []
+        for dist in DistributionModel.objects.filter(
+                probabilistic_model=probabilistic_model):
+            var_names.append(dist.name)
+            var_symbols.append(dist.symbol)
+        plot.create_latex_report(contour_coordinates,
+                                 str(job.primary_user),
+                                 environmental_contour,
+                                 var_names,
+                                 var_symbols,
+                                 path_return_periods)
+        contour_cache.store(cache_key, environmental_contour)
+
+
+def join_contours(contours_coordinates, return_periods):
+    """
+    Joins the contours of several return periods to one contour.
+
+    Parameters
+    ----------
+    contours_coordinates : list of list of list of numpy.ndarray,
+        The coordinates of one contour per return period.
+    return_periods : list of float,
+        The return periods in years.
+
+    Returns
+    -------
+    contour_coordinates : list of list of numpy.ndarray,
+        The paths of all contours.
+    path_return_periods : list of float,
+        The return period of each path.
+    """
+    contour_coordinates = []
+    path_return_periods = []
+    for coordinates, return_period in zip(contours_coordinates,
+                                          return_periods):
+        contour_coordinates.extend(coordinates)
+        path_return_periods.extend([return_period] * len(coordinates))
+    return contour_coordinates, path_return_periods
+
+
+def reuse_cached_contour(job, cache_entry):
+    """
+    Finishes a contour job with a contour, which was computed before.
+
+    Parameters
+    ----------
+    job : ComputeJob,
+        A job of the type ComputeJob.IFORM or ComputeJob.HDC.
+    cache_entry : ContourCacheEntry,
+        The cache entry, which holds the contour that was computed with the
+        same inputs.
+    """
+    # The coordinates, the figure and the report of the cached contour
+    # already exist.
+    with job_stage(job, 'compute'):
+        pass
+    with job_stage(job, 'persist'):
+        job.environmental_contour = cache_entry.environmental_contour
+        job.save(update_fields=['environmental_contour'])
+    with job_stage(job, 'report'):
+        pass
+
+
+def fit_measure_file(job):
+    """
+    Fits a probabilistic model to a measurement file and renders the figures.
+
+    The pipeline has three stages: 'fit' computes the fit, 'persist' saves the
+    fitted probabilistic model and 'render' plots the figures, which show
+    how well the fit worked. If the fit is found in the fit cache, the cached
+    model and its figures are copied instead.
+
+    Parameters
+    ----------
+    job : ComputeJob,
+        A job of the type ComputeJob.FIT. Its parameters contain the model's
+        title, the variables' names and symbols and the fit settings.
+    """
+    parameters = job.get_parameters()
+    var_names = parameters['var_names']
+    var_symbols = parameters['var_symbols']
+    measure_file_model = job.measure_file_model
+
+    with job_stage(job, 'fit'):
+        # If the same file was fitted with the same settings before, the
+        # cached model is copied instead (see fit_cache.py).
+        file_hash = fit_cache.content_hash(measure_file_model)
+        dists = ComputeInterface.fit_settings_to_dists(
+            parameters['fit_settings'], len(var_names))
+        cache_key = fit_cache.fit_cache_key(file_hash, dists)
+        cached_model = fit_cache.lookup(cache_key)
+        if cached_model is None:
+            fit = ComputeInterface.fit_curves(
+                mfm_item=measure_file_model,
+                fit_settings=parameters['fit_settings'],
+                var_number=len(var_names),
+                timeout=computing_time())
+
+    with job_stage(job, 'persist'):
+        if cached_model is None:
+            probabilistic_model = save_fitted_prob_model(fit,
+                                                         parameters['title'],
+                                                         var_names,
+                                                         var_symbols,
+                                                         job.primary_user,
+                                                         measure_file_model)
+        else:
+            probabilistic_model = fit_cache.copy_fitted_prob_model(
+                cached_model, parameters['title'], job.primary_user,
+                measure_file_model)
+        job.probabilistic_model = probabilistic_model
+        job.save(update_fields=['probabilistic_model'])
+
+    with job_stage(job, 'render'):
+        # A copied model already has its figures.
+        if cached_model is None:
+            directory = PATH_MEDIA + PATH_USER_GENERATED + \
+                        str(job.primary_user) + '/prob_model/'
+            plot.plot_fit(fit, var_names, var_symbols, directory,
+                          probabilistic_model)
+            fit_cache.store(cache_key, file_hash, probabilistic_model)
+
+
+def save_environmental_contour(environmental_contour,
+                               additional_contour_options,
+                               contour_coordinates,
+                               user,
+                               path_return_periods=None):
+    """
+    Saves an EnvironmentalContour object and its depending models to the data
+    base.
+
+
+    Parameters
+    ----------
+    environmental_contour : EnvironmentalContour,
+        The environmental contour obect that should be saved.
+    additional_contour_options : list of AdditionalContourOption,
+        Options, whch are specific to the contour and are not general
+        environmental contour options.
+    contour_coordinates : list of list of numpy.ndarray,
+        Contains the coordinates of points on the contour.
+        The outer list contains can hold multiple contour paths if the
+        distribution is multimodal. The inner list contains multiple
+        numpy arrays of the same length, one per dimension.
+        The values of the arrays are the coordinates in the corresponding
+        dimension.
+    user : str,
+        The user who should own the environmental contour.
+    path_return_periods : list of float, optional
+        The return period of each path if the contour was computed for
+        several return periods at once.
+
+    Returns
+    -------
+
+    """
+    # Only save the object if it has not been saved yet.
+    if environmental_contour.pk is None:
+        environmental_contour.save()
+    path = PATH_MEDIA + \
+           PATH_USER_GENERATED + \
+           user + \
+           '/contour/' + str(environmental_contour.pk)
+    environmental_contour.path_of_statics = path
+    environmental_contour.save(
+        update_fields=['path_of_statics'])
+    for additional_contour_option in additional_contour_options:
+        # It is necessary to create a new AdditionalContourObject because the
+        # original object was created with an environmental contour, which has
+        # been saved yet and consequently does not have a primary key.
+        additional_contour_option_w_pk = AdditionalContourOption(
+            option_key=additional_contour_option.option_key,
+            option_value=additional_contour_option.option_value,
+            environmental_contour=environmental_contour)
+        additional_contour_option_w_pk.save()
+    for i in range(len(contour_coordinates)):
+        contour_path = ContourPath(
+            environmental_contour=environmental_contour)
+        if path_return_periods is not None:
+            contour_path.return_period = path_return_periods[i]
+        contour_path.set_coordinates(contour_coordinates[i])
+        contour_path.save()
+        # Saving every coordinate as an own row is slow since a lot of
+        # operations might be necessary. Consequenetly, this can be turned off.
+        if DO_SAVE_CONTOUR_COORDINATES_IN_DB:
+            save_contour_path_rows(contour_path, contour_coordinates[i])
+    return environmental_contour
+
+
+def save_contour_path_rows(contour_path, path_coordinates,
+                           in_bulk=SAVE_CONTOUR_COORDINATES_IN_BULK):
+    """
+    Saves the coordinates of a contour path as EEDCScalar rows.
+
+    Per dimension one ExtremeEnvDesignCondition object is saved, which holds
+    one EEDCScalar object per point. All rows are saved in one transaction.
+
+    Parameters
+    ----------
+    contour_path : ContourPath,
+        The saved contour path.
+    path_coordinates : list of numpy.ndarray,
+        One array per dimension, all of the same length.
+    in_bulk : bool, optional
+        If True, the EEDCScalar objects are inserted with bulk_create in
+        batches of CONTOUR_COORDINATES_BATCH_SIZE rows. If False, every
+        object is saved on its own, which needs one query per scalar.
+        Defaults to settings.SAVE_CONTOUR_COORDINATES_IN_BULK.
+    """
+    with transaction.atomic():
+        for dimension_coordinates in path_coordinates:
+            EEDC = ExtremeEnvDesignCondition(contour_path=contour_path)
+            EEDC.save()
+            eedc_scalars = [EEDCScalar(x=float(x), EEDC=EEDC)
+                            for x in dimension_coordinates]
+            if in_bulk:
+                EEDCScalar.objects.bulk_create(
+                    eedc_scalars, batch_size=CONTOUR_COORDINATES_BATCH_SIZE)
+            else:
+                for eedc_scalar in eedc_scalars:
+                    eedc_scalar.save()
+
+
+def save_fitted_prob_model(fit, model_title, var_names, var_symbols, user,
+                           measure_file):
+    """
+    Saves a probabilistic model which was fitted to measurement data.
+
+    Parameters
+    ----------
+    fit : Fit
+        Calculated fit results of a measurement file.
+    model_title : str
+        Title of the probabilistic model.
+    var_names : list of str
+        Names of the variables.
+    var_symbols : list of str
+        Names of the symbols of the probabilistic model's variables.
+    user : str
+        Name of a user.
+    measure_file : MeasureFileModel
+        MeasureFileModel object linked to the probabilistic model.
+
+    Returns
+    -------
+    ProbabilisticModel
+        Which was fitted to measurement data
+
+    """
+    # The model's version is renewed once, not once per parameter.
+    with versions_in_batch():
+        probabilistic_model = ProbabilisticModel(
+            primary_user=user,
+            collection_name=model_title,
+            measure_file_model=measure_file)
+        probabilistic_model.save()
+
+        for i, dist in enumerate(fit.mul_var_dist.distributions):
+            if dist.name == 'Lognormal':
+                dist_name = "Lognormal_2"
+
+                distribution_model = DistributionModel(name=var_names[i],
+                                                       symbol=var_symbols[i],
+                                                       probabilistic_model=probabilistic_model,
+                                                       distribution=dist_name)
+                distribution_model.save()
+                save_parameter(dist.shape, distribution_model,
+                               fit.mul_var_dist.dependencies[i][0], 'shape')
+                save_parameter(dist.loc, distribution_model,
+                               fit.mul_var_dist.dependencies[i][1], 'loc')
+                save_parameter(dist.mu, distribution_model,
+                               fit.mul_var_dist.dependencies[i][2], 'scale')
+            else:
+                distribution_model = DistributionModel(name=var_names[i],
+                                                       symbol=var_symbols[i],
+                                                        probabilistic_model=probabilistic_model,
+                                                       distribution=dist.name)
+                distribution_model.save()
+                save_parameter(dist.shape, distribution_model,
+                               fit.mul_var_dist.dependencies[i][0], 'shape')
+                save_parameter(dist.loc, distribution_model,
+                               fit.mul_var_dist.dependencies[i][1], 'loc')
+                save_parameter(dist.scale, distribution_model,
+                               fit.mul_var_dist.dependencies[i][2], 'scale')
+
+    return probabilistic_model
+
+
+def save_parameter(parameter, distribution_model, dependency, name):
+    """
+    Saves a fitted parameter and links it to a DistributionModel.
+
+    Parameters
+    ----------
+    parameter : ConstantParam or FunctionParam
+        ConstantParam is a float value. FunctionParam contains a whole function
+        like power function or exponential.
+    distribution_model : DistributionModel
+        The parameter will be linked to this DistributionModel.
+    dependency : int
+        The dimension the dependency is based on.
+    name : str
+        Name of the parameter ('shape', 'loc' or 'scale')
+    """
+    # Imported here such that importing this module does not load viroconcom.
+    from viroconcom import params
+
+    if type(parameter) == params.ConstantParam:
+        parameter_model = ParameterModel(function='None',
+                                         x0=parameter(0),
+                                         dependency='!',
+                                         distribution=distribution_model,
+                                         name=name)
+        parameter_model.save()
+    elif type(parameter) == params.FunctionParam:
+        parameter_model = ParameterModel(function=parameter.func_name,
+                                         x0=parameter.a,
+                                         x1=parameter.b,
+                                         x2=parameter.c,
+                                         dependency=dependency,
+                                         distribution=distribution_model,
+                                         name=name)
+        parameter_model.save()
+    else:
+        parameter_model = ParameterModel(function='None',
+                                         x0=0,
+                                         dependency='!',
+                                         distribution=distribution_model,
+                                         name=name)
+        parameter_model.save()
+
+
+# Maps a job type to the function, which runs the job.
+JOB_FUNCTIONS = {
+    ComputeJob.IFORM: compute_contour,
+    ComputeJob.HDC: compute_contour,
+    ComputeJob.FIT: fit_measure_file,
+}
@@ -0,0 +1,27 @@
+"""
+Management command to store the headers of measurement files, which were
+uploaded before the headers were saved in the data base.
+"""
+from django.core.management.base import BaseCommand
+
+from contour.measure_data import store_header
+from contour.models import MeasureFileModel
+
+
+class Command(BaseCommand):
+    help = 'Stores the variable names and symbols of measurement files, ' \
+           'whose headers are missing in the data base.'
+
+    def handle(self, *args, **options):
+        n_stored = 0
+        for measure_file_model in MeasureFileModel.objects.filter(
+                var_names='[]').order_by('pk').iterator():
+            try:
+                store_header(measure_file_model)
+            except (IOError, OSError) as error:
+                self.stderr.write('Could not read the measurement file {}: '
+                                  '{}'.format(measure_file_model.pk, error))
+                continue
+            n_stored += 1
+        self.stdout.write('Stored the headers of {} measurement files.'.format(
+            n_stored))
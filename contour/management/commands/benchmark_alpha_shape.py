@@ -0,0 +1,86 @@
+"""
+Management command to compare the vectorized alpha shape with the former
+implementation, which loops over the Delaunay triangles.
+
+The points are spread around an ellipse similar to a highest density contour
+with a fine grid.
+"""
+import math
+import time
+import numpy as np
+import shapely.geometry as geometry
+
+from django.core.management.base import BaseCommand
+from scipy.spatial import Delaunay
+from shapely.ops import cascaded_union, polygonize
+
+from contour.plot_generic import alpha_shape, \
+    convert_ndarray_list_to_multipoint
+
+
+def alpha_shape_loop(points, alpha):
+    """
+    The former alpha shape implementation, kept as the benchmark's reference.
+    """
+    def add_edge(edges, edge_points, coords, i, j):
+        if (i, j) in edges or (j, i) in edges:
+            return
+        edges.add((i, j))
+        edge_points.append(coords[[i, j]])
+    coords = np.array([point.coords[0] for point in points])
+    tri = Delaunay(coords)
+    edges = set()
+    edge_points = []
+    for ia, ib, ic in tri.simplices:
+        pa = coords[ia]
+        pb = coords[ib]
+        pc = coords[ic]
+        a = math.sqrt((pa[0]-pb[0])**2 + (pa[1]-pb[1])**2)
+        b = math.sqrt((pb[0]-pc[0])**2 + (pb[1]-pc[1])**2)
+        c = math.sqrt((pc[0]-pa[0])**2 + (pc[1]-pa[1])**2)
+        s = (a + b + c)/2.0
+        area = math.sqrt(s*(s-a)*(s-b)*(s-c))
+        circum_r = a*b*c/(4.0*area)
+        if circum_r < 1.0/alpha:
+            add_edge(edges, edge_points, coords, ia, ib)
+            add_edge(edges, edge_points, coords, ib, ic)
+            add_edge(edges, edge_points, coords, ic, ia)
+    m = geometry.MultiLineString(edge_points)
+    triangles = list(polygonize(m))
+    return cascaded_union(triangles), edge_points
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the alpha shape, which is used to plot contours.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=10000,
+                            help='Number of points on the contour.')
+        parser.add_argument('--alpha', type=float, default=0.1,
+                            help='Alpha value as used in plot.plot_contour.')
+
+    def handle(self, *args, **options):
+        n_points = options['points']
+        alpha = options['alpha']
+        random_state = np.random.RandomState(42)
+        angles = np.linspace(0, 2 * np.pi, n_points, endpoint=False)
+        radii = 1 + 0.02 * random_state.randn(n_points)
+        contour_path = [6 + 5 * radii * np.cos(angles),
+                        12 + 8 * radii * np.sin(angles)]
+
+        start_time = time.perf_counter()
+        loop_hull, _ = alpha_shape_loop(
+            convert_ndarray_list_to_multipoint(contour_path), alpha)
+        loop_duration = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        vectorized_hull, _ = alpha_shape(np.column_stack(contour_path), alpha)
+        vectorized_duration = time.perf_counter() - start_time
+
+        self.stdout.write('Alpha shape of {} points:'.format(n_points))
+        self.stdout.write('      loop: {:.3f} s'.format(loop_duration))
+        self.stdout.write('vectorized: {:.3f} s'.format(vectorized_duration))
+        self.stdout.write('   speedup: {:.1f}x'.format(
+            loop_duration / vectorized_duration))
+        self.stdout.write('Area difference: {:.2e}'.format(
+            abs(loop_hull.area - vectorized_hull.area)))
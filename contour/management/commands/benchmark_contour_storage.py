@@ -0,0 +1,61 @@
+"""
+Management command to compare how fast contour coordinates are saved as
+EEDCScalar rows one by one and in bulk.
+
+The benchmark runs against the configured data base, e.g. SQLite locally and
+PostgreSQL on Heroku. All rows it creates are rolled back.
+"""
+import time
+import numpy as np
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from contour.jobs import save_contour_path_rows
+from contour.models import User, ProbabilisticModel, EnvironmentalContour, \
+    ContourPath
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks saving contour coordinates as rows one by one and ' \
+           'in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=1000,
+                            help='Number of points on the contour.')
+        parser.add_argument('--dimensions', type=int, default=4,
+                            help='Number of dimensions of the contour.')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Number of runs per mode, the fastest run '
+                                 'is reported.')
+
+    def handle(self, *args, **options):
+        path_coordinates = list(np.random.rand(options['dimensions'],
+                                               options['points']) * 10)
+        self.stdout.write('Saving {} points with {} dimensions on {}.'.format(
+            options['points'], options['dimensions'], connection.vendor))
+        for in_bulk, mode in ((False, 'one by one'), (True, 'in bulk')):
+            durations = [self.time_saving(path_coordinates, in_bulk)
+                         for _ in range(options['repeat'])]
+            self.stdout.write('{:>10}: {:.3f} s'.format(mode, min(durations)))
+
+    @staticmethod
+    def time_saving(path_coordinates, in_bulk):
+        with transaction.atomic():
+            user = User.objects.create(username='contour_storage_benchmark')
+            probabilistic_model = ProbabilisticModel.objects.create(
+                primary_user=user)
+            environmental_contour = EnvironmentalContour.objects.create(
+                primary_user=user,
+                fitting_method='',
+                contour_method='',
+                return_period=1,
+                state_duration=1,
+                probabilistic_model=probabilistic_model)
+            contour_path = ContourPath.objects.create(
+                environmental_contour=environmental_contour)
+            start_time = time.perf_counter()
+            save_contour_path_rows(contour_path, path_coordinates, in_bulk)
+            duration = time.perf_counter() - start_time
+            transaction.set_rollback(True)
+        return duration
@@ -0,0 +1,53 @@
+"""
+Management command to compare the vectorized validation of contour
+coordinates with the former validation, which checks scalar by scalar.
+"""
+import timeit
+import numpy as np
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from contour.validators import validate_contour_coordinates
+
+
+def validate_scalar_by_scalar(contour_coordinates):
+    """
+    The former validation, kept as the benchmark's reference.
+    """
+    for i in range(len(contour_coordinates)):
+        for j in range(len(contour_coordinates[i])):
+            for k in range(len(contour_coordinates[i][j])):
+                scalar = contour_coordinates[i][j][k]
+                if np.isnan(scalar) or np.isinf(scalar):
+                    raise ValidationError('Invalid contour coordinates.')
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the validation of contour coordinates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', type=int, default=2,
+                            help='Number of contour paths.')
+        parser.add_argument('--dimensions', type=int, default=3,
+                            help='Number of dimensions.')
+        parser.add_argument('--points', type=int, default=20000,
+                            help='Number of points per path.')
+
+    def handle(self, *args, **options):
+        contour_coordinates = [
+            np.random.RandomState(i).rand(options['dimensions'],
+                                          options['points'])
+            for i in range(options['paths'])]
+        vectorized = min(timeit.repeat(
+            lambda: validate_contour_coordinates(contour_coordinates),
+            number=1, repeat=5))
+        scalar_by_scalar = min(timeit.repeat(
+            lambda: validate_scalar_by_scalar(contour_coordinates),
+            number=1, repeat=1))
+        n_coordinates = options['paths'] * options['dimensions'] * \
+                        options['points']
+        self.stdout.write('Validating {} contour coordinates: {:.2f} ms '
+                          'vectorized, {:.2f} ms scalar by scalar.'.format(
+                              n_coordinates, vectorized * 1000,
+                              scalar_by_scalar * 1000))
@@ -0,0 +1,63 @@
+"""
+Management command to measure how fast and with how much memory an uploaded
+measurement file is validated and how fast a long malformed line is rejected.
+"""
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from contour.validators import validate_csv_upload, MAX_CSV_LINE_LENGTH
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the validation of a large measurement file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=float, default=99.5,
+                            help='Size of the generated file in MiB, '
+                                 'uploads must not exceed 100 MiB.')
+
+    def handle(self, *args, **options):
+        size = int(options['size'] * 1024 * 1024)
+        line = b'3.593;7.7756\n'
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            f.write(b'significant wave height [m];Hs;peak period [s];Tp\n')
+            block = line * 10000
+            while f.tell() + len(block) < size:
+                f.write(block)
+            path = f.name
+        try:
+            with open(path, 'rb') as f:
+                tracemalloc.start()
+                start_time = time.perf_counter()
+                validate_csv_upload(File(f))
+                duration = time.perf_counter() - start_time
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.stdout.write('Validated {:.1f} MiB in {:.2f} s, peak memory: '
+                              '{:.2f} MiB.'.format(os.path.getsize(path) / 2**20,
+                                                   duration,
+                                                   peak_memory / 2**20))
+        finally:
+            os.remove(path)
+
+        # A line of digits, which ends with a letter, made the former
+        # validator backtrack.
+        invalid_file = File(io.BytesIO(
+            b'significant wave height [m];Hs;peak period [s];Tp\n'
+            b'3.593;7.7756\n' + b'1' * (MAX_CSV_LINE_LENGTH - 100) + b'x\n'))
+        start_time = time.perf_counter()
+        try:
+            validate_csv_upload(invalid_file)
+        except ValidationError:
+            pass
+        duration = time.perf_counter() - start_time
+        self.stdout.write('Rejected a malformed line of {} characters in '
+                          '{:.2f} ms.'.format(MAX_CSV_LINE_LENGTH - 99,
+                                              duration * 1000))
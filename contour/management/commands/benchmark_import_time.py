@@ -0,0 +1,70 @@
+"""
+Management command to measure how long a worker needs to start, i.e. to set
+up Django and to import viroconweb's modules.
+
+Each run starts a fresh interpreter such that no module has been imported
+before. The run reports how long setting up Django, importing the module and
+rendering the first figure, which imports pyplot, took.
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Run in a fresh interpreter, prints the durations in seconds as JSON.
+IMPORT_SCRIPT = '''
+import importlib
+import json
+import os
+import sys
+import time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+start_time = time.perf_counter()
+import django
+django.setup()
+setup_time = time.perf_counter()
+importlib.import_module({module!r})
+import_time = time.perf_counter()
+pyplot_imported = 'matplotlib.pyplot' in sys.modules
+from contour import plot
+plot.figure_to_png(plot.pyplot().figure())
+figure_time = time.perf_counter()
+print(json.dumps([setup_time - start_time, import_time - setup_time,
+                  figure_time - import_time, pyplot_imported]))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measures how long setting up Django and importing a module ' \
+           'takes in a fresh interpreter.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modules', nargs='*',
+                            default=['contour.plot', 'contour.views'],
+                            help='Modules, which are imported.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of runs per module, the median is '
+                                 'reported.')
+
+    def handle(self, *args, **options):
+        for module in options['modules']:
+            runs = [self.run_import(module)
+                    for _ in range(options['repeat'])]
+            setup, import_, figure = (statistics.median(run[i] for run in runs)
+                                      for i in range(3))
+            self.stdout.write(
+                '{}: django.setup() {:.3f} s, import {:.3f} s, first figure '
+                '{:.3f} s, pyplot imported with the module: {}'.format(
+                    module, setup, import_, figure,
+                    'yes' if runs[0][3] else 'no'))
+
+    @staticmethod
+    def run_import(module):
+        script = IMPORT_SCRIPT.format(
+            settings_module=settings.SETTINGS_MODULE, module=module)
+        output = subprocess.check_output([sys.executable, '-c', script],
+                                         universal_newlines=True)
+        return json.loads(output.strip().splitlines()[-1])
@@ -0,0 +1,106 @@
+"""
+Management command to measure the peak memory, which is needed to hand a
+measurement file's samples to the fitter.
+
+The bundled one year hindcast is repeated such that it resembles a 30 year
+hindcast. Each read path runs in its own process and reports this process's
+peak resident set size (RSS):
+
+csv + lists: The csv file is parsed and each column is converted to a list,
+    which is how fit_curves() read measurement files before.
+memory-mapped: The binary columnar copy is memory-mapped and its columns are
+    handed over as they are, see measure_data.load_columns().
+"""
+import multiprocessing
+import os
+import resource
+import tempfile
+import numpy as np
+import pandas as pd
+
+from django.core.management.base import BaseCommand
+
+from contour.measure_data import parse_csv
+
+TEST_FILE = os.path.join('tests', 'test_files',
+                         '1yeardata_vanem2012pdf_withHeader.csv')
+
+
+def peak_rss():
+    """
+    Returns the peak RSS of the current process in MiB (Linux reports KiB).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def read_as_lists(csv_path, queue):
+    baseline = peak_rss()
+    data = pd.read_csv(csv_path, sep=';', header=0).values
+    samples = [data[:, i].tolist() for i in range(data.shape[1])]
+    total = sum(sum(sample) for sample in samples)
+    queue.put((baseline, peak_rss(), total))
+
+
+def read_memory_mapped(npy_path, queue):
+    baseline = peak_rss()
+    data = np.load(npy_path, mmap_mode='r', allow_pickle=False)
+    samples = [data[:, i] for i in range(data.shape[1])]
+    total = sum(float(np.sum(sample)) for sample in samples)
+    queue.put((baseline, peak_rss(), total))
+
+
+class Command(BaseCommand):
+    help = 'Measures the peak memory of reading a large measurement file ' \
+           'as lists and memory-mapped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=30,
+                            help='How often the one year hindcast is '
+                                 'repeated.')
+
+    def handle(self, *args, **options):
+        with open(TEST_FILE, 'rb') as f:
+            header = f.readline()
+            rows = f.read()
+        if not rows.endswith(b'\n'):
+            rows += b'\n'
+        directory = tempfile.mkdtemp()
+        csv_path = os.path.join(directory, 'hindcast.csv')
+        npy_path = os.path.join(directory, 'hindcast.npy')
+        try:
+            with open(csv_path, 'wb') as f:
+                f.write(header)
+                for _ in range(options['scale']):
+                    f.write(rows)
+            with open(csv_path, 'rb') as f:
+                data = parse_csv(f)[0]
+            np.save(npy_path, data, allow_pickle=False)
+            self.stdout.write('{} rows with {} variables ({:.1f} MiB csv).'
+                              .format(data.shape[0], data.shape[1],
+                                      os.path.getsize(csv_path) / 2**20))
+            del data
+            for target, path, mode in ((read_as_lists, csv_path,
+                                        'csv + lists'),
+                                       (read_memory_mapped, npy_path,
+                                        'memory-mapped')):
+                baseline, peak, _ = self.run_in_process(target, path)
+                self.stdout.write('{:>13}: peak RSS {:.1f} MiB ({:+.1f} MiB '
+                                  'above the process\'s start)'.format(
+                                      mode, peak, peak - baseline))
+        finally:
+            for path in (csv_path, npy_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            os.rmdir(directory)
+
+    @staticmethod
+    def run_in_process(target, path):
+        # A fresh interpreter per read path such that the peaks do not
+        # include memory, which this process used before.
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        process = context.Process(target=target, args=(path, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        return result
@@ -0,0 +1,32 @@
+"""
+Management command to recount the storage space of each user.
+
+The storage space is counted whenever a media file is saved or deleted (see
+signals.py). This command sums the sizes of all media files, which the
+models refer to, and corrects the counted sizes, e.g. after files were
+deleted outside of viroconweb.
+"""
+from django.core.management.base import BaseCommand
+
+from contour.models import User, MeasureFileModel, PlottedFigure, \
+    EnvironmentalContour
+from contour.signals import stored_bytes_per_user
+
+
+class Command(BaseCommand):
+    help = 'Recounts the storage space, which the media files of each user ' \
+           'occupy.'
+
+    def handle(self, *args, **options):
+        storage_bytes = stored_bytes_per_user(
+            (MeasureFileModel, PlottedFigure, EnvironmentalContour))
+        n_corrected = 0
+        for user in User.objects.only('pk', 'username', 'storage_bytes'):
+            size = storage_bytes[user.username]
+            if user.storage_bytes != size:
+                self.stdout.write('{}: {} B counted, {} B stored.'.format(
+                    user.username, user.storage_bytes, size))
+                User.objects.filter(pk=user.pk).update(storage_bytes=size)
+                n_corrected += 1
+        self.stdout.write('Corrected the storage space of {} users.'.format(
+            n_corrected))
@@ -0,0 +1,25 @@
+"""
+Management command to start the worker processes, which run background jobs.
+"""
+from django.core.management.base import BaseCommand
+
+from contour.jobs import run_worker_pool
+from contour.settings import NUMBER_OF_COMPUTE_WORKERS, JOB_POLLING_INTERVAL
+
+
+class Command(BaseCommand):
+    help = 'Starts worker processes, which run pending contour calculations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            default=NUMBER_OF_COMPUTE_WORKERS,
+                            help='Number of worker processes.')
+        parser.add_argument('--polling-interval', type=float,
+                            default=JOB_POLLING_INTERVAL,
+                            help='Seconds to wait before checking for '
+                                 'pending jobs again.')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Starting {} compute workers.'.format(
+            options['workers']))
+        run_worker_pool(options['workers'], options['polling_interval'])
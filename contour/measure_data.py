@@ -0,0 +1,238 @@
+"""
+Binary columnar copies of measurement files.
+
+Parsing a measurement file's text is slow and, if the files are stored on S3,
+every parse means another download. Thus, a measurement file is parsed once
+when it is uploaded: convert_measure_file() stores its values as a float64
+.npy file, which holds one contiguous column per variable, and its parsed
+header in the MeasureFileModel's fields var_names and var_symbols.
+load_data() memory-maps the .npy file such that readers only touch the pages,
+which they use. load_columns() hands these columns to the fitter and the plots
+without copying them, e.g. to lists, which matters for hindcasts with several
+hundred thousand rows per variable.
+
+Measurement files, which were uploaded before this conversion existed, are
+converted when they are read for the first time. Their headers can be stored
+in advance with the command backfill_measure_file_headers.
+"""
+import csv
+import io
+import json
+import numpy as np
+
+from django.core.files.base import ContentFile
+
+from .fit_cache import measure_file_hash
+from .validators import MAX_CSV_LINE_LENGTH
+
+DATA_FILE_NAME = 'data.npy'
+
+
+def parse_csv(f):
+    """
+    Parses the csv text of a measurement file.
+
+    The first line holds the variables' names and symbols, e.g.
+    'significant wave height [m];Hs;peak period [s];Tp', all other lines hold
+    the values.
+
+    Parameters
+    ----------
+    f : file,
+        The measurement file opened in binary mode.
+
+    Returns
+    -------
+    data : ndarray,
+        The values as a float64 array with the shape (n_rows, n_variables) in
+        column-major order.
+    var_names : list of str,
+        Names of the environmental variables, e.g.
+        ['wind speed [m/s]', 'significant wave height [m]']
+    var_symbols : list of str,
+        Symbols of the environmental variables, e.g. ['V', 'Hs']
+
+    Raises
+    ------
+    ValueError
+        If a value is not a number or if a line does not hold one value per
+        variable.
+    """
+    # pandas is only needed to parse uploads, thus it is imported here.
+    import pandas as pd
+
+    var_names, var_symbols = parse_header(f.readline())
+    data = pd.read_csv(f, sep=';', header=None).values
+    data = np.asfortranarray(data, dtype=np.float64)
+    if data.shape[1] != len(var_names) or np.isnan(data).any():
+        raise ValueError('Each line must hold one number per variable.')
+    return data, var_names, var_symbols
+
+
+def parse_header(header_line):
+    """
+    Parses the first line of a measurement file.
+
+    Parameters
+    ----------
+    header_line : bytes,
+        The first line of the measurement file.
+
+    Returns
+    -------
+    var_names : list of str,
+        Names of the environmental variables.
+    var_symbols : list of str,
+        Symbols of the environmental variables.
+    """
+    header_line = header_line.decode('utf-8-sig').rstrip('\r\n')
+    header = next(csv.reader([header_line], delimiter=';'))
+    return header[0::2], header[1::2]
+
+
+def parse_measure_file(measure_file_model):
+    """
+    Parses a measurement file's csv text, see parse_csv().
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file, which should be parsed.
+
+    Returns
+    -------
+    data : ndarray,
+        The values as a float64 array with the shape (n_rows, n_variables) in
+        column-major order.
+    var_names : list of str,
+        Names of the environmental variables.
+    var_symbols : list of str,
+        Symbols of the environmental variables.
+    """
+    measure_file = measure_file_model.measure_file
+    measure_file.open('rb')
+    try:
+        return parse_csv(measure_file)
+    finally:
+        measure_file.close()
+
+
+def convert_measure_file(measure_file_model):
+    """
+    Stores the binary columnar copy of a measurement file and the hash of its
+    content.
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file, which has been saved.
+    """
+    data, var_names, var_symbols = parse_measure_file(measure_file_model)
+    f = io.BytesIO()
+    np.save(f, data, allow_pickle=False)
+    measure_file_model.data_array.save(DATA_FILE_NAME,
+                                       ContentFile(f.getvalue()),
+                                       save=False)
+    measure_file_model.var_names = json.dumps(var_names)
+    measure_file_model.var_symbols = json.dumps(var_symbols)
+    measure_file_model.content_hash = measure_file_hash(measure_file_model)
+    measure_file_model.save(
+        update_fields=['data_array', 'var_names', 'var_symbols',
+                       'content_hash'])
+
+
+def load_data(measure_file_model):
+    """
+    Returns the values of a measurement file.
+
+    The values are memory-mapped. If the file is stored remotely, e.g. on S3,
+    its local copy in the media cache is memory-mapped.
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file, whose values should be loaded.
+
+    Returns
+    -------
+    data : ndarray,
+        A read-only float64 array with the shape (n_rows, n_variables). Each
+        column, data[:, i], is contiguous.
+    """
+    if not measure_file_model.data_array:
+        convert_measure_file(measure_file_model)
+    data_array = measure_file_model.data_array
+    path = data_array.storage.cached_path(data_array.name)
+    return np.load(path, mmap_mode='r', allow_pickle=False)
+
+
+def load_columns(measure_file_model, n_columns=None):
+    """
+    Returns the values of a measurement file column by column.
+
+    The columns are views of the array returned by load_data(), i.e. they
+    are read-only and memory-mapped.
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file, whose values should be loaded.
+    n_columns : int, optional
+        Number of columns, which should be returned. Defaults to all columns.
+
+    Returns
+    -------
+    columns : list of ndarray,
+        One contiguous float64 array per variable.
+    """
+    data = load_data(measure_file_model)
+    if n_columns is None:
+        n_columns = data.shape[1]
+    return [data[:, i] for i in range(n_columns)]
+
+
+def load_header(measure_file_model):
+    """
+    Returns the variables' names and symbols of a measurement file.
+
+    The header is read from the data base. Only if it has not been stored
+    yet, the file's first line is read.
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file, whose header should be loaded.
+
+    Returns
+    -------
+    var_names : list of str,
+        Names of the environmental variables, e.g.
+        ['wind speed [m/s]', 'significant wave height [m]']
+    var_symbols : list of str,
+        Symbols of the environmental variables, e.g. ['V', 'Hs']
+    """
+    var_names = measure_file_model.get_var_names()
+    if not var_names:
+        store_header(measure_file_model)
+        var_names = measure_file_model.get_var_names()
+    return var_names, measure_file_model.get_var_symbols()
+
+
+def store_header(measure_file_model):
+    """
+    Reads a measurement file's first line and stores its header.
+
+    Only the first bytes of the file are read, on S3 with a ranged request.
+
+    Parameters
+    ----------
+    measure_file_model : MeasureFileModel,
+        The measurement file, whose header should be stored.
+    """
+    measure_file = measure_file_model.measure_file
+    first_bytes = measure_file.storage.read_range(measure_file.name, 0,
+                                                  MAX_CSV_LINE_LENGTH + 2)
+    var_names, var_symbols = parse_header(first_bytes.split(b'\n', 1)[0])
+    measure_file_model.var_names = json.dumps(var_names)
+    measure_file_model.var_symbols = json.dumps(var_symbols)
+    measure_file_model.save(update_fields=['var_names', 'var_symbols'])
@@ -0,0 +1,164 @@
+"""
+Local on-disk cache for media files, which are stored on S3.
+
+Without the cache, every fit, plot and report downloads the files it needs
+from S3 again, e.g. the measurement file or the contour figure, which has
+just been uploaded. The cache keeps local copies in
+settings.MEDIA_CACHE_DIRECTORY, which all processes of a machine share:
+
+- Files, which are saved, are written to the cache as well (write-through).
+- A cached copy is only used if its ETag matches the stored object's ETag,
+  which costs a HEAD request instead of a download.
+- Downloaded copies are verified against the ETag if it is a MD5 hash of the
+  content (S3 uses other ETags for multipart uploads).
+- If the cache holds more than settings.MEDIA_CACHE_MAX_BYTES, the least
+  recently used copies are evicted.
+- If a file is deleted (see signals.delete_file()), its copy is evicted.
+"""
+import hashlib
+import os
+import tempfile
+
+from .settings import MEDIA_CACHE_DIRECTORY, MEDIA_CACHE_MAX_BYTES
+
+ETAG_SUFFIX = '.etag'
+
+
+class MediaCache:
+    """
+    A size-bounded directory of file copies, which are evicted least
+    recently used first.
+
+    Parameters
+    ----------
+    directory : str,
+        The directory, which holds the copies.
+    max_bytes : int,
+        Maximum number of bytes of all copies.
+    """
+
+    def __init__(self, directory=MEDIA_CACHE_DIRECTORY,
+                 max_bytes=MEDIA_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def entry_path(self, name):
+        """
+        Returns the path of a file's copy, which may not exist.
+
+        The copy keeps the file's extension, which e.g. latex needs to
+        include a figure.
+        """
+        key = hashlib.sha256(name.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory,
+                            key + os.path.splitext(name)[1].lower())
+
+    def lookup(self, name, etag):
+        """
+        Returns the path of a file's copy if its ETag matches, else None.
+        """
+        path = self.entry_path(name)
+        try:
+            with open(path + ETAG_SUFFIX, 'r') as f:
+                cached_etag = f.read()
+        except (IOError, OSError):
+            return None
+        if cached_etag != etag or not os.path.isfile(path):
+            return None
+        try:
+            # The modification time marks when the copy was used last.
+            os.utime(path, None)
+        except OSError:
+            return None
+        return path
+
+    def store(self, name, chunks, etag=None):
+        """
+        Writes a file's copy and evicts the least recently used copies.
+
+        Parameters
+        ----------
+        name : str,
+            Name of the file in its storage.
+        chunks : iterable of bytes,
+            The file's content.
+        etag : str, optional
+            The stored object's ETag. If it is a MD5 hash, the content is
+            verified against it. Defaults to the quoted MD5 hash of the
+            content, which S3 uses for files uploaded in one part.
+
+        Returns
+        -------
+        path : str,
+            The path of the copy.
+
+        Raises
+        ------
+        IOError
+            If the content does not match the ETag.
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+        path = self.entry_path(name)
+        md5 = hashlib.md5()
+        f = tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp',
+                                        delete=False)
+        try:
+            with f:
+                for chunk in chunks:
+                    md5.update(chunk)
+                    f.write(chunk)
+            content_etag = '"{}"'.format(md5.hexdigest())
+            if etag is None:
+                etag = content_etag
+            elif '-' not in etag and etag != content_etag:
+                raise IOError('The downloaded copy of ' + name + ' does not '
+                              'match its ETag ' + etag + '.')
+            os.replace(f.name, path)
+        except BaseException:
+            os.remove(f.name)
+            raise
+        with open(path + ETAG_SUFFIX, 'w') as etag_file:
+            etag_file.write(etag)
+        self.evict(self.max_bytes)
+        return path
+
+    def remove(self, name):
+        """
+        Removes a file's copy, e.g. if the file was deleted.
+        """
+        path = self.entry_path(name)
+        for entry_file in (path + ETAG_SUFFIX, path):
+            try:
+                os.remove(entry_file)
+            except OSError:
+                pass
+
+    def evict(self, max_bytes):
+        """
+        Removes the least recently used copies such that at most max_bytes
+        remain.
+        """
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith((ETAG_SUFFIX, '.tmp')):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+                total_bytes += stat.st_size
+        entries.sort()
+        for _, entry_name, size in entries:
+            if total_bytes <= max_bytes:
+                break
+            path = os.path.join(self.directory, entry_name)
+            for entry_file in (path + ETAG_SUFFIX, path):
+                try:
+                    os.remove(entry_file)
+                except OSError:
+                    pass
+            total_bytes -= size
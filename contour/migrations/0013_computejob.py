@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 09:12
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contour', '0012_plottedfigure_parameter_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComputeJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('iform', 'IFORM contour'), ('hdc', 'Highest density contour')], max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('parameters', models.TextField(default='{}')),
+                ('error_message', models.TextField(default=None, null=True)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started', models.DateTimeField(default=None, null=True)),
+                ('finished', models.DateTimeField(default=None, null=True)),
+                ('environmental_contour', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='contour.EnvironmentalContour')),
+                ('primary_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs_primary', to=settings.AUTH_USER_MODEL)),
+                ('probabilistic_model', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='contour.ProbabilisticModel')),
+            ],
+        ),
+    ]
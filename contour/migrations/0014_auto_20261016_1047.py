@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 10:47
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0013_computejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='computejob',
+            name='measure_file_model',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='contour.MeasureFileModel'),
+        ),
+        migrations.AddField(
+            model_name='computejob',
+            name='stage',
+            field=models.CharField(default=None, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='computejob',
+            name='stage_timings',
+            field=models.TextField(default='{}'),
+        ),
+        migrations.AlterField(
+            model_name='computejob',
+            name='job_type',
+            field=models.CharField(choices=[('iform', 'IFORM contour'), ('hdc', 'Highest density contour'), ('fit', 'Fit of a probabilistic model')], max_length=10),
+        ),
+    ]
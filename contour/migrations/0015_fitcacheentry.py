@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 11:24
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0014_auto_20261016_1047'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FitCacheEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('file_hash', models.CharField(db_index=True, max_length=64)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('probabilistic_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contour.ProbabilisticModel')),
+            ],
+        ),
+    ]
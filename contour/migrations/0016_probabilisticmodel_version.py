@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 12:03
+from __future__ import unicode_literals
+
+import contour.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0015_fitcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='probabilisticmodel',
+            name='version',
+            field=models.CharField(default=contour.models.version_stamp, max_length=32),
+        ),
+    ]
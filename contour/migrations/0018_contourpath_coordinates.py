@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 13:18
+from __future__ import unicode_literals
+
+import numpy as np
+from django.db import migrations, models
+
+
+def coordinates_to_binary(apps, schema_editor):
+    """
+    Stores the coordinates of existing contours, which were saved as
+    EEDCScalar rows, in the binary fields.
+
+    Paths without points keep coordinates=None, which
+    ContourPath.coordinates_array() handles.
+    """
+    ContourPath = apps.get_model('contour', 'ContourPath')
+    ExtremeEnvDesignCondition = apps.get_model('contour',
+                                               'ExtremeEnvDesignCondition')
+    EEDCScalar = apps.get_model('contour', 'EEDCScalar')
+
+    for contour_path in ContourPath.objects.filter(coordinates__isnull=True):
+        path_coordinates = []
+        for eedc in ExtremeEnvDesignCondition.objects.filter(
+                contour_path=contour_path).order_by('pk'):
+            path_coordinates.append([float(scalar.x) for scalar in
+                                     EEDCScalar.objects.filter(
+                                         EEDC=eedc).order_by('pk')])
+        if not path_coordinates:
+            continue
+        array = np.ascontiguousarray(path_coordinates, dtype='<f8')
+        contour_path.n_dimensions, contour_path.n_points = array.shape
+        contour_path.coordinates = array.tobytes()
+        contour_path.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0017_contourcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contourpath',
+            name='coordinates',
+            field=models.BinaryField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='contourpath',
+            name='n_dimensions',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='contourpath',
+            name='n_points',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(coordinates_to_binary,
+                             migrations.RunPython.noop),
+    ]
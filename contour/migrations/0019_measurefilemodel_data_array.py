@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 15:12
+from __future__ import unicode_literals
+
+import contour.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0018_contourpath_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurefilemodel',
+            name='data_array',
+            field=models.FileField(default=None, null=True, upload_to=contour.models.media_directory_path),
+        ),
+        migrations.AddField(
+            model_name='measurefilemodel',
+            name='data_header',
+            field=models.FileField(default=None, null=True, upload_to=contour.models.media_directory_path),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 15:47
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0019_measurefilemodel_data_array'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='measurefilemodel',
+            name='data_header',
+        ),
+        migrations.AddField(
+            model_name='measurefilemodel',
+            name='var_names',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.AddField(
+            model_name='measurefilemodel',
+            name='var_symbols',
+            field=models.TextField(default='[]'),
+        ),
+    ]
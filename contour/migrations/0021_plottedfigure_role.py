@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 17:05
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def assign_roles(apps, schema_editor):
+    """
+    Assigns the roles of existing figures.
+
+    Figures of fitted parameters are linked to a ParameterModel and the
+    images of distributions with independent parameters were named with
+    'None' instead of the parent's index.
+    """
+    PlottedFigure = apps.get_model('contour', 'PlottedFigure')
+    figures = PlottedFigure.objects.filter(role__isnull=True)
+    figures.filter(parameter_model__isnull=False).update(
+        role='param_overview')
+    figures.filter(environmental_contour__isnull=False).update(role='contour')
+    figures.filter(image__contains='None').update(role='independent')
+    figures.filter(distribution_model__isnull=False).update(role='pdf')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0020_measurefilemodel_var_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plottedfigure',
+            name='role',
+            field=models.CharField(choices=[
+                ('pdf', 'Fitted distribution in an interval'),
+                ('param_overview', 'Fit of a dependent parameter'),
+                ('independent',
+                 'Fitted distribution of independent parameters'),
+                ('contour', 'Environmental contour')],
+                db_index=True, default=None, max_length=16, null=True),
+        ),
+        migrations.RunPython(assign_roles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 18:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0021_plottedfigure_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='environmentalcontour',
+            name='return_periods',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.AddField(
+            model_name='contourpath',
+            name='return_period',
+            field=models.DecimalField(decimal_places=5, default=None,
+                                      max_digits=10, null=True),
+        ),
+    ]
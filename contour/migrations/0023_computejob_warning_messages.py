@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 23:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0022_contour_return_periods'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='computejob',
+            name='warning_messages',
+            field=models.TextField(default='[]'),
+        ),
+    ]
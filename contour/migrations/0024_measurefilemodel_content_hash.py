@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 23:55
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def copy_cached_file_hashes(apps, schema_editor):
+    """
+    Stores the content hash of measurement files, which were fitted before,
+    as the fit cache knows it already.
+
+    The fit cache's entries can then be invalidated without reading the file
+    when it is deleted. Other files are hashed when they are fitted the next
+    time.
+    """
+    MeasureFileModel = apps.get_model('contour', 'MeasureFileModel')
+    FitCacheEntry = apps.get_model('contour', 'FitCacheEntry')
+    entries = FitCacheEntry.objects.filter(
+        probabilistic_model__measure_file_model__isnull=False).values_list(
+        'probabilistic_model__measure_file_model', 'file_hash')
+    for measure_file_pk, file_hash in entries.iterator():
+        MeasureFileModel.objects.filter(pk=measure_file_pk).update(
+            content_hash=file_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contour', '0023_computejob_warning_messages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurefilemodel',
+            name='content_hash',
+            field=models.CharField(default=None, max_length=64, null=True),
+        ),
+        migrations.RunPython(copy_cached_file_hashes,
+                             migrations.RunPython.noop),
+    ]
@@ -8,8 +8,11 @@ from user.models import User
 from django.core.exceptions import ValidationError
 from . import settings
 from time import gmtime, strftime
+import json
 import random
 import string
+import uuid
+import numpy as np
 
 # Based on: https://stackoverflow.com/questions/34239877/django-save-user-
 # uploads-in-seperate-folders
@@ -85,6 +88,13 @@ def random_hash_string():
     return hash_string
 
 
+def version_stamp():
+    """
+    Returns a new random version stamp as a 32-character hex string.
+    """
+    return uuid.uuid4().hex
+
+
 class MeasureFileModel(models.Model):
     """
     Model for a file containing measurement data.
@@ -106,6 +116,24 @@ class MeasureFileModel(models.Model):
         null=True,
         default=None)
     path_of_statics = models.CharField(default=None, max_length=240, null=True)
+    # Binary columnar copy of the measurement file, see measure_data.py.
+    data_array = models.FileField(
+        upload_to=media_directory_path,
+        null=True,
+        default=None)
+    # The parsed header as JSON lists such that the file does not need to be
+    # opened to show the variables.
+    var_names = models.TextField(default='[]')
+    var_symbols = models.TextField(default='[]')
+    # SHA-256 hash of the file's content, which is part of the fit cache's
+    # keys (see fit_cache.py). It is stored when the file is uploaded.
+    content_hash = models.CharField(default=None, max_length=64, null=True)
+
+    def get_var_names(self):
+        return json.loads(self.var_names)
+
+    def get_var_symbols(self):
+        return json.loads(self.var_symbols)
 
     @staticmethod
     def url_str():
@@ -134,6 +162,10 @@ class ProbabilisticModel(models.Model):
     measure_file_model = models.ForeignKey(MeasureFileModel,
                                            on_delete=models.CASCADE,
                                            null=True)
+    # Changes whenever one of the model's distributions or parameters is
+    # changed (see signals.py). It is part of the key under which
+    # compute_interface.setup_mul_dist() caches the built distribution.
+    version = models.CharField(default=version_stamp, max_length=32)
 
     @staticmethod
     def url_str():
@@ -233,8 +265,8 @@ class EnvironmentalContour(models.Model):
     and the primary key to the probabilistic model on which it is based on.
     Additional options, which are a dictionary, have their own model
     (AdditionalContourOption) and are connected via the primary key to an
-    EnvironmentalContour instance. The contour's path (the EEDCs) are also
-    connected via two own models (Contourpath and ExtremeEnvDesignCondition).
+    EnvironmentalContour instance. The contour's paths are connected via an
+    own model (ContourPath), which stores the coordinates as binary arrays.
     """
     primary_user = models.ForeignKey(User, null=True,
                                      related_name="contours_primary")
@@ -243,6 +275,9 @@ class EnvironmentalContour(models.Model):
     fitting_method = models.CharField(default=None, max_length=240)
     contour_method = models.CharField(default=None, max_length=240)
     return_period = models.DecimalField(decimal_places=5, max_digits=10)
+    # If the contour was computed for several return periods at once, they
+    # are stored as a JSON list, e.g. '[1.0, 50.0]', else the list is empty.
+    return_periods = models.TextField(default='[]')
     state_duration = models.DecimalField(decimal_places=5, max_digits=10)
     path_of_statics = models.CharField(default=None, max_length=240, null=True)
     probabilistic_model = models.ForeignKey(ProbabilisticModel,
@@ -258,6 +293,36 @@ class EnvironmentalContour(models.Model):
         default=None
     )
 
+    def contour_coordinates(self):
+        """
+        Loads the contour's coordinates with a single query.
+
+        Returns
+        -------
+        contour_coordinates : list of list of numpy.ndarray,
+            The contour's coordinates. The arrays are read-only views on the
+            stored bytes. The format is defined in viroconcom.contours.Contour.
+        """
+        return [list(contour_path.coordinates_array()) for contour_path
+                in self.contourpath_set.order_by('pk')]
+
+    def get_return_periods(self):
+        """
+        Returns the return periods in years, for which the contour was
+        computed.
+        """
+        return_periods = json.loads(self.return_periods)
+        if not return_periods:
+            return_periods = [float(self.return_period)]
+        return return_periods
+
+    def return_periods_label(self):
+        """
+        Returns the return periods as a string, e.g. '1, 10, 50'.
+        """
+        return ', '.join('{:g}'.format(return_period) for return_period
+                         in self.get_return_periods())
+
     def path_of_latex_report(self):
         if self.path_of_statics.startswith(settings.PATH_MEDIA):
             path = self.path_of_statics[settings.PATH_MEDIA.__len__():]
@@ -297,11 +362,53 @@ class ContourPath(models.Model):
     One or multiple ContourPath instances can be associated to an
     EnvironmentalContour instance.
 
-    The points of the path have their own model (ExtremeEnvDesignCondition)
-    and are connected via the ContourPath primary key.
+    The coordinates of the path's points are stored as a float64 array with
+    the shape (n_dimensions, n_points) in a binary field. Optionally, the
+    points can additionally be stored in their own model
+    (ExtremeEnvDesignCondition), which is connected via the ContourPath
+    primary key (see settings.DO_SAVE_CONTOUR_COORDINATES_IN_DB).
     """
     environmental_contour = models.ForeignKey(EnvironmentalContour,
                                               on_delete=models.CASCADE)
+    # Raw bytes of a C-contiguous float64 array.
+    coordinates = models.BinaryField(default=None, null=True)
+    # The return period of the path if the contour was computed for several
+    # return periods at once.
+    return_period = models.DecimalField(decimal_places=5, max_digits=10,
+                                        default=None, null=True)
+    n_dimensions = models.PositiveSmallIntegerField(default=0)
+    n_points = models.PositiveIntegerField(default=0)
+
+    def set_coordinates(self, path_coordinates):
+        """
+        Sets the coordinates of the path's points.
+
+        Parameters
+        ----------
+        path_coordinates : list of numpy.ndarray,
+            One array per dimension, all of the same length.
+        """
+        array = np.ascontiguousarray(path_coordinates, dtype='<f8')
+        self.n_dimensions, self.n_points = array.shape
+        self.coordinates = array.tobytes()
+
+    def coordinates_array(self):
+        """
+        Returns the coordinates of the path's points.
+
+        The array is a read-only view on the stored bytes, no data is copied.
+
+        Returns
+        -------
+        array : numpy.ndarray,
+            Array with the shape (n_dimensions, n_points). If the path has no
+            stored coordinates, e.g. a path without points, which was saved
+            before the binary fields existed, the array has no points.
+        """
+        if self.coordinates is None:
+            return np.empty((self.n_dimensions, 0), dtype='<f8')
+        return np.frombuffer(self.coordinates, dtype='<f8').reshape(
+            self.n_dimensions, self.n_points)
 
 
 class ExtremeEnvDesignCondition(models.Model):
@@ -336,11 +443,24 @@ class PlottedFigure(models.Model):
     EnvironmentalContour instance can have multiple images associated to it
     using a many-to-one relation.
     """
+    # What the image shows: the fitted distribution within an interval, the
+    # fit of a dependent parameter, the fitted distribution of a variable
+    # with independent parameters or an environmental contour.
+    PDF = 'pdf'
+    PARAM_OVERVIEW = 'param_overview'
+    INDEPENDENT = 'independent'
+    CONTOUR = 'contour'
+    ROLES = ((PDF, 'Fitted distribution in an interval'),
+             (PARAM_OVERVIEW, 'Fit of a dependent parameter'),
+             (INDEPENDENT, 'Fitted distribution of independent parameters'),
+             (CONTOUR, 'Environmental contour'))
     image = models.ImageField(
         upload_to=media_directory_path,
         null=True,
         default=None
     )
+    role = models.CharField(choices=ROLES, default=None, max_length=16,
+                            null=True, db_index=True)
     probabilistic_model = models.ForeignKey(
         ProbabilisticModel,
         blank=True,
@@ -368,3 +488,119 @@ class PlottedFigure(models.Model):
         null=True,
         on_delete=models.CASCADE
     )
+
+
+class ComputeJob(models.Model):
+    """
+    Model for a computation, which is run as a background job.
+
+    A ComputeJob object is created when a user requests a computation, e.g. an
+    environmental contour. A worker process (see jobs.py) picks the job up,
+    runs it and links its result, e.g. the EnvironmentalContour, or stores the
+    error that occured. Meanwhile, the user is shown a page, which polls the
+    job's status.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = ((PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'),
+                (FAILED, 'Failed'))
+    IFORM = 'iform'
+    HDC = 'hdc'
+    FIT = 'fit'
+    JOB_TYPES = ((IFORM, 'IFORM contour'), (HDC, 'Highest density contour'),
+                 (FIT, 'Fit of a probabilistic model'))
+    # A job runs through stages, which are timed on their own.
+    CONTOUR_STAGES = ('compute', 'persist', 'report')
+    FIT_STAGES = ('fit', 'persist', 'render')
+    primary_user = models.ForeignKey(User, null=True,
+                                     related_name="jobs_primary")
+    job_type = models.CharField(choices=JOB_TYPES, max_length=10)
+    status = models.CharField(choices=STATUSES, default=PENDING,
+                              max_length=10, db_index=True)
+    # The stage the job is currently in, e.g. 'fit'.
+    stage = models.CharField(default=None, max_length=10, null=True)
+    # Seconds each finished stage took as a JSON string.
+    stage_timings = models.TextField(default='{}')
+    # The job's input, e.g. the contour settings, as a JSON string.
+    parameters = models.TextField(default='{}')
+    error_message = models.TextField(default=None, null=True)
+    # Warnings, which the computation raised, as a JSON list of strings.
+    warning_messages = models.TextField(default='[]')
+    created = models.DateTimeField(default=timezone.now)
+    started = models.DateTimeField(default=None, null=True)
+    finished = models.DateTimeField(default=None, null=True)
+    probabilistic_model = models.ForeignKey(ProbabilisticModel,
+                                            on_delete=models.CASCADE,
+                                            null=True)
+    environmental_contour = models.ForeignKey(EnvironmentalContour,
+                                              on_delete=models.CASCADE,
+                                              null=True)
+    measure_file_model = models.ForeignKey(MeasureFileModel,
+                                           on_delete=models.CASCADE,
+                                           null=True)
+
+    def get_parameters(self):
+        return json.loads(self.parameters)
+
+    def get_stage_timings(self):
+        return json.loads(self.stage_timings)
+
+    def get_warning_messages(self):
+        return json.loads(self.warning_messages)
+
+    def stages(self):
+        if self.job_type == self.FIT:
+            return self.FIT_STAGES
+        else:
+            return self.CONTOUR_STAGES
+
+    def progress(self):
+        """
+        Returns the share of the job's stages, which are finished (0 to 1).
+        """
+        if self.status == self.DONE:
+            return 1.0
+        return len(self.get_stage_timings()) / len(self.stages())
+
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    @staticmethod
+    def url_str():
+        return "compute_job"
+
+
+class FitCacheEntry(models.Model):
+    """
+    Model for a cached fit of a probabilistic model (see fit_cache.py).
+
+    The key is a hash of the measurement file's content and the normalized
+    fit settings. The entry points to the probabilistic model, which was
+    fitted with these settings, such that its parameters and figures can be
+    reused if the same fit is requested again.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    # Hash of the measurement file's content, used for invalidation.
+    file_hash = models.CharField(max_length=64, db_index=True)
+    probabilistic_model = models.ForeignKey(ProbabilisticModel,
+                                            on_delete=models.CASCADE)
+    created = models.DateTimeField(default=timezone.now)
+    last_used = models.DateTimeField(default=timezone.now, db_index=True)
+
+
+class ContourCacheEntry(models.Model):
+    """
+    Model for a cached environmental contour (see contour_cache.py).
+
+    The key is a hash of the probabilistic model's primary key and version
+    stamp and the contour settings. The entry points to the environmental
+    contour, which was computed with these inputs, such that its coordinates,
+    figure and report can be reused if the same contour is requested again.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    environmental_contour = models.ForeignKey(EnvironmentalContour,
+                                              on_delete=models.CASCADE)
+    created = models.DateTimeField(default=timezone.now)
+    last_used = models.DateTimeField(default=timezone.now, db_index=True)
@@ -1,66 +1,121 @@
 """
 Plots measurement files, distributions and contours.
+
+matplotlib, scipy, shapely and viroconcom are imported by the functions, which
+use them, such that importing this module, e.g. in views.py, is fast.
 """
-import pandas as pd
 import numpy as np
 import os
 import tempfile
 import warnings
 
-from scipy.stats import weibull_min
-from scipy.stats import lognorm
-from scipy.stats import norm
 from django.template.loader import get_template
 from subprocess import Popen, PIPE
 from io import BytesIO, StringIO
 from django.core.files.base import ContentFile
-from urllib import request
-from viroconweb.settings import USE_S3
-from viroconcom.distributions import ParametricDistribution
-
-# There is a problem with using matplotlib on a server (with Heroku and Travis).
-#
-# The standard solution to fix it is to use:
-#   import matplotlib
-#   matplotlib.use('Agg')
-#   import matplotlib.pyplot as plt
-# see https://stackoverflow.com/questions/41319082/import-matplotlib-failing-
-# with-no-module-named-tkinter-on-heroku
-#
-# However this does not work. Consequently we use another solution, which is
-# inspired by https://stackoverflow.com/questions/3285193/how-to-switch-backends
-# -in-matplotlib-python
-import matplotlib
-
-all_backends = matplotlib.rcsetup.all_backends
-backend_worked = False
-for gui in all_backends:
-    try:
-        print("Testing", gui)
-        matplotlib.use(gui, warn=False, force=True)
-        from matplotlib import pyplot as plt
-
-        backend_worked = True
-        break
-    except:
-        continue
-print("Using", matplotlib.get_backend())
-if backend_worked == False or matplotlib.get_backend() == 'TkAgg':
-    from matplotlib import pyplot as plt
-
-    plt.switch_backend('agg')
-    print("Switched backend and now using", matplotlib.get_backend())
-
-from mpl_toolkits.mplot3d import axes3d, Axes3D # Needed for projection='3d'
-from descartes import PolygonPatch
-from .plot_generic import alpha_shape
-from .plot_generic import convert_ndarray_list_to_multipoint
+from django.db.models import Prefetch
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+from . import measure_data
 from . import settings
+from .settings import FIGURE_RENDERING_PROCESSES, MATPLOTLIB_BACKEND
 
 from .models import ProbabilisticModel, DistributionModel, ParameterModel, \
     AdditionalContourOption, PlottedFigure
 from .compute_interface import setup_mul_dist
+from .signals import storage_bytes_in_batch
+
+_pyplot = None
+# Figures are rendered in parallel only in job workers (see
+# enable_parallel_rendering()). The processes are started on first use and
+# then reused for every fit.
+_render_in_parallel = False
+_rendering_executor = None
+
+
+def pyplot():
+    """
+    Returns matplotlib's pyplot, which is imported on first use.
+
+    Figures are only rendered to files, thus pyplot always uses the
+    non-interactive backend MATPLOTLIB_BACKEND instead of probing which
+    backend works. Since pyplot is not imported together with this module,
+    starting a web or compute worker does not pay for it.
+
+    Returns
+    -------
+    plt : module,
+        matplotlib.pyplot
+    """
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib
+        matplotlib.use(MATPLOTLIB_BACKEND)
+        from matplotlib import pyplot as plt
+        if plt.get_backend().lower() != MATPLOTLIB_BACKEND.lower():
+            # pyplot had been imported with another backend before.
+            plt.switch_backend(MATPLOTLIB_BACKEND)
+        _pyplot = plt
+    return _pyplot
+
+
+class FigureTask:
+    """
+    Describes a figure of a fit, which should be rendered and saved.
+
+    The figure is rendered by calling render_function(*render_args), which
+    returns the PNG image as bytes. Since the arguments are plain numbers,
+    strings and lists, the figure can be rendered in another process.
+
+    Attributes
+    ----------
+    render_function : function,
+        A module level function, which renders the figure, e.g.
+        render_pdf_with_raw_data.
+    render_args : tuple,
+        The arguments of the render function.
+    file_name : str,
+        Name of the image file, e.g. 'fit_01_00_02.png'.
+    dim_index : int,
+        The index of the distribution, which the figure belongs to.
+    role : str,
+        What the figure shows, one of PlottedFigure.ROLES.
+    param_name : str or None,
+        The name of the parameter, whose fit function is shown, or None if the
+        figure shows a fitted distribution.
+    """
+    def __init__(self, render_function, render_args, file_name, dim_index,
+                 role, param_name=None):
+        self.render_function = render_function
+        self.render_args = render_args
+        self.file_name = file_name
+        self.dim_index = dim_index
+        self.role = role
+        self.param_name = param_name
+
+
+def figure_to_png(fig):
+    """
+    Saves a matplotlib figure as a PNG image and closes the figure.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure,
+        The figure.
+
+    Returns
+    -------
+    png : bytes,
+        The PNG image.
+    """
+    plt = pyplot()
+    # For the following block thanks to: https://stackoverflow.com/questions/
+    # 20580179/saving-a-matplotlib-graph-as-an-image-field-in-database
+    f = BytesIO()
+    plt.savefig(f, bbox_inches='tight')
+    plt.close(fig)
+    return f.getvalue()
 
 
 def plot_pdf_with_raw_data(dim_index,
@@ -73,11 +128,9 @@ def plot_pdf_with_raw_data(dim_index,
                            dist_points,
                            interval,
                            var_name,
-                           symbol_parent_var,
-                           directory,
-                           probabilistic_model):
+                           symbol_parent_var):
     """
-    Creates and saves an image, which shows a fit of a distribution.
+    Describes an image, which shows a fit of a distribution.
 
     Parameters
     ----------
@@ -106,11 +159,54 @@ def plot_pdf_with_raw_data(dim_index,
         The name of a single variable of the probabilistic model.
     symbol_parent_var : str,
         Symbol of the variable on which the conditional variable is based.
-    directory : str,
-        The directory where the figure should be saved
-    probabilistic_model : ProbabilisticModel,
-        Probabilistic model which has the particular pdf.
+
+    Returns
+    -------
+    figure_task : FigureTask,
+        The task to render and save the image.
     """
+    dim_index_2_digits = str(dim_index).zfill(2)
+    parent_index_2_digits = str(parent_index).zfill(2)
+    low_index_2_digits = str(low_index).zfill(2)
+
+    # The convention for image name is like this: 'fit_01_00_02.png' means
+    # a plot of the second variable (01) which is conditional on the first
+    # variable (00) and this is the third (02) fit
+    file_name = 'fit_' + dim_index_2_digits + '_' + parent_index_2_digits + \
+                '_' + low_index_2_digits + '.png'
+    render_args = (shape, loc, scale, distribution_type, list(dist_points),
+                   interval, var_name, symbol_parent_var)
+    if parent_index is None:
+        role = PlottedFigure.INDEPENDENT
+    else:
+        role = PlottedFigure.PDF
+    return FigureTask(render_pdf_with_raw_data, render_args, file_name,
+                      dim_index, role)
+
+
+def render_pdf_with_raw_data(shape,
+                             loc,
+                             scale,
+                             distribution_type,
+                             dist_points,
+                             interval,
+                             var_name,
+                             symbol_parent_var):
+    """
+    Renders an image, which shows a fit of a distribution.
+
+    See plot_pdf_with_raw_data() for a description of the parameters.
+
+    Returns
+    -------
+    png : bytes,
+        The PNG image.
+    """
+    from scipy.stats import weibull_min
+    from scipy.stats import lognorm
+    from scipy.stats import norm
+
+    plt = pyplot()
     fig = plt.figure()
     ax = fig.add_subplot(111)
 
@@ -134,7 +230,7 @@ def plot_pdf_with_raw_data(dim_index,
                         lognorm.ppf(0.9999, shape, scale=scale), 100)
         y = lognorm.pdf(x, shape, scale=scale)
 
-        # plot_pdf_with_raw_data works with the scale parameter, but the user
+        # render_pdf_with_raw_data works with the scale parameter, but the user
         # should be presented the mu value. Consequently, the scale value must
         # be converted.
         text = distribution_type + ',' + \
@@ -164,28 +260,7 @@ def plot_pdf_with_raw_data(dim_index,
     plt.title(text)
     plt.xlabel(var_name)
     plt.ylabel('probability density [-]')
-    dim_index_2_digits = str(dim_index).zfill(2)
-    parent_index_2_digits = str(parent_index).zfill(2)
-    low_index_2_digits = str(low_index).zfill(2)
-
-    # The convention for image name is like this: 'fit_01_00_02.png' means
-    # a plot of the second variable (01) which is conditional on the first
-    # variable (00) and this is the third (02) fit
-    # For the following block thanks to: https://stackoverflow.com/questions/
-    # 20580179/saving-a-matplotlib-graph-as-an-image-field-in-database
-    f = BytesIO()
-    plt.savefig(f, bbox_inches='tight')
-    plt.close(fig)
-    content_file = ContentFile(f.getvalue())
-
-    dists_models = DistributionModel.objects.filter(
-        probabilistic_model=probabilistic_model)
-    plotted_figure = PlottedFigure(probabilistic_model=probabilistic_model,
-                                   distribution_model=dists_models[dim_index])
-    file_name = 'fit_' + dim_index_2_digits + '_' + parent_index_2_digits + \
-                '_' + low_index_2_digits + '.png'
-    plotted_figure.image.save(file_name, content_file)
-    plotted_figure.save()
+    return figure_to_png(fig)
 
 
 def plot_parameter_fit_overview(dim_index,
@@ -194,10 +269,9 @@ def plot_parameter_fit_overview(dim_index,
                                 param_at,
                                 param_values,
                                 fit_func,
-                                dist_name,
-                                probabilistic_model):
+                                dist_name):
     """
-    Plots an image which shows the fit of a function.
+    Describes an image which shows the fit of a function.
 
     Parameters
     ----------
@@ -205,8 +279,6 @@ def plot_parameter_fit_overview(dim_index,
         Index of the related distribution.
     var_name : str
         Name of a multivariate distribution.
-    var_symbol : str
-          Symbol of a multivariate distribution.
     para_name : str
         Parameter name like shape, location, scale.
     param_at : list of float
@@ -217,24 +289,24 @@ def plot_parameter_fit_overview(dim_index,
         e.g. shape, loc or scale.
     fit_func : FunctionParam
         The fit function e.g. power function, exponential
-    directory : str
-        The directory where the figure will be saved.
     dist_name : str
         Name of the distribution, e.g. "Lognormal".
-    probabilistic_model : ProbabilisticModel
-        Probabilistic model that was created based on this fit.
+
+    Returns
+    -------
+    figure_task : FigureTask,
+        The task to render and save the image.
     """
 
     y_text = assign_parameter_name(dist_name, para_name)
 
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-
     x = np.linspace(min(param_at) - 2, max(param_at) + 2,
                     100)
     y = []
     param_values_for_plot = []
 
+    # The fit function is evaluated here such that only numbers need to be
+    # passed to the process, which renders the figure.
     if dist_name == 'Lognormal' and para_name == 'scale':
         for i in range(len(param_values)):
             # We are not allowed to alter the param_values object since
@@ -243,36 +315,52 @@ def plot_parameter_fit_overview(dim_index,
         for x1 in x:
             y.append(np.log(fit_func(x1)))
     else:
-        param_values_for_plot = param_values
+        param_values_for_plot = list(param_values)
         for x1 in x:
             y.append(fit_func(x1))
 
+    file_name = 'fit_' + str(dim_index) + para_name + '.png'
+    render_args = (list(x), y, list(param_at), param_values_for_plot,
+                   var_name, y_text)
+    return FigureTask(render_parameter_fit_overview, render_args, file_name,
+                      dim_index, PlottedFigure.PARAM_OVERVIEW, para_name)
+
+
+def render_parameter_fit_overview(x, y, param_at, param_values, var_name,
+                                  y_text):
+    """
+    Renders an image which shows the fit of a function.
+
+    Parameters
+    ----------
+    x : list of float
+        The x-values of the fit function.
+    y : list of float
+        The y-values of the fit function.
+    param_at : list of float
+        The x-values of the fitted parameter values.
+    param_values : list of float
+        The fitted parameter values.
+    var_name : str
+        Label of the x-axis.
+    y_text : str
+        Label of the y-axis.
+
+    Returns
+    -------
+    png : bytes,
+        The PNG image.
+    """
+    plt = pyplot()
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
     ax.plot(x, y, color='#54889c')
 
-    ax.scatter(param_at, param_values_for_plot, color='#9C373A')
+    ax.scatter(param_at, param_values, color='#9C373A')
     ax.grid(True)
     plt.ylabel(y_text)
     plt.xlabel(var_name)
-
-    # For the following block thanks to: https://stackoverflow.com/questions/
-    # 20580179/saving-a-matplotlib-graph-as-an-image-field-in-database
-    f = BytesIO()
-    plt.savefig(f, bbox_inches='tight')
-    plt.close(fig)
-    content_file = ContentFile(f.getvalue())
-
-    dists_models = DistributionModel.objects.filter(
-        probabilistic_model=probabilistic_model)
-    param_models = ParameterModel.objects.filter(
-        distribution=dists_models[dim_index])
-    param_model = param_models.get(name=para_name)
-    plotted_figure = PlottedFigure(probabilistic_model=probabilistic_model,
-                                   distribution_model=dists_models[dim_index],
-                                   parameter_model=param_model)
-    file_name = 'fit_' + str(dim_index) + para_name + '.png'
-
-    plotted_figure.image.save(file_name, content_file)
-    plotted_figure.save()
+    return figure_to_png(fig)
 
 
 def plot_var_dependent(fit,
@@ -280,8 +368,7 @@ def plot_var_dependent(fit,
                        dim_index,
                        var_names,
                        var_symbols,
-                       directory,
-                       probabilistic_model,
+                       figure_tasks,
                        do_dependent_plot=True):
     """
     Plots the fitted distribution for each interval and the resulting fit
@@ -299,15 +386,14 @@ def plot_var_dependent(fit,
         Variable names of all distributions.
     var_symbols : list of str,
         Variable symbols of all distributions.
-    directory : str,
-        Path to the directory where the images will be stored.
-    probabilistic_model : ProbabilisticModel,
-        Probabilistic model that was created based on that fit.
+    figure_tasks : list of FigureTask,
+        The tasks to render the figures are appended to this list.
     do_dependent_plot : Boolean, optional
         True: Probability density functions will be plotted.
         False: Probability density functions will not be plotted.
         Defaults to True.
     """
+    from viroconcom.distributions import ParametricDistribution
 
     fit_inspection_data = fit.multiple_fit_inspection_data[dim_index]
     distribution = fit.mul_var_dist.distributions[dim_index]
@@ -323,15 +409,13 @@ def plot_var_dependent(fit,
                          "'scale', 'shape', or 'loc', but was {}.".format(param_name))
     param_at, param_value = fit_inspection_data.get_dependent_param_points(param_name)
 
-    plot_parameter_fit_overview(dim_index,
-                                var_names[dim_index],
-                                param_name,
-                                param_at,
-                                param_value,
-                                param,
-                                dist_name,
-                                probabilistic_model
-                                )
+    figure_tasks.append(plot_parameter_fit_overview(dim_index,
+                                                    var_names[dim_index],
+                                                    param_name,
+                                                    param_at,
+                                                    param_value,
+                                                    param,
+                                                    dist_name))
 
     if do_dependent_plot:
         for j in range(len(param_at)):
@@ -340,22 +424,20 @@ def plot_var_dependent(fit,
             interval_limits = calculate_intervals(param_at, dim_index, j)
             parent_index = fit.mul_var_dist.dependencies[dim_index][param_index]
             symbol_parent_var = var_symbols[parent_index]
-            plot_pdf_with_raw_data(dim_index, parent_index, j, basic_fit.shape,
-                                   basic_fit.loc, basic_fit.scale,
-                                   fit.mul_var_dist.distributions[
-                                       dim_index].name,
-                                   basic_fit.samples, interval_limits,
-                                   var_names[dim_index], symbol_parent_var,
-                                   directory, probabilistic_model)
+            figure_tasks.append(plot_pdf_with_raw_data(
+                dim_index, parent_index, j, basic_fit.shape,
+                basic_fit.loc, basic_fit.scale,
+                fit.mul_var_dist.distributions[dim_index].name,
+                basic_fit.samples, interval_limits,
+                var_names[dim_index], symbol_parent_var))
 
 
 def plot_var_independent(param_name,
                          dim_index,
                          var_names,
-                         directory,
                          fit_inspection_data,
                          fit,
-                         probabilistic_model):
+                         figure_tasks):
     """
     Plots the fitted distribution of a independent parameter
     (e.g. shape, loc or scale).
@@ -368,39 +450,79 @@ def plot_var_independent(param_name,
         The dimension of the distribution.
     var_names : list of str
         The name of the distribution.
-    directory : str
-        Path to the directory where the images will be stored.
     fit_inspection_data : FitInspectionData
         Information for plotting the fits of a single dimension.
     fit : Fit
         Holds data and information about the fit.
-    probabilistic_model : ProbabilisticModel
-        Probabilistic model that was created based on that fit.
+    figure_tasks : list of FigureTask,
+        The task to render the figure is appended to this list.
     """
+    from viroconcom.distributions import ParametricDistribution
+
     basic_fit = fit_inspection_data.get_basic_fit(param_name, 0)
     interval_limits = []
     param_index = ParametricDistribution.param_name_to_index(param_name)
     parent_index = fit.mul_var_dist.dependencies[dim_index][param_index]
     symbol_parent_var = None
-    plot_pdf_with_raw_data(dim_index,
-                           parent_index,
-                           0,
-                           basic_fit.shape,
-                           basic_fit.loc,
-                           basic_fit.scale,
-                           fit.mul_var_dist.distributions[dim_index].name,
-                           basic_fit.samples,
-                           interval_limits,
-                           var_names[dim_index],
-                           symbol_parent_var,
-                           directory,
-                           probabilistic_model)
-
-
-def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model):
+    figure_tasks.append(plot_pdf_with_raw_data(
+        dim_index,
+        parent_index,
+        0,
+        basic_fit.shape,
+        basic_fit.loc,
+        basic_fit.scale,
+        fit.mul_var_dist.distributions[dim_index].name,
+        basic_fit.samples,
+        interval_limits,
+        var_names[dim_index],
+        symbol_parent_var))
+
+
+class FitModelContext:
+    """
+    Holds the distribution and parameter models of a probabilistic model.
+
+    The models are loaded once such that saving the figures of a fit does not
+    need any query per figure.
+
+    Attributes
+    ----------
+    probabilistic_model : ProbabilisticModel,
+        The probabilistic model, which was created based on the fit.
+    distribution_models : list of DistributionModel,
+        The distributions in the order of the fit's dimensions.
+    parameter_models : dict,
+        Maps (dimension index, parameter name) to a ParameterModel.
+    """
+    def __init__(self, probabilistic_model, distribution_models):
+        self.probabilistic_model = probabilistic_model
+        self.distribution_models = distribution_models
+        self.parameter_models = {}
+        for dim_index, distribution_model in enumerate(distribution_models):
+            for parameter_model in distribution_model.parametermodel_set.all():
+                self.parameter_models[(dim_index, parameter_model.name)] = \
+                    parameter_model
+
+    @classmethod
+    def load(cls, probabilistic_model):
+        """
+        Loads the models with two queries, one for the distributions and one
+        for all their parameters.
+        """
+        distribution_models = list(DistributionModel.objects.filter(
+            probabilistic_model=probabilistic_model).order_by(
+            'pk').prefetch_related('parametermodel_set'))
+        return cls(probabilistic_model, distribution_models)
+
+
+def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model,
+             model_context=None):
     """
     Visualize a fit generated by the virconcom package.
 
+    The figures are rendered in parallel by a pool of processes (see
+    render_figures()) and then saved as PlottedFigure objects in one batch.
+
     Parameters
     ----------
     fit : Fit
@@ -413,12 +535,18 @@ def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model):
         Path to the directory where the images will be stored.
     probabilistic_model : ProbabilisticModel
        Model for a multivariate distribution, e.g. a sea state description.
+    model_context : FitModelContext, optional
+        The preloaded distribution and parameter models of the probabilistic
+        model. If None, they are loaded here.
 
     """
+    if model_context is None:
+        model_context = FitModelContext.load(probabilistic_model)
     directory = directory + '/' + str(probabilistic_model.pk)
     if not os.path.exists(directory):
         os.makedirs(directory)
 
+    figure_tasks = []
     for i, fit_inspection_data in enumerate(fit.multiple_fit_inspection_data):
         do_independent_plot = True
         do_dependent_plot = True
@@ -430,8 +558,7 @@ def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model):
                                i,
                                var_names,
                                var_symbols,
-                               directory,
-                               probabilistic_model,
+                               figure_tasks,
                                do_dependent_plot
                                )
             do_dependent_plot = False
@@ -439,10 +566,9 @@ def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model):
             plot_var_independent('scale',
                                  i,
                                  var_names,
-                                 directory,
                                  fit_inspection_data,
                                  fit,
-                                 probabilistic_model)
+                                 figure_tasks)
             do_independent_plot = False
 
         # Shape
@@ -453,8 +579,7 @@ def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model):
                                    i,
                                    var_names,
                                    var_symbols,
-                                   directory,
-                                   probabilistic_model,
+                                   figure_tasks,
                                    do_dependent_plot
                                    )
                 do_dependent_plot = False
@@ -462,10 +587,9 @@ def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model):
                 plot_var_independent('shape',
                                      i,
                                      var_names,
-                                     directory,
                                      fit_inspection_data,
                                      fit,
-                                     probabilistic_model
+                                     figure_tasks
                 )
                 do_independent_plot = False
 
@@ -477,20 +601,121 @@ def plot_fit(fit, var_names, var_symbols, directory, probabilistic_model):
                                    i,
                                    var_names,
                                    var_symbols,
-                                   directory,
-                                   probabilistic_model,
+                                   figure_tasks,
                                    do_dependent_plot
                 )
             elif do_independent_plot:
                 plot_var_independent('loc',
                                      i,
                                      var_names,
-                                     directory,
                                      fit_inspection_data,
                                      fit,
-                                     probabilistic_model
+                                     figure_tasks
                                      )
 
+    png_images = render_figures(figure_tasks)
+    save_fit_figures(figure_tasks, png_images, model_context)
+
+
+def render_figure(figure_task):
+    """
+    Renders a figure, can be called in a worker process.
+    """
+    return figure_task.render_function(*figure_task.render_args)
+
+
+def enable_parallel_rendering():
+    """
+    Lets render_figures() use a pool of processes in this process.
+
+    A job worker calls this function when it starts. Web processes render
+    figures one after another such that requests do not start processes.
+    """
+    global _render_in_parallel
+    _render_in_parallel = True
+
+
+def rendering_executor():
+    """
+    Returns the pool of settings.FIGURE_RENDERING_PROCESSES processes, which
+    render figures. It is created on first use.
+    """
+    global _rendering_executor
+    if _rendering_executor is None:
+        _rendering_executor = ProcessPoolExecutor(
+            max_workers=FIGURE_RENDERING_PROCESSES)
+    return _rendering_executor
+
+
+def render_figures(figure_tasks, parallel=None):
+    """
+    Renders figures, in a job worker in parallel with a pool of processes.
+
+    Parameters
+    ----------
+    figure_tasks : list of FigureTask,
+        The figures, which should be rendered.
+    parallel : bool, optional
+        If the pool of processes should be used. Defaults to True in a job
+        worker (see enable_parallel_rendering()) and to False otherwise.
+
+    Returns
+    -------
+    png_images : list of bytes,
+        The PNG images in the same order as the tasks.
+    """
+    global _rendering_executor
+    if parallel is None:
+        parallel = _render_in_parallel
+    if not parallel or FIGURE_RENDERING_PROCESSES <= 1 or \
+            len(figure_tasks) <= 1:
+        return [render_figure(figure_task) for figure_task in figure_tasks]
+    try:
+        return list(rendering_executor().map(render_figure, figure_tasks))
+    except BrokenProcessPool:
+        # A rendering process died, the next fit gets a new pool.
+        _rendering_executor = None
+        raise
+
+
+def save_fit_figures(figure_tasks, png_images, model_context):
+    """
+    Saves rendered figures of a fit as PlottedFigure objects in one batch.
+
+    Besides writing the image files, only two queries are needed: one to
+    insert the figures and one to count the user's storage space.
+
+    Parameters
+    ----------
+    figure_tasks : list of FigureTask,
+        The rendered figures.
+    png_images : list of bytes,
+        The PNG images in the same order as the tasks.
+    model_context : FitModelContext
+        The preloaded models of the probabilistic model, which was created
+        based on the fit.
+    """
+    plotted_figures = []
+    with storage_bytes_in_batch():
+        for figure_task, png_image in zip(figure_tasks, png_images):
+            parameter_model = None
+            if figure_task.param_name is not None:
+                parameter_model = model_context.parameter_models[
+                    (figure_task.dim_index, figure_task.param_name)]
+            plotted_figure = PlottedFigure(
+                probabilistic_model=model_context.probabilistic_model,
+                distribution_model=model_context.distribution_models[
+                    figure_task.dim_index],
+                parameter_model=parameter_model,
+                role=figure_task.role)
+            # Only the image file is saved here, the objects are inserted
+            # below.
+            plotted_figure.image.save(figure_task.file_name,
+                                      ContentFile(png_image),
+                                      save=False)
+            plotted_figures.append(plotted_figure)
+    PlottedFigure.objects.bulk_create(plotted_figures)
+
 
 def calculate_intervals(interval_centers, dimension_index,
                         interval_center_index):
@@ -552,7 +777,8 @@ def is_legit_distribution_parameter_index(distribution_name, index):
         return False
 
 
-def plot_contour(contour_coordinates, user, environmental_contour, var_names):
+def plot_contour(contour_coordinates, user, environmental_contour, var_names,
+                 path_return_periods=None):
     """
     The function plots a png image of a contour.
 
@@ -566,6 +792,9 @@ def plot_contour(contour_coordinates, user, environmental_contour, var_names):
         The model object contains all information about a environmental contour.
     var_names: list of str
       Name of the variables of the probabilistic model
+    path_return_periods : list of float, optional
+        Return period of each path if contours for several return periods
+        were computed. Each return period is plotted in its own color.
     """
 
     probabilistic_model = environmental_contour.probabilistic_model
@@ -574,49 +803,76 @@ def plot_contour(contour_coordinates, user, environmental_contour, var_names):
     if not os.path.exists(path):
         os.makedirs(path)
 
+    plt = pyplot()
     fig = plt.figure()
 
     if len(contour_coordinates[0]) == 2:
+        # descartes imports matplotlib and alpha_shape() needs shapely and
+        # scipy, thus they are only imported if needed.
+        from descartes import PolygonPatch
+        from .plot_generic import alpha_shape
         ax = fig.add_subplot(111)
 
         # Plot raw data
         if (probabilistic_model.measure_file_model):
-            data_path = probabilistic_model.measure_file_model.measure_file.url
-            if data_path[0] == '/':
-                data_path = data_path[1:]
-            data = pd.read_csv(data_path, sep=';', header=0).as_matrix()
-            ax.scatter(data[:, 0], data[:, 1], s=5, c='k',
+            samples = measure_data.load_columns(
+                probabilistic_model.measure_file_model, 2)
+            ax.scatter(samples[0], samples[1], s=5, c='k',
                        label='measured/simulated data')
 
         # Plot the contour as a scatter plot and a line connecting the dots
         alpha = .1
+        # Each kind of element and each return period gets one legend entry,
+        # even if the contour consists of several paths.
+        legend_labels = set()
+
+        def legend_label(label):
+            if label in legend_labels:
+                return None
+            legend_labels.add(label)
+            return label
+
         for i in range(len(contour_coordinates)):
+            color, contour_label = contour_path_style(i, path_return_periods)
             ax.scatter(contour_coordinates[i][0], contour_coordinates[i][1],
-                       s=15, c='b',
-                       label='extreme env. design condition')
-            try:
-                concave_hull, edge_points = alpha_shape(
-                    convert_ndarray_list_to_multipoint(contour_coordinates[i]),
-                    alpha=alpha)
-                patch_design_region = PolygonPatch(
-                    concave_hull, fc='#999999', linestyle='None', fill=True,
-                    zorder=-2, label='design region')
-                patch_environmental_contour = PolygonPatch(
-                    concave_hull, ec='b', fill=False, zorder=-1,
-                    label='environmental contour')
-                ax.add_patch(patch_design_region)
-                ax.add_patch(patch_environmental_contour)
-            except(ZeroDivisionError): # alpha_shape() can throw these
-                print('Encountered a ZeroDivisionError when using alpha_shape.'
-                      'Consequently no contour is plotted.')
+                       s=15, c=color,
+                       label=legend_label('extreme env. design condition'))
+            concave_hull, edge_points = alpha_shape(
+                np.column_stack(contour_coordinates[i]), alpha=alpha)
+            if concave_hull.is_empty or concave_hull.geom_type not in (
+                    'Polygon', 'MultiPolygon'):
+                # E.g. a path of less than three points has no area.
+                warnings.warn('A contour path does not enclose an area, '
+                              'consequently only its points are plotted.')
+                continue
+            patch_design_region = PolygonPatch(
+                concave_hull, fc='#999999', linestyle='None', fill=True,
+                zorder=-2, label=legend_label('design region'))
+            patch_environmental_contour = PolygonPatch(
+                concave_hull, ec=color, fill=False, zorder=-1,
+                label=legend_label(contour_label))
+            ax.add_patch(patch_design_region)
+            ax.add_patch(patch_environmental_contour)
 
         plt.legend(loc='lower right')
         plt.xlabel('{}'.format(var_names[0]))
         plt.ylabel('{}'.format(var_names[1]))
     elif len(contour_coordinates[0]) == 3:
+        # Needed for projection='3d'.
+        from mpl_toolkits.mplot3d import Axes3D
         ax = fig.add_subplot(1, 1, 1, projection='3d')
-        ax.scatter(contour_coordinates[0][0], contour_coordinates[0][1],
-                   contour_coordinates[0][2], marker='o', c='r')
+        if path_return_periods is None:
+            ax.scatter(contour_coordinates[0][0], contour_coordinates[0][1],
+                       contour_coordinates[0][2], marker='o', c='r')
+        else:
+            for i in range(len(contour_coordinates)):
+                color, contour_label = contour_path_style(i,
+                                                          path_return_periods)
+                ax.scatter(contour_coordinates[i][0],
+                           contour_coordinates[i][1],
+                           contour_coordinates[i][2], marker='o', c=color,
+                           label=contour_label)
+            plt.legend(loc='lower right')
         ax.set_xlabel('{}'.format(var_names[0]))
         ax.set_ylabel('{}'.format(var_names[1]))
         ax.set_zlabel('{}'.format(var_names[2]))
@@ -638,25 +894,48 @@ def plot_contour(contour_coordinates, user, environmental_contour, var_names):
     plt.savefig(f, bbox_inches='tight')
     plt.close(fig)
     content_file = ContentFile(f.getvalue())
-    plotted_figure = PlottedFigure(environmental_contour=environmental_contour)
+    plotted_figure = PlottedFigure(environmental_contour=environmental_contour,
+                                   role=PlottedFigure.CONTOUR)
     file_name = 'contour.png'
     plotted_figure.image.save(file_name, content_file)
     plotted_figure.save()
 
 
+def contour_path_style(path_index, path_return_periods):
+    """
+    Returns the color and the legend label of a contour's path.
+
+    Parameters
+    ----------
+    path_index : int,
+        Index of the path in the contour's coordinates.
+    path_return_periods : list of float or None,
+        Return period of each path or None if only one return period was
+        computed.
+
+    Returns
+    -------
+    color : str,
+        Matplotlib color of the path.
+    label : str,
+        Label of the path in the figure's legend.
+    """
+    if path_return_periods is None:
+        return 'b', 'environmental contour'
+    return_period = path_return_periods[path_index]
+    color_index = sorted(set(path_return_periods)).index(return_period)
+    return 'C{}'.format(color_index % 10), \
+           '{:g}-year contour'.format(return_period)
+
+
 def plot_data_set_as_scatter(user, measure_file_model, var_names):
+    plt = pyplot()
     fig = plt.figure(figsize=(7.5, 5.5*(len(var_names)-1)))
-    data_path = measure_file_model.measure_file.url
-    if data_path[0] == '/':
-        data_path = data_path[1:]
-
-    # Number of lines of th header is correctly set to 0! Originally it was 1,
-    # which caused a bug since the first data row was ignored, see issue #20.
-    data = pd.read_csv(data_path, sep=';', header=0).as_matrix()
+    samples = measure_data.load_columns(measure_file_model)
 
     for i in range(len(var_names) - 1):
         ax = fig.add_subplot(len(var_names) - 1, 1, i + 1)
-        ax.scatter(data[:, 0], data[:, i + 1], s=5, c='k')
+        ax.scatter(samples[0], samples[i + 1], s=5, c='k')
         ax.set_xlabel('{}'.format(var_names[0]))
         ax.set_ylabel('{}'.format(var_names[i + 1]))
         if i == 0:
@@ -700,7 +979,7 @@ def data_to_table(matrix, var_names):
 
 
 def create_latex_report(contour_coordinates, user, environmental_contour,
-                        var_names, var_symbols):
+                        var_names, var_symbols, path_return_periods=None):
     """
     Creates a latex-based pdf report describing the performed environmental
     contour calculation.
@@ -725,6 +1004,9 @@ def create_latex_report(contour_coordinates, user, environmental_contour,
     var_symbols : list of strings
         Symbols of the environental variables used in the probabilistic model,
         e.g. ['V', 'Hs']
+    path_return_periods : list of float, optional
+        Return period of each path if contours for several return periods
+        were computed, see jobs.join_contours().
 
     Returns
     -------
@@ -745,28 +1027,34 @@ def create_latex_report(contour_coordinates, user, environmental_contour,
     full_file_path_report = settings.PATH_MEDIA + short_file_path_report
 
 
-    plot_contour(contour_coordinates, user, environmental_contour, var_names)
+    plot_contour(contour_coordinates, user, environmental_contour, var_names,
+                 path_return_periods)
 
     pf_contour = PlottedFigure.objects.filter(
         environmental_contour=environmental_contour).first()
-    # Download the image from Amazon S3 since latex needs a local version
-    url_contour_image = pf_contour.image.url
-    local_path_contour_image = full_directory_contour + \
-                               os.path.split(url_contour_image)[1]
-    if USE_S3:
-        request.urlretrieve(url_contour_image, local_path_contour_image)
+    # Latex needs a local version of the image, e.g. if it is stored on S3.
+    local_path_contour_image = pf_contour.image.storage.cached_path(
+        pf_contour.image.name)
 
     latex_content = r"\section{Results} " \
                     r"\subsection{Environmental contour}" \
                     r"\includegraphics[width=\textwidth]{" + \
                     local_path_contour_image+ r"}" \
-                    r"\subsection{Extreme environmental design conditions}" + \
-                    get_latex_eedc_table(
-                        contour_coordinates,
-                        var_names,
-                        var_symbols) + \
-                    r"\section{Methods}" \
-                    r"\subsection{Associated measurement file}"
+                    r"\subsection{Extreme environmental design conditions}"
+    if path_return_periods is None:
+        latex_content += get_latex_eedc_table(contour_coordinates, var_names,
+                                              var_symbols)
+    else:
+        # One table per return period, which lists its first path.
+        for return_period in sorted(set(path_return_periods)):
+            i = path_return_periods.index(return_period)
+            latex_content += r"\subsubsection{" + \
+                             '{:g}-year contour'.format(return_period) + \
+                             r"}" + \
+                             get_latex_eedc_table([contour_coordinates[i]],
+                                                  var_names, var_symbols)
+    latex_content += r"\section{Methods}" \
+                     r"\subsection{Associated measurement file}"
 
     if probabilistic_model.measure_file_model:
         latex_content += r"File: '\verb|" + \
@@ -778,26 +1066,17 @@ def create_latex_report(contour_coordinates, user, environmental_contour,
         for figure_collection in figure_collections:
             latex_content += str(figure_collection.var_number) + r". Variable "
             latex_content += adjust_param_name_latex(figure_collection.param_name)
-            url_plotted_figure = figure_collection.param_image.image.url
-            local_path_plotted_figure = full_directory_prob_model + \
-                                        os.path.split(url_plotted_figure)[1]
-            if USE_S3:
-                request.urlretrieve(url_plotted_figure,
-                                    local_path_plotted_figure
-                                    )
+            param_image = figure_collection.param_image.image
+            local_path_plotted_figure = param_image.storage.cached_path(
+                param_image.name)
             latex_content += r"\begin{figure}[H]"
             latex_content += r"\includegraphics[width=\textwidth]{" + \
                              local_path_plotted_figure + r"}"
             latex_content += r"\end{figure}"
 
             for pdf_image in figure_collection.pdf_images:
-                url_plotted_figure = pdf_image.image.url
-                local_path_plotted_figure = full_directory_prob_model + \
-                                            os.path.split(url_plotted_figure)[1]
-                if USE_S3:
-                    request.urlretrieve(url_plotted_figure,
-                                        local_path_plotted_figure
-                                        )
+                local_path_plotted_figure = pdf_image.image.storage.cached_path(
+                    pdf_image.image.name)
                 latex_content += r"\begin{figure}[H]"
                 latex_content += r"\includegraphics[width=\textwidth]{" + \
                                  local_path_plotted_figure + r"}"
@@ -833,7 +1112,7 @@ def create_latex_report(contour_coordinates, user, environmental_contour,
     latex_content += r"\item Contour method: "
     latex_content += environmental_contour.contour_method
     latex_content += r"\item Return period: "
-    latex_content += str(environmental_contour.return_period) + " years"
+    latex_content += environmental_contour.return_periods_label() + " years"
     additonal_options = AdditionalContourOption.objects.filter(
         environmental_contour=environmental_contour)
     for additonal_option in additonal_options:
@@ -870,7 +1149,8 @@ def create_latex_report(contour_coordinates, user, environmental_contour,
             settings.LATEX_REPORT_NAME, djangofile)
         environmental_contour.save()
 
-    create_design_conditions_csv(contour_coordinates, environmental_contour)
+    create_design_conditions_csv(contour_coordinates, environmental_contour,
+                                 path_return_periods)
 
     return short_file_path_report
 
@@ -980,7 +1260,8 @@ def get_latex_eedc_table_head_line(var_names):
     return head_line_string
 
 
-def create_design_conditions_csv(contour_coordinates, environmental_contour):
+def create_design_conditions_csv(contour_coordinates, environmental_contour,
+                                 path_return_periods=None):
     """
     Creates a .csv file containing the extreme env. design conditions.
 
@@ -993,11 +1274,17 @@ def create_design_conditions_csv(contour_coordinates, environmental_contour):
         The format is defined by compute_interface.iform().
     environmental_contour : EnvironmentalContour
         The django model of the environmental contour.
+    path_return_periods : list of float, optional
+        Return period of each path. If given, each line starts with the
+        return period of its design condition.
 
     """
     file_content_as_string = ""
     for i in range(len(contour_coordinates)):
-        for j in range(len(contour_coordinates[0][0])):
+        for j in range(len(contour_coordinates[i][0])):
+            if path_return_periods is not None:
+                file_content_as_string += \
+                    '{:g}'.format(path_return_periods[i]) + ";"
             for k in range(len(contour_coordinates[0])):
                 file_content_as_string += str(contour_coordinates[i][k][j])
                 if k < (len(contour_coordinates[0]) - 1):
@@ -1098,12 +1385,15 @@ def sort_plotted_figures(probabilistic_model):
     """
     figure_collections = []
 
+    # The figures of all distributions are fetched with one prefetch query.
+    figures = PlottedFigure.objects.select_related(
+        'parameter_model').order_by('pk')
     dist_models = DistributionModel.objects.filter(
-        probabilistic_model=probabilistic_model)
+        probabilistic_model=probabilistic_model).order_by(
+        'pk').prefetch_related(Prefetch('plottedfigure_set', queryset=figures))
 
     for i, dist in enumerate(dist_models):
-        plotted_figures = PlottedFigure.objects.filter(
-            distribution_model=dist)
+        plotted_figures = dist.plottedfigure_set.all()
 
         if len(plotted_figures) == 1:
             figure_collection = FittingFigureCollection()
@@ -1114,17 +1404,14 @@ def sort_plotted_figures(probabilistic_model):
         else:
             param_images = []
             pdf_images = []
-            for j, plotted_figure in enumerate(plotted_figures):
-                # If a PlottedFigure is assigned to a ParameterModel instance
-                # the PlottedFigure holds an image which shows a fit of a
-                # parameter's dependency or if the PlottedFigure object's
-                # image url includes the String 'None' then the image shows
-                # fitted distribution of all independent parameters. Both types
-                # of images will be appended to the param_images list.
-                if plotted_figure.parameter_model or 'None' in plotted_figure.image.url:
-                    param_images.append(plotted_figure)
-                else:
+            for plotted_figure in plotted_figures:
+                # Images, which show a fit of a parameter's dependency or the
+                # fitted distribution of all independent parameters, will be
+                # appended to the param_images list.
+                if plotted_figure.role == PlottedFigure.PDF:
                     pdf_images.append(plotted_figure)
+                else:
+                    param_images.append(plotted_figure)
 
             for param in param_images:
                 figure_collection = FittingFigureCollection()
@@ -1132,7 +1419,7 @@ def sort_plotted_figures(probabilistic_model):
                 figure_collection.param_image = param
                 # Filter the independent distribution plot of the fitted
                 # parameters.
-                if 'None' in param.image.url:
+                if param.role == PlottedFigure.INDEPENDENT:
                     figure_collection.param_name = 'independent parameter'
                 else:
                     figure_collection.pdf_images = pdf_images
@@ -5,9 +5,7 @@ from shapely.ops import cascaded_union, polygonize
 from scipy.spatial import Delaunay
 import shapely.geometry as geometry
 import numpy as np
-import math
 from shapely.geometry import MultiPoint
-from shapely.geometry import Point
 import warnings
 
 # Based on: http://blog.thehumangeo.com/2014/05/12/drawing-boundaries-in-python
@@ -15,10 +13,14 @@ def alpha_shape(points, alpha):
     """
     Computes the alpha shape (concave hull) of a set of points
 
+    The circumradii of all Delaunay triangles are computed at once and the
+    edges of the triangles, which pass the radius filter, are extracted with
+    array operations.
+
     Parameters
     ----------
-    points : MultiPoint,
-        Iterable container of points.
+    points : MultiPoint or ndarray,
+        Iterable container of points or an array with the shape (n_points, 2).
     alpha : float,
         Alpha value to influence the gooeyness of the border. Smaller numbers
         don't fall inward as much as larger numbers. Too large and you lose
@@ -26,58 +28,88 @@ def alpha_shape(points, alpha):
 
     Returns
     -------
-
+    concave_hull : Polygon or MultiPolygon,
+        The alpha shape. If the points do not span an area, it is their
+        convex hull, i.e. a Point or a LineString.
+    edge_points : ndarray,
+        The edges of the triangles, which make up the alpha shape, with the
+        shape (n_edges, 2, 2).
     """
-    if len(points) < 4:
-        # When you have a triangle, there is no sense
+    if isinstance(points, np.ndarray):
+        coords = points
+    else:
+        coords = np.array([point.coords[0] for point in points])
+    if len(coords) < 4 or \
+            np.linalg.matrix_rank(coords - coords.mean(axis=0)) < 2:
+        # When you have a triangle or points on a line, there is no sense
         # in computing an alpha shape.
-        return geometry.MultiPoint(list(points)).convex_hull
+        return convex_hull(coords)
 
-    def add_edge(edges, edge_points, coords, i, j):
-        """
-        Add a line between the i-th and j-th points,
-        if not in the list already
-        """
-        if (i, j) in edges or (j, i) in edges:
-            # already added
-            return
-        edges.add( (i, j) )
-        edge_points.append(coords[ [i, j] ])
-    coords = np.array([point.coords[0]
-                       for point in points])
     tri = Delaunay(coords)
-    edges = set()
-    edge_points = []
-    # loop over triangles:
-    # ia, ib, ic = indices of corner points of the
-    # triangle
-    for ia, ib, ic in tri.vertices:
-        pa = coords[ia]
-        pb = coords[ib]
-        pc = coords[ic]
-        # Lengths of sides of triangle
-        a = math.sqrt((pa[0]-pb[0])**2 + (pa[1]-pb[1])**2)
-        b = math.sqrt((pb[0]-pc[0])**2 + (pb[1]-pc[1])**2)
-        c = math.sqrt((pc[0]-pa[0])**2 + (pc[1]-pa[1])**2)
-        # Semiperimeter of triangle
-        s = (a + b + c)/2.0
-        # Area of triangle by Heron's formula
-        area = math.sqrt(s*(s-a)*(s-b)*(s-c))
-        circum_r = a*b*c/(4.0*area)
-        # Here's the radius filter.
-        #print circum_r
-        if circum_r < 1.0/alpha:
-            add_edge(edges, edge_points, coords, ia, ib)
-            add_edge(edges, edge_points, coords, ib, ic)
-            add_edge(edges, edge_points, coords, ic, ia)
-    m = geometry.MultiLineString(edge_points)
+    # pa, pb, pc = corner points of all triangles
+    pa = coords[tri.simplices[:, 0]]
+    pb = coords[tri.simplices[:, 1]]
+    pc = coords[tri.simplices[:, 2]]
+    # Lengths of sides of the triangles
+    a = np.hypot(pa[:, 0] - pb[:, 0], pa[:, 1] - pb[:, 1])
+    b = np.hypot(pb[:, 0] - pc[:, 0], pb[:, 1] - pc[:, 1])
+    c = np.hypot(pc[:, 0] - pa[:, 0], pc[:, 1] - pa[:, 1])
+    # Semiperimeter of the triangles
+    s = (a + b + c) / 2.0
+    # Degenerated triangles get an infinite or undefined radius and are
+    # filtered out below.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Area of the triangles by Heron's formula
+        area = np.sqrt(s * (s - a) * (s - b) * (s - c))
+        circum_r = a * b * c / (4.0 * area)
+    # Here's the radius filter.
+    triangles = tri.simplices[circum_r < 1.0 / alpha]
+    # Each edge is added once, no matter how many triangles share it.
+    edges = np.concatenate((triangles[:, [0, 1]],
+                            triangles[:, [1, 2]],
+                            triangles[:, [2, 0]]))
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    edge_points = coords[edges]
+    m = geometry.MultiLineString([edge for edge in edge_points])
     triangles = list(polygonize(m))
     return cascaded_union(triangles), edge_points
 
+
+def convex_hull(coords):
+    """
+    Computes the convex hull of points and its edges like alpha_shape().
+
+    Parameters
+    ----------
+    coords : ndarray,
+        The points with the shape (n_points, 2).
+
+    Returns
+    -------
+    hull : Polygon, LineString or Point,
+        The convex hull.
+    edge_points : ndarray,
+        The edges of the hull with the shape (n_edges, 2, 2).
+    """
+    hull = geometry.MultiPoint([tuple(coord) for coord in coords]).convex_hull
+    if hull.geom_type == 'Polygon':
+        corners = np.array(hull.exterior.coords)
+    elif hull.geom_type == 'LineString':
+        corners = np.array(hull.coords)
+    else:
+        corners = np.empty((0, 2))
+    if len(corners) < 2:
+        return hull, np.empty((0, 2, 2))
+    return hull, np.stack((corners[:-1], corners[1:]), axis=1)
+
 def convert_ndarray_list_to_multipoint(ndarray_list):
     """
     Converts an array list to a MultiPoint, which is required by alpha_shape
 
+    alpha_shape also accepts the points as an array with the shape
+    (n_points, 2), which can be created with np.column_stack(ndarray_list)
+    and is faster for many points.
+
     Parameters
     ----------
     ndarray_list : list of ndarray,
@@ -91,14 +123,9 @@ def convert_ndarray_list_to_multipoint(ndarray_list):
         The data points as an MultiPoint object such that the method
         alpha_shape can work with it.
     """
-    points_list = []
     data_dimension = len(ndarray_list)
-    for i in range(len(ndarray_list[0])):
-        if data_dimension == 2:
-            points_list.append(Point(ndarray_list[0][i], ndarray_list[1][i]))
-        elif data_dimension == 3:
-            points_list.append(Point(ndarray_list[0][i], ndarray_list[1][i], ndarray_list[2][i]))
-        else:
-            warnings.warn("4-Dim plot or higher is not supported", DeprecationWarning)
-    points = MultiPoint(points_list)
+    if data_dimension not in (2, 3):
+        warnings.warn("4-Dim plot or higher is not supported", DeprecationWarning)
+        return MultiPoint([])
+    points = MultiPoint(np.column_stack(ndarray_list))
     return points
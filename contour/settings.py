@@ -20,7 +20,66 @@ if RUN_MODE == 'production':
     MAX_COMPUTING_TIME = 15.0
 else:
     MAX_COMPUTING_TIME = 120.0
-# Saving all coordinates to the database is slow since a lot of operations
-# might be necessary. Consequenetly, this can be turned off.
+# The coordinates of a contour are always saved as binary arrays (see
+# models.ContourPath). Additionally saving every coordinate as an own row is
+# slow since a lot of operations might be necessary. Consequenetly, this can be
+# turned off.
 DO_SAVE_CONTOUR_COORDINATES_IN_DB = False
+# If the coordinates are saved as rows, they are inserted in batches, which is
+# much faster than saving every row on its own (see
+# 'python manage.py benchmark_contour_storage').
+SAVE_CONTOUR_COORDINATES_IN_BULK = True
+CONTOUR_COORDINATES_BATCH_SIZE = 500
 
+# Contour calculations are run as jobs (see jobs.py). If RUN_JOBS_IN_BACKGROUND
+# is True, the jobs are handled by separate worker processes, which are started
+# with 'python manage.py run_compute_workers'. Then a computation does not
+# block a web worker and is not bound to Heroku's 30 s timeout. Locally and in
+# the test suite the jobs are run directly within the request.
+if RUN_MODE == 'local-dev':
+    RUN_JOBS_IN_BACKGROUND = False
+else:
+    RUN_JOBS_IN_BACKGROUND = True
+# Maximum computing time in seconds for a computation, which runs in a worker
+# process.
+MAX_JOB_COMPUTING_TIME = 600.0
+# Maximum wall-clock time in seconds of a job, including saving the results and
+# rendering the figures. If a job runs longer, e.g. because a computation does
+# not stop at its timeout, its worker process is killed (see jobs.py).
+MAX_JOB_WALL_CLOCK_TIME = MAX_JOB_COMPUTING_TIME + 300.0
+# Number of worker processes and the time in seconds a worker waits before it
+# checks for pending jobs again.
+NUMBER_OF_COMPUTE_WORKERS = 2
+JOB_POLLING_INTERVAL = 1.0
+# Maximum number of fits, which are kept in the fit cache (see fit_cache.py).
+# If the cache is full, the least recently used entries are evicted.
+FIT_CACHE_MAX_ENTRIES = 200
+# Number of multivariate distributions, which each process keeps in memory
+# such that they do not need to be built from the data base again (see
+# compute_interface.setup_mul_dist()).
+MUL_DIST_CACHE_SIZE = 64
+# Maximum number of environmental contours, which are kept in the contour
+# cache (see contour_cache.py).
+CONTOUR_CACHE_MAX_ENTRIES = 200
+# Number of processes, which render the figures of a fit in parallel in each
+# job worker (see plot.render_figures()). The processes are started once per
+# worker and reused. With 1, the figures are rendered in the worker itself.
+FIGURE_RENDERING_PROCESSES = 2
+# Size in bytes of the chunks, in which media files are streamed, and the
+# number of connections, which the threads of a process share to read media
+# files from S3 (see storage.py).
+MEDIA_CHUNK_SIZE = 64 * 1024
+S3_MAX_POOL_CONNECTIONS = 20
+# Directory and maximum size in bytes of the local on-disk cache for media
+# files, which are stored on S3 (see media_cache.py).
+MEDIA_CACHE_DIRECTORY = PATH_MEDIA + 'cache/'
+MEDIA_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# Number of items, e.g. measurement files, which an overview or select page
+# shows at once.
+ITEMS_PER_PAGE = 50
+# Backend, which matplotlib uses to render figures. It is non-interactive since
+# figures are only saved as files (see plot.pyplot()).
+MATPLOTLIB_BACKEND = 'Agg'
+# Maximum number of return periods, which can be computed together as one
+# contour (see compute_interface.py).
+MAX_RETURN_PERIODS = 10
@@ -1,14 +1,30 @@
 """
-Signals to correctly delete models and associated files.
+Signals to correctly delete models and associated files, to keep cached
+objects up to date and to count the storage space of each user.
 """
-from django.db.models.signals import post_delete
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import MeasureFileModel, ProbabilisticModel, EnvironmentalContour
+from .models import User, MeasureFileModel, ProbabilisticModel, \
+    EnvironmentalContour, DistributionModel, ParameterModel, version_stamp
+from . import fit_cache
+from .compute_interface import forget_mul_dist
+from .storage import media_file_saved, media_file_deleted
 import os
 import shutil
+import threading
 import warnings
 
-from viroconweb.settings import USE_S3
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+# The media files of each model, which are deleted together with the model.
+MEDIA_FILE_FIELDS = {
+    'MeasureFileModel': ('measure_file', 'scatter_plot', 'data_array'),
+    'PlottedFigure': ('image', ),
+    'EnvironmentalContour': ('latex_report', 'design_conditions_csv'),
+}
 
 
 # Thanks to: https://stackoverflow.com/questions/33080360/how-to-delete-files-
@@ -16,7 +32,7 @@ from viroconweb.settings import USE_S3
 # https://stackoverflow.com/questions/28135029/django-signals-not-working
 def _delete_file(instance, path):
     """
-   Deletes a file or folder from the filesystem.
+   Deletes a file or folder from the local filesystem.
 
    Parameters
    ----------
@@ -26,24 +42,29 @@ def _delete_file(instance, path):
        The path of the file or folder.
    """
     if path:
-        if path=='S3':
-            if instance.__class__.__name__ == 'MeasureFileModel':
-                instance.measure_file.delete(save=False)
-                instance.scatter_plot.delete(save=False)
-            elif instance.__class__.__name__ == 'PlottedFigure':
-                instance.image.delete(save=False)
-            elif instance.__class__.__name__ == 'EnvironmentalContour':
-                instance.latex_report.delete(save=False)
-                instance.design_conditions_csv.delete(save=False)
-        else:
-            if os.path.isfile(path):
-                os.remove(path)
-            elif os.path.isdir(path):
-                shutil.rmtree(path)
+        if os.path.isfile(path):
+            os.remove(path)
+        elif os.path.isdir(path):
+            shutil.rmtree(path)
     else:
         warnings.warn("Cannot delete the path with the value " + str(path))
 
 
+def _delete_media_files(instance):
+    """
+    Deletes the media files of a model from its storage, e.g. from S3.
+
+    Parameters
+    ----------
+    instance : The object that was deleted,
+        E.g. a MeasureFileModel or PlottedFigure object.
+    """
+    for field_name in MEDIA_FILE_FIELDS[instance.__class__.__name__]:
+        field_file = getattr(instance, field_name)
+        if field_file:
+            field_file.delete(save=False)
+
+
 # Thanks to: https://stackoverflow.com/questions/17507784/consolidating-
 # multiple-post-save-signals-with-one-receiver
 @receiver(post_delete)
@@ -63,20 +84,216 @@ def delete_file(sender, instance=None, **kwargs):
                       'EnvironmentalContour, '
                       'PlottedFigure')
     if sender.__name__ in list_of_models:
+        if sender.__name__ == 'MeasureFileModel' and instance.content_hash:
+            # Cached fits, which are based on the file's content, are not
+            # valid anymore.
+            fit_cache.invalidate(instance.content_hash)
+        # The media files are deleted through their storage before their
+        # directory is removed such that the storage space is counted down.
+        if sender.__name__ in MEDIA_FILE_FIELDS:
+            _delete_media_files(instance)
         if hasattr(instance, 'path_of_statics') and instance.path_of_statics:
             _delete_file(instance, instance.path_of_statics)
-        if sender.__name__ == 'MeasureFileModel' and instance.measure_file:
-            if USE_S3:
-                _delete_file(instance, path='S3')
-            else:
-                _delete_file(instance, instance.measure_file.path)
-        elif sender.__name__ == 'PlottedFigure' and instance.image:
-            if USE_S3:
-                _delete_file(instance, path='S3')
-            else:
-                _delete_file(instance, instance.image.path)
-        elif sender.__name__ == 'EnvironmentalContour' and instance.latex_report:
-            if USE_S3:
-                _delete_file(instance, path='S3')
-            else:
-                _delete_file(instance, instance.latex_report.path)
+
+
+def media_file_owner(name):
+    """
+    Returns the user name of a media file's owner.
+
+    media_directory_path() saves every media file in a directory, which is
+    named after the owner, e.g. 'max_mustermann/measurement/1/...'.
+    """
+    return name.split('/', 1)[0]
+
+
+def stored_bytes_per_user(file_models):
+    """
+    Sums the sizes of all media files, which the models refer to, per owner.
+
+    Parameters
+    ----------
+    file_models : list of Model,
+        The models, which have media files (see MEDIA_FILE_FIELDS). Within a
+        migration these are the historical models.
+
+    Returns
+    -------
+    storage_bytes : defaultdict,
+        The number of stored bytes per user name.
+    """
+    storage_bytes = defaultdict(int)
+    for model in file_models:
+        field_names = MEDIA_FILE_FIELDS[model.__name__]
+        for file_names in model.objects.values_list(*field_names).iterator():
+            for field_name, name in zip(field_names, file_names):
+                if not name:
+                    continue
+                storage = model._meta.get_field(field_name).storage
+                size = storage.stored_size(name)
+                if size is not None:
+                    storage_bytes[media_file_owner(name)] += size
+    return storage_bytes
+
+
+# Sizes, which are collected within storage_bytes_in_batch().
+_storage_bytes_batch = threading.local()
+
+
+@contextmanager
+def storage_bytes_in_batch():
+    """
+    Counts the storage space of the media files, which are saved or deleted
+    within the block, with one query per owner at the end of the block.
+
+    This keeps saving many files, e.g. the figures of a fit, at a constant
+    number of queries.
+    """
+    _storage_bytes_batch.deltas = defaultdict(int)
+    try:
+        yield
+    finally:
+        deltas = _storage_bytes_batch.deltas
+        _storage_bytes_batch.deltas = None
+        for username, size in deltas.items():
+            if size:
+                _update_storage_bytes(username, size)
+
+
+def _update_storage_bytes(username, size):
+    User.objects.filter(username=username).update(
+        storage_bytes=F('storage_bytes') + size)
+
+
+def _add_storage_bytes(name, size):
+    deltas = getattr(_storage_bytes_batch, 'deltas', None)
+    if deltas is None:
+        _update_storage_bytes(media_file_owner(name), size)
+    else:
+        deltas[media_file_owner(name)] += size
+
+
+@receiver(media_file_saved)
+def count_saved_file(sender, name=None, size=None, **kwargs):
+    """
+    Adds the size of a saved media file to its owner's storage space.
+
+    Parameters
+    ----------
+    sender : Class of the storage, which saved the file.
+    name : str, Name of the file in the storage.
+    size : int, Size of the file in bytes.
+    """
+    _add_storage_bytes(name, size)
+
+
+@receiver(media_file_deleted)
+def count_deleted_file(sender, name=None, size=None, **kwargs):
+    """
+    Subtracts the size of a deleted media file from its owner's storage
+    space.
+
+    Parameters
+    ----------
+    sender : Class of the storage, which deleted the file.
+    name : str, Name of the file in the storage.
+    size : int, Size of the file in bytes.
+    """
+    _add_storage_bytes(name, -size)
+
+
+@receiver(post_delete, sender=ProbabilisticModel)
+def forget_deleted_prob_model(sender, instance=None, **kwargs):
+    """
+    Removes the cached distribution of a deleted probabilistic model.
+
+    Parameters
+    ----------
+    sender : Class of object that was deleted, i.e. ProbabilisticModel.
+    instance : The ProbabilisticModel object that was deleted.
+    """
+    forget_mul_dist(instance.pk)
+
+
+# The fields, which define the distribution built by
+# compute_interface.setup_mul_dist(). Saving other fields does not change the
+# probabilistic model's version.
+DISTRIBUTION_FIELDS = {
+    'DistributionModel': ('distribution', ),
+    'ParameterModel': ('function', 'x0', 'x1', 'x2', 'dependency', 'name',
+                       'distribution'),
+}
+
+
+# Probabilistic models, which were changed within versions_in_batch().
+_versions_batch = threading.local()
+
+
+@contextmanager
+def versions_in_batch():
+    """
+    Renews the version stamp of the probabilistic models, whose
+    distributions or parameters are changed within the block, once at the
+    end of the block.
+
+    This keeps saving a whole model, e.g. a fitted one, at one update instead
+    of one per distribution and parameter.
+    """
+    _versions_batch.pks = set()
+    try:
+        yield
+    finally:
+        pks = _versions_batch.pks
+        _versions_batch.pks = None
+        if pks:
+            _renew_versions(pks)
+
+
+def _renew_versions(pks):
+    ProbabilisticModel.objects.filter(pk__in=pks).update(
+        version=version_stamp())
+    for pk in pks:
+        forget_mul_dist(pk)
+
+
+@receiver(post_save, sender=DistributionModel)
+@receiver(post_delete, sender=DistributionModel)
+@receiver(post_save, sender=ParameterModel)
+@receiver(post_delete, sender=ParameterModel)
+def renew_prob_model_version(sender, instance=None, **kwargs):
+    """
+    Gives the probabilistic model of a changed distribution or parameter a
+    new version stamp.
+
+    Other processes might have cached the distribution built by
+    compute_interface.setup_mul_dist(). They recognize the change by the
+    model's new version stamp. Saves, which only update fields that are not
+    part of the distribution (see DISTRIBUTION_FIELDS), keep the version.
+
+    Parameters
+    ----------
+    sender : Class of object that was saved or deleted,
+        E.g. the class DistributionModel or ParameterModel.
+    instance : The object that was saved or deleted,
+        E.g. a DistributionModel or ParameterModel object.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and \
+            not set(update_fields) & set(DISTRIBUTION_FIELDS[sender.__name__]):
+        return
+    if sender is ParameterModel:
+        # The distribution is usually loaded already, e.g. while a fitted
+        # model is saved, such that no query is needed.
+        try:
+            probabilistic_model_pk = \
+                instance.distribution.probabilistic_model_id
+        except DistributionModel.DoesNotExist:
+            probabilistic_model_pk = None
+    else:
+        probabilistic_model_pk = instance.probabilistic_model_id
+    if probabilistic_model_pk is None:
+        return
+    pks = getattr(_versions_batch, 'pks', None)
+    if pks is None:
+        _renew_versions([probabilistic_model_pk])
+    else:
+        pks.add(probabilistic_model_pk)
@@ -0,0 +1,271 @@
+"""
+Storage backends for media files, e.g. measurement files, figures and reports.
+
+Media files are stored locally or, online, on Amazon S3. All backends share
+the methods of MediaStorageMixin such that no other module needs to check
+where the files are stored:
+
+- local_path() returns a file's local path or None if it has none.
+- iter_chunks() reads a file as a stream of chunks.
+- read_range() reads only a part of a file, on S3 with a ranged GET request.
+- cached_path() returns a local path of a file, e.g. to memory-map it or to
+  include it in a latex report.
+
+S3MediaStorage reads with one boto3 client per process, whose connection pool
+is shared by all threads. boto3 and django-storages are imported when the
+first S3MediaStorage is created such that sites, which store their files
+locally, do not load them. Its files are read through a local on-disk cache
+(see media_cache.py). FakeS3Storage stores files on the local file system but
+behaves like S3MediaStorage, i.e. its files have no local path and are cached.
+The tests use it to run the code paths for S3 without network access.
+
+Every backend sends the signal media_file_saved when it has saved a file and
+media_file_deleted when it has deleted one. signals.py uses them to maintain
+the users' storage space.
+
+The backend is selected with DEFAULT_FILE_STORAGE in viroconweb/settings.py.
+"""
+import hashlib
+import posixpath
+import threading
+
+from django.core.files.storage import FileSystemStorage
+from django.dispatch import Signal
+
+from .media_cache import MediaCache
+from .settings import MEDIA_CHUNK_SIZE, S3_MAX_POOL_CONNECTIONS
+
+media_file_saved = Signal(providing_args=['name', 'size'])
+media_file_deleted = Signal(providing_args=['name', 'size'])
+
+
+class MediaStorageMixin:
+    """
+    Reading methods, which every media storage backend provides.
+
+    The default implementations are based on Django's Storage API and are
+    overwritten by backends, which can read more efficiently.
+    """
+
+    def local_path(self, name):
+        """
+        Returns the local path of a file or None if it is stored remotely.
+        """
+        try:
+            return self.path(name)
+        except NotImplementedError:
+            return None
+
+    def iter_chunks(self, name, chunk_size=MEDIA_CHUNK_SIZE):
+        """
+        Reads a file as a stream of chunks of at most chunk_size bytes.
+        """
+        with self.open(name, 'rb') as f:
+            chunk = f.read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = f.read(chunk_size)
+
+    def read_range(self, name, start, length):
+        """
+        Reads at most length bytes of a file beginning at the byte start.
+        """
+        with self.open(name, 'rb') as f:
+            f.seek(start)
+            return f.read(length)
+
+    def read_bytes(self, name):
+        """
+        Reads a whole file.
+        """
+        return b''.join(self.iter_chunks(name))
+
+    def cached_path(self, name):
+        """
+        Returns a local path of a file.
+        """
+        return self.local_path(name)
+
+    def stored_size(self, name):
+        """
+        Returns the size of a file in bytes or None if it does not exist.
+        """
+        try:
+            return self.size(name)
+        except (IOError, OSError):
+            return None
+
+    def _save(self, name, content):
+        size = content.size
+        name = super()._save(name, content)
+        media_file_saved.send(sender=self.__class__, name=name, size=size)
+        return name
+
+    def delete(self, name):
+        size = self.stored_size(name)
+        super().delete(name)
+        if size is not None:
+            media_file_deleted.send(sender=self.__class__, name=name,
+                                    size=size)
+
+
+class RemoteStorageMixin(MediaStorageMixin):
+    """
+    Reading methods of backends, whose files have no local path.
+
+    The files are read through the local MediaCache. Saved files are written
+    to the cache as well and deleted files are evicted from it.
+    """
+    _media_cache = None
+
+    @property
+    def media_cache(self):
+        if self._media_cache is None:
+            self._media_cache = MediaCache()
+        return self._media_cache
+
+    def local_path(self, name):
+        return None
+
+    def etag(self, name):
+        """
+        Returns the ETag of a stored file.
+        """
+        raise NotImplementedError()
+
+    def cached_path(self, name):
+        etag = self.etag(name)
+        path = self.media_cache.lookup(name, etag)
+        if path is None:
+            path = self.media_cache.store(name, self.iter_chunks(name), etag)
+        return path
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        try:
+            self.media_cache.store(name, content.chunks())
+        except ValueError:
+            # The backend closed the content after uploading it.
+            pass
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        self.media_cache.remove(name)
+
+
+class LocalMediaStorage(MediaStorageMixin, FileSystemStorage):
+    """
+    Stores media files in MEDIA_ROOT.
+    """
+
+
+class FakeS3Storage(RemoteStorageMixin, FileSystemStorage):
+    """
+    Stores media files in MEDIA_ROOT, but hides their local paths like S3.
+    """
+
+    def etag(self, name):
+        md5 = hashlib.md5()
+        for chunk in self.iter_chunks(name):
+            md5.update(chunk)
+        return '"{}"'.format(md5.hexdigest())
+
+
+class S3MediaStorage:
+    """
+    Stores media files in the S3 bucket AWS_STORAGE_BUCKET_NAME.
+
+    Creating an S3MediaStorage returns an instance of a subclass of
+    django-storages' S3Boto3Storage, which is defined on first use (see
+    s3_media_storage_class()).
+    """
+
+    def __new__(cls, *args, **kwargs):
+        return s3_media_storage_class()(*args, **kwargs)
+
+
+_s3_media_storage_class = None
+
+
+def s3_media_storage_class():
+    """
+    Returns the storage class of S3MediaStorage, django-storages is imported
+    on the first call.
+    """
+    global _s3_media_storage_class
+    if _s3_media_storage_class is None:
+        from storages.backends.s3boto3 import S3Boto3Storage
+        _s3_media_storage_class = type(
+            'S3MediaStorage',
+            (S3ReadMixin, RemoteStorageMixin, S3Boto3Storage),
+            {'__module__': __name__, '__doc__': S3MediaStorage.__doc__})
+    return _s3_media_storage_class
+
+
+class S3ReadMixin:
+    """
+    Reading methods of S3MediaStorage, which use one boto3 client per
+    process.
+    """
+    _client = None
+    _client_lock = threading.Lock()
+
+    def client(self):
+        """
+        Returns the boto3 client, which all threads of a process share.
+        """
+        if S3ReadMixin._client is None:
+            with S3ReadMixin._client_lock:
+                if S3ReadMixin._client is None:
+                    import boto3
+                    from botocore.config import Config
+                    config = Config(
+                        signature_version=self.signature_version,
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS)
+                    S3ReadMixin._client = boto3.session.Session().client(
+                        's3',
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        region_name=self.region_name,
+                        endpoint_url=self.endpoint_url,
+                        config=config)
+        return S3ReadMixin._client
+
+    def object_key(self, name):
+        if self.location:
+            return posixpath.join(self.location, name)
+        return name
+
+    def etag(self, name):
+        response = self.client().head_object(Bucket=self.bucket_name,
+                                             Key=self.object_key(name))
+        return response['ETag']
+
+    def stored_size(self, name):
+        from botocore.exceptions import ClientError
+        try:
+            response = self.client().head_object(Bucket=self.bucket_name,
+                                                 Key=self.object_key(name))
+        except ClientError:
+            return None
+        return response['ContentLength']
+
+    def iter_chunks(self, name, chunk_size=MEDIA_CHUNK_SIZE):
+        response = self.client().get_object(Bucket=self.bucket_name,
+                                            Key=self.object_key(name))
+        body = response['Body']
+        try:
+            chunk = body.read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = body.read(chunk_size)
+        finally:
+            body.close()
+
+    def read_range(self, name, start, length):
+        response = self.client().get_object(
+            Bucket=self.bucket_name,
+            Key=self.object_key(name),
+            Range='bytes={}-{}'.format(start, start + length - 1))
+        return response['Body'].read()
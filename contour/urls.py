@@ -32,6 +32,20 @@ urlpatterns = [
         views.EnvironmentalContourHandler.overview,
         name='environmental_contour_overview'),
 
+    # --------------------------------------------------------------------------
+    # ComputeJob
+    url(r'^jobs/overview$',
+        views.ComputeJobHandler.overview,
+        name='compute_job_overview'),
+
+    url(r'^jobs/(?P<pk>[0-9]+)/$',
+        views.ComputeJobHandler.show,
+        name='compute_job_show'),
+
+    url(r'^jobs/(?P<pk>[0-9]+)/status$',
+        views.ComputeJobHandler.status,
+        name='compute_job_status'),
+
     # --------------------------------------------------------------------------
     # ProbabilisticModel
     url(r'^models/add/([0-9]{2})/$',
@@ -1,6 +1,7 @@
 """
 Validators to check e.g. uploaded data or calculated contours.
 """
+import itertools
 import re
 import numpy as np
 from django.core.exceptions import ValidationError
@@ -9,7 +10,9 @@ def validate_contour_coordinates(contour_coordinates):
     """
     Validates contour coordinates.
 
-    They are not allowed to contain NaN or inf.
+    They are not allowed to contain NaN or inf. Each contour path is checked
+    as one array such that large contours, e.g. of the HDC method, are
+    validated quickly.
 
     Parameters
     ----------
@@ -22,22 +25,105 @@ def validate_contour_coordinates(contour_coordinates):
     -------
     ValidationError,
         If the contour coordinates contain unsupported values like
-        NaN or inf.
+        NaN or inf. The message names the path and the point, which
+        contains the first such value.
     """
-    for i in range(len(contour_coordinates)): # Loop over  multiple contour paths
-        for j in range(len(contour_coordinates[i])): # Loop over the EEDC vectors
-            for k in range(len(contour_coordinates[i][j])): # Loop over scalars
-                scalar = contour_coordinates[i][j][k]
-                if np.isnan(scalar):
-                    raise ValidationError('The contour coordinates contain '
-                                          'values, which are set to NaN.')
-                if np.isinf(scalar):
-                    print('Raising ValidationError because of inf.')
-                    raise ValidationError('The contour coordinates contain '
-                                          'values, which are set to inf '
-                                          '(Infinity).')
+    for i, path in enumerate(contour_coordinates):
+        # A path has the shape (n_dimensions, n_points).
+        path = np.atleast_2d(np.asarray(path, dtype=np.float64))
+        is_finite = np.isfinite(path)
+        if is_finite.all():
+            continue
+        # The first point with a NaN or inf in any of its dimensions.
+        j = int(np.argmin(is_finite.all(axis=0)))
+        point = path[:, j]
+        location = ' (path {}, point {}).'.format(i, j)
+        if np.isnan(point).any():
+            raise ValidationError('The contour coordinates contain values, '
+                                  'which are set to NaN' + location)
+        raise ValidationError('The contour coordinates contain values, which '
+                              'are set to inf (Infinity)' + location)
+
+# Lines of a measurement file are short. A longer line is rejected before it
+# is read completely such that validating an upload needs constant memory.
+MAX_CSV_LINE_LENGTH = 10 * 1024
+
+
+def iter_csv_blocks(value, max_line_length=MAX_CSV_LINE_LENGTH):
+    """
+    Yields blocks of complete lines while reading an uploaded file chunk by
+    chunk.
+
+    Parameters
+    ----------
+    value : File,
+        The uploaded file.
+    max_line_length : int, optional
+        Maximum number of bytes of a line.
+
+    Yields
+    ------
+    first_line_number : int,
+        Number of the block's first line, starting with 1.
+    text : str,
+        The decoded lines, each terminated by '\n'.
+
+    Raises
+    ------
+    ValidationError,
+        If the file is not an UTF-8 text file or if a line is too long.
+    """
+    line_number = 1
+    buffer = b''
+    for chunk in value.chunks():
+        buffer += chunk
+        # A trailing '\r' is kept in the buffer since it might be followed by
+        # '\n' in the next chunk.
+        end_of_lines = max(buffer.rfind(b'\n'),
+                           buffer.rfind(b'\r', 0, len(buffer) - 1)) + 1
+        if end_of_lines > 0:
+            text = _decode_csv_block(buffer[:end_of_lines])
+            buffer = buffer[end_of_lines:]
+            yield line_number, text
+            line_number += text.count('\n')
+        if len(buffer) > max_line_length:
+            raise ValidationError("Line %(line_number)s is too long.",
+                                  code="invalid",
+                                  params={"line_number": line_number})
+    if buffer:
+        yield line_number, _decode_csv_block(buffer + b'\n')
+
+
+def _decode_csv_block(block):
+    try:
+        text = block.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValidationError("Only plain text files are allowed.")
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
 
 def validate_csv_upload(value):
+    """
+    Validates an uploaded measurement file.
+
+    The header must contain a name and a symbol for each variable. Each line
+    of the body must contain one number per variable, separated by
+    semicolons and written with a decimal point, e.g. '3.593;7.7756'. The
+    file is read chunk by chunk and each block of lines is validated at once,
+    such that the needed memory does not depend on the file's size.
+
+    Parameters
+    ----------
+    value : File,
+        The uploaded file.
+
+    Raises
+    ------
+    ValidationError,
+        If the file is too large, empty, not a text file or if the header or
+        a line of the body is malformed. For the body, the number of the
+        first malformed line is reported.
+    """
 
     #check file size
     limit = 100 * 1024 * 1024
@@ -46,16 +132,9 @@ def validate_csv_upload(value):
     elif value.size == 0:
         raise ValidationError("File is empty.")
 
-    #check if text file
-    try:
-        input_str = value.read().decode("utf-8")
-    except UnicodeDecodeError:
-        raise ValidationError("Only plain text files are allowed.")
-
-
-    input_lines = input_str.splitlines()
-    header = input_lines[0]
-    body = "\n".join(input_lines[1:]) + "\n"
+    blocks = iter_csv_blocks(value)
+    first_line_number, text = next(blocks)
+    header, first_body_text = text.split('\n', 1)
 
     #check header
     header_parts = header.split(";")
@@ -80,31 +159,37 @@ def validate_csv_upload(value):
         raise ValidationError("Error in header.", code="invalid")
 
     #check body
-    if len(body) == 0:
+    # A line contains one number per variable, separated by semicolons, empty
+    # lines are ignored. Numbers have a decimal point like the parser of
+    # measure_data.py expects it. The block pattern matches any number of
+    # such lines. Each character can only be matched in one way, thus a
+    # malformed line is rejected without backtracking.
+    number = r"\d+(?:\.\d*)?"
+    separator = r"[ \t]*;[ \t]*"
+    line_pattern_str = (r"[ \t]*" + number + r"(?:" + separator + number
+                        + r"){" + str(var_num-1) + r"}[ \t]*|[ \t]*")
+    line_pattern = re.compile(line_pattern_str, re.ASCII)
+    block_pattern = re.compile(r"(?:(?:" + line_pattern_str + r")\n)*",
+                               re.ASCII)
+
+    body_is_empty = True
+    body_blocks = [(first_line_number + 1, first_body_text)]
+    for line_number, body_text in itertools.chain(body_blocks, blocks):
+        if body_is_empty and body_text.strip():
+            body_is_empty = False
+        if block_pattern.fullmatch(body_text):
+            continue
+        # Find the first malformed line of the block.
+        for i, line in enumerate(body_text.split('\n')):
+            if not line_pattern.fullmatch(line):
+                error_line = line.strip()
+                if len(error_line) > 50:
+                    error_line = error_line[0:50] + "..."
+                raise ValidationError("Error in the following line (line "
+                                      "%(line_number)s): %(err_line)s",
+                                      code="invalid",
+                                      params={"line_number": line_number + i,
+                                              "err_line": error_line})
+    if body_is_empty:
         raise ValidationError("Empty body.", code="invalid")
-
-    b_pattern_str = (r"(?:(?:\s*\d+[\.,]?\d*\s*;){1," + str(var_num-1)
-                     + r"}\s*\d+[\.,]?\d*\s*\n)+")
-    b_pattern = re.compile(b_pattern_str, re.ASCII)
-
-    body_is_ok = False
-    result = b_pattern.match(body)
-    if result:
-        body_is_ok = result.end()-result.start() == len(body)
-        if not body_is_ok:
-            end_of_line = body.find("\n", result.end())
-            start_of_line = body.rfind("\n", 0, result.end())
-            if end_of_line == -1:
-                end_of_line = len(body)
-            if start_of_line == -1:
-                start_of_line = 0
-            error_line = body[start_of_line : end_of_line].strip()
-            if len(error_line) > 50:
-                error_line = error_line[0:50] + "..."
-            raise ValidationError("Error in the following line: %(err_line)s",
-                                  code="invalid",
-                                  params={"err_line" : error_line})
-    else:
-        if not body_is_ok:
-            raise ValidationError("Error in body.", code="invalid")
     value.seek(0)
@@ -1,40 +1,28 @@
 """
 Handles requests and outputs rendered html.
 """
-import os
-import csv
-import warnings
-import codecs
-import time
-# These imports and the setup() call is recuired for multiprocessing, see
-# https://stackoverflow.com/questions/46908035/apps-arent-loaded-yet-
-# exception-occurs-when-using-multi-processing-in-django
-import django
-django.setup()
+import json
 
 from django.shortcuts import redirect
-from django.shortcuts import render, get_object_or_404, HttpResponse, \
-    HttpResponseRedirect
+from django.shortcuts import render, get_object_or_404, HttpResponseRedirect
+from django.http import JsonResponse
 from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db.models import Q
 from django.contrib import messages
 from django.urls import reverse
-from multiprocessing import Pool, TimeoutError
-from urllib import request
 from abc import abstractmethod
 
 from . import forms
+from . import jobs
+from . import measure_data
 from . import models
 from . import plot
 from . import settings
 
-from .models import User, MeasureFileModel, EnvironmentalContour, ContourPath, \
-    ExtremeEnvDesignCondition, EEDCScalar, AdditionalContourOption, \
-    ProbabilisticModel, DistributionModel, ParameterModel, PlottedFigure
+from .models import User, MeasureFileModel, ComputeJob
 
-from .compute_interface import ComputeInterface
-from .validators import validate_contour_coordinates
-from viroconcom import distributions, params
-from .settings import MAX_COMPUTING_TIME, DO_SAVE_CONTOUR_COORDINATES_IN_DB
+from .settings import ITEMS_PER_PAGE
 
 
 CONTOUR_CALCULATION_ERROR_MSG = 'Please consider different settings for the ' \
@@ -42,16 +30,6 @@ CONTOUR_CALCULATION_ERROR_MSG = 'Please consider different settings for the ' \
                                 'model. Feel free to contact us if you ' \
                                 'think this error is caused by a bug: ' \
                                 'virocon@uni-bremen.de'
-CONTOUR_REPORT_ERROR_MSG = 'An error occured when trying to generate ' \
-                           'the report for the contour. ' \
-                           'Feel free to contact us if you ' \
-                           'think this error is caused by a bug: ' \
-                           'virocon@uni-bremen.de'
-DATA_BASE_TIME_OUT_ERROR_MSG = "Writing to the data base takes too long. " \
-                               "It takes longer than the given value for a " \
-                               "timeout, which is " \
-                               "'{} seconds'.".format(
-                                MAX_COMPUTING_TIME)
 FITTING_ERROR_MSG = 'An error occured while fitting a probabliistic model ' \
                     'to the file. Feel free to contact us if you ' \
                     'think this error is caused by a bug: ' \
@@ -63,29 +41,90 @@ def index(request):
     return render(request, 'contour/home.html')
 
 
+def user_items(user, collection):
+    """
+    Returns the items, which a user owns or which are shared with the user.
+
+    Parameters
+    ----------
+    user : User,
+        The user, usually request.user.
+    collection : models.Model,
+        A Django model with the fields primary_user and secondary_user, e.g.
+        MeasureFileModel. This is the class, not an instance.
+
+    Returns
+    -------
+    items : QuerySet,
+        The items, the newest first. The shared items are selected with a
+        subquery on the indexed many-to-many table instead of a join such
+        that no item is listed twice.
+    """
+    shared_pks = collection.objects.filter(secondary_user=user).values('pk')
+    return collection.objects.filter(
+        Q(primary_user=user) | Q(pk__in=shared_pks)).order_by('-pk')
+
+
+def paginate(request, items):
+    """
+    Returns the page of items, which is requested with the GET parameter
+    'page'.
+
+    Parameters
+    ----------
+    request : HttpRequest,
+        The request to show the items.
+    items : QuerySet,
+        The ordered items.
+
+    Returns
+    -------
+    page : Page,
+        The requested page or, if it does not exist, the first or last page.
+    """
+    paginator = Paginator(items, ITEMS_PER_PAGE)
+    try:
+        return paginator.page(request.GET.get('page', 1))
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
+
+def add_return_periods(parameters, further_return_periods):
+    """
+    Adds the return periods of a contour, which should be computed for
+    several return periods at once, to a job's parameters.
+
+    Parameters
+    ----------
+    parameters : dict,
+        The job's parameters, which contain the entered 'return_period'.
+    further_return_periods : list of float,
+        Further return periods in years, which were entered.
+    """
+    return_periods = sorted(set([parameters['return_period']] +
+                                further_return_periods))
+    if len(return_periods) > 1:
+        parameters['return_periods'] = return_periods
+
+
 class Handler:
     @staticmethod
-    def overview(request, collection):
+    def overview(request, collection, select_related=('primary_user', )):
         """
         The method overview shows a overview of all items in a specific database.
         :param request:     to load an overview of database model.
         :param collection:  the selected database.       
+        :param select_related:  the foreign keys, which the template shows.
         :return:            HttpResponse. 
         """
         if request.user.is_anonymous:
             return redirect('contour:index')
         else:
-            meas = collection.objects.all()  # better name
-            context = set()
-            for item in meas:
-                bool_ = False
-                for secUser in item.secondary_user.all():
-                    if secUser == request.user:
-                        bool_ = True
-                if bool_:
-                    context.add(item)
-                elif item.primary_user == request.user:
-                    context.add(item)
+            items = user_items(request.user, collection).select_related(
+                *select_related).prefetch_related('secondary_user')
+            context = paginate(request, items)
 
             base = 'contour:' + collection.url_str()
             html = 'contour/' + collection.url_str() + '_overview.html'
@@ -228,19 +267,8 @@ class MeasureFileHandler(Handler):
         if request.user.is_anonymous:
             return redirect('contour:index')
         else:
-            collection = MeasureFileModel
-            meas = collection.objects.all()
-            context = set()
-            for item in meas:
-                bool_ = False
-                for secUser in item.secondary_user.all():
-                    if secUser == request.user:
-                        bool_ = True
-                if bool_:
-                    context.add(item)
-                elif item.primary_user == request.user:
-                    context.add(item)
-
+            context = paginate(request,
+                               user_items(request.user, MeasureFileModel))
             return render(request,
                           'contour/measure_file_model_select.html',
                           {'context': context}
@@ -272,6 +300,20 @@ class MeasureFileHandler(Handler):
                         measure_file_form.cleaned_data['measure_file'].file
                     )
                     measure_model.save()
+                    try:
+                        measure_data.convert_measure_file(measure_model)
+                    except ValueError:
+                        # The file passed the validator but cannot be read,
+                        # thus it is not kept.
+                        measure_model.delete()
+                        measure_file_form.add_error(
+                            'measure_file',
+                            'The values of the file could not be read.')
+                        return render(
+                            request,
+                            'contour/measure_file_model_add.html',
+                            {'form': measure_file_form}
+                        )
                     path = settings.PATH_MEDIA + \
                            settings.PATH_USER_GENERATED + \
                            str(request.user) + \
@@ -300,16 +342,16 @@ class MeasureFileHandler(Handler):
     @staticmethod
     def fit_file(request, pk):
         """
-        The method fits a MeasureFile item and shows the result. If the fit
-        isn't possible the user is going to be
-        informed with an error message.
+        The method shows the fit settings and submits the fit of a
+        MeasureFile item as a job. The job's page shows the fit's progress
+        and finally its result.
         :return:        HttpResponse.
         """
         if request.user.is_anonymous:
             return redirect('contour:index')
         else:
             mfm_item = MeasureFileModel.objects.get(pk=pk)
-            var_names, var_symbols = get_info_from_file(mfm_item.measure_file.url)
+            var_names, var_symbols = measure_data.load_header(mfm_item)
             var_number = len(var_names)
             fit_form = forms.MeasureFileFitForm(
                 variable_count=var_number,
@@ -322,51 +364,22 @@ class MeasureFileHandler(Handler):
                     variable_names=var_names
                 )
                 if fit_form.is_valid():
-                    ci = ComputeInterface()
-                    try:
-                        fit = ci.fit_curves(mfm_item=mfm_item,
-                                            fit_settings=fit_form.cleaned_data,
-                                            var_number=var_number
-                                            )
-                    except (ValueError, RuntimeError, IndexError, TypeError,
-                            NameError, KeyError, Exception) as err:
-                        return render(
-                            request,
-                            'contour/error.html',
-                            {'error_message': err,
-                             'text': FITTING_ERROR_MSG,
-                               'header': 'Fit measurement file to probabilistic '
-                                         'model',
-                               'return_url': 'contour:measure_file_model_select'
-                             }
-                        )
-                    directory_prefix = settings.PATH_MEDIA
-                    directory_after_static = settings.PATH_USER_GENERATED + \
-                                             str(request.user) + '/prob_model/'
-                    directory = directory_prefix + directory_after_static
-                    prob_model = save_fitted_prob_model(fit,
-                                                        fit_form.cleaned_data[
-                                                            'title'],
-                                                        var_names,
-                                                        var_symbols,
-                                                        request.user,
-                                                        mfm_item)
-                    plot.plot_fit(fit, var_names, var_symbols, directory,
-                                  prob_model)
-                    multivariate_distribution = plot.setup_mul_dist(
-                        prob_model
-                    )
-                    latex_string_list = multivariate_distribution.latex_repr(
-                        var_symbols
+                    # The cleaned data contains Decimals, which are not JSON
+                    # serializable, thus all settings are stored as strings.
+                    fit_settings = {key: str(value) for key, value
+                                    in fit_form.cleaned_data.items()}
+                    job = ComputeJob(
+                        primary_user=request.user,
+                        job_type=ComputeJob.FIT,
+                        measure_file_model=mfm_item,
+                        parameters=json.dumps({
+                            'title': fit_form.cleaned_data['title'],
+                            'var_names': var_names,
+                            'var_symbols': var_symbols,
+                            'fit_settings': fit_settings})
                     )
-                    figure_collections = plot.sort_plotted_figures(prob_model)
-                    return render(request,
-                                  'contour/fit_results.html',
-                                  {'pk': prob_model.pk,
-                                   'figure_collections': figure_collections,
-                                   'latex_string_list': latex_string_list
-                                   }
-                                  )
+                    jobs.submit_job(job)
+                    return redirect('contour:compute_job_show', job.pk)
                 else:
                     return render(request,
                                   'contour/measure_file_model_fit.html',
@@ -378,6 +391,40 @@ class MeasureFileHandler(Handler):
                           )
 
 
+    @staticmethod
+    def render_fit_results(request, probabilistic_model):
+        """
+        Renders the figures and the equations of a fitted probabilistic model.
+
+        Parameters
+        ----------
+        request : HttpRequest,
+            The HttpRequest to show the fit's result.
+        probabilistic_model : ProbabilisticModel,
+            The ProbabilisticModel, which was fitted to a measurement file.
+
+        Returns
+        -------
+        response : HttpResponse,
+            The rendered template 'fit_results.html'.
+        """
+        dists_model = models.DistributionModel.objects.filter(
+            probabilistic_model=probabilistic_model
+        )
+        var_symbols = []
+        for dist in dists_model:
+            var_symbols.append(dist.symbol)
+        multivariate_distribution = plot.setup_mul_dist(probabilistic_model)
+        latex_string_list = multivariate_distribution.latex_repr(var_symbols)
+        figure_collections = plot.sort_plotted_figures(probabilistic_model)
+        return render(request,
+                      'contour/fit_results.html',
+                      {'pk': probabilistic_model.pk,
+                       'figure_collections': figure_collections,
+                       'latex_string_list': latex_string_list
+                       }
+                      )
+
     @staticmethod
     def new_fit(request, pk):
         """
@@ -391,12 +438,11 @@ class MeasureFileHandler(Handler):
             return redirect('contour:index')
         else:
             plot.ProbabilisticModel.objects.all().filter(pk=pk).delete()
-            user_files = MeasureFileModel.objects.all().filter(
-                primary_user=request.user
-            )
+            context = paginate(request,
+                               user_items(request.user, MeasureFileModel))
             return render(request,
                           'contour/measure_file_model_select.html',
-                          {'context': user_files}
+                          {'context': context}
                           )
 
     @staticmethod
@@ -409,9 +455,8 @@ class MeasureFileHandler(Handler):
             return redirect('contour:index')
         else:
             measure_file_model = MeasureFileModel.objects.get(pk=pk)
-            var_names, var_symbols = get_info_from_file(
-                measure_file_model.measure_file.url
-            )
+            var_names, var_symbols = measure_data.load_header(
+                measure_file_model)
             directory_prefix = settings.PATH_MEDIA
             directory_after_static = settings.PATH_USER_GENERATED + \
                                      str(request.user) + \
@@ -445,12 +490,12 @@ class ProbabilisticModelHandler(Handler):
         if request.user.is_anonymous:
             return redirect('contour:index')
         else:
-            user_pm = models.ProbabilisticModel.objects.all().filter(
+            user_pm = models.ProbabilisticModel.objects.filter(
                 primary_user=request.user
-            )
+            ).order_by('-pk')
             return render(request,
                           'contour/probabilistic_model_select.html',
-                          {'context': user_pm}
+                          {'context': paginate(request, user_pm)}
                           )
 
     @staticmethod
@@ -597,7 +642,7 @@ class ProbabilisticModelHandler(Handler):
     @staticmethod
     def iform_calc(request, var_names, var_symbols, probabilistic_model):
         """
-        Calls the IFORM contour calculation and handles errors if they occur.
+        Submits the IFORM contour calculation as a job.
 
         Parameters
         ----------
@@ -615,80 +660,32 @@ class ProbabilisticModelHandler(Handler):
         Returns
         -------
         response : HttpResponse,
-            Renders an html response showing contour or the error message.
+            Renders the settings page or redirects to the job's page.
         """
         if request.user.is_anonymous:
             return redirect('contour:index')
         else:
             iform_form = forms.IFormForm()
-            cs = ComputeInterface
             if request.method == 'POST':
                 iform_form = forms.IFormForm(data=request.POST)
                 if iform_form.is_valid():
-                    try:
-                        with warnings.catch_warnings(record=True) as warn:
-                            contour_coordinates = cs.iform(
-                                probabilistic_model,
-                                float(iform_form.cleaned_data['return_period']),
-                                float(iform_form.cleaned_data['sea_state']),
-                                iform_form.cleaned_data['n_steps'])
-                            validate_contour_coordinates(contour_coordinates)
-                            environmental_contour = EnvironmentalContour(
-                                primary_user=request.user,
-                                fitting_method="",
-                                contour_method="Inverse first order reliability "
-                                               "method (IFORM)",
-                                return_period=float(
-                                    iform_form.cleaned_data['return_period']),
-                                state_duration=float(
-                                    iform_form.cleaned_data['sea_state']),
-                                probabilistic_model=probabilistic_model
-                            )
-                            # Save the environmental contour here that it gets
-                            # a primary key.
-                            environmental_contour.save()
-                            additional_contour_options = []
-                            additional_contour_option = AdditionalContourOption(
-                                option_key="Number of points on the contour",
-                                option_value=iform_form.cleaned_data['n_steps'],
-                                environmental_contour=environmental_contour
-                            )
-                            additional_contour_options.append(
-                                additional_contour_option)
-                            save_environmental_contour(
-                                environmental_contour,
-                                additional_contour_options,
-                                contour_coordinates,
-                                str(request.user))
-                    # Catch and allocate errors caused by calculating iform.
-                    except (ValidationError, RuntimeError, IndexError, TypeError,
-                            NameError, KeyError, Exception) as err:
-                        return render(
-                            request,
-                            'contour/error.html',
-                            {'error_message': err,
-                             'text': CONTOUR_CALCULATION_ERROR_MSG,
-                             'header': 'Calculate contour',
-                             'return_url': 'contour:probabilistic_model_select'})
-                    try:
-                        plot.create_latex_report(contour_coordinates,
-                                                 str(request.user),
-                                                 environmental_contour,
-                                                 var_names,
-                                                 var_symbols)
-                    except (ValueError) as err:
-                        return render(
-                            request,
-                            'contour/error.html',
-                            {'error_message': err,
-                             'text': CONTOUR_REPORT_ERROR_MSG,
-                             'header': 'Report of the contour',
-                             'return_url': 'contour:probabilistic_model_select'}
-                        )
-                    response = ProbabilisticModelHandler.render_calculated_contour(
-                        request, environmental_contour, contour_coordinates,
-                        probabilistic_model, warn)
-                    return response
+                    parameters = {
+                        'return_period': float(
+                            iform_form.cleaned_data['return_period']),
+                        'state_duration': float(
+                            iform_form.cleaned_data['sea_state']),
+                        'n_steps': iform_form.cleaned_data['n_steps']}
+                    add_return_periods(
+                        parameters,
+                        iform_form.cleaned_data['further_return_periods'])
+                    job = ComputeJob(
+                        primary_user=request.user,
+                        job_type=ComputeJob.IFORM,
+                        probabilistic_model=probabilistic_model,
+                        parameters=json.dumps(parameters)
+                    )
+                    jobs.submit_job(job)
+                    return redirect('contour:compute_job_show', job.pk)
                 else:
                     return render(request,
                                   'contour/contour_settings.html',
@@ -703,7 +700,7 @@ class ProbabilisticModelHandler(Handler):
     @staticmethod
     def hdc_calc(request, var_names, var_symbols, probabilistic_model):
         """
-        Calls the HDC calculation and handles errors if they occur.
+        Submits the HDC calculation as a job.
 
         Parameters
         ----------
@@ -721,98 +718,40 @@ class ProbabilisticModelHandler(Handler):
         Returns
         -------
         response : HttpResponse,
-            Renders an html response showing contour or the error message.
+            Renders the settings page or redirects to the job's page.
         """
         if request.user.is_anonymous:
             return redirect('contour:index')
         else:
             hdc_form = forms.HDCForm(var_names=var_names)
-            cs = ComputeInterface()
             if request.method == 'POST':
                 hdc_form = forms.HDCForm(data=request.POST, var_names=var_names)
                 if hdc_form.is_valid():
                     limits = []
                     deltas = []
-                    warn = None
-                    contour_coordinates = None
                     for i in range(len(var_names)):
                         limits.append(
                             (float(hdc_form.cleaned_data['limit_%s' % i + '_1']),
                              float(hdc_form.cleaned_data['limit_%s' % i + '_2'])))
                         deltas.append(float(hdc_form.cleaned_data['delta_%s' % i]))
-                    try:
-                        with warnings.catch_warnings(record=True) as warn:
-                            contour_coordinates = cs.hdc(
-                                probabilistic_model,
-                                float(hdc_form.cleaned_data['n_years']),
-                                float(hdc_form.cleaned_data['sea_state']),
-                                limits, deltas)
-                            validate_contour_coordinates(contour_coordinates)
-                            environmental_contour = EnvironmentalContour(
-                                primary_user=request.user,
-                                fitting_method="",
-                                contour_method="Highest density contour (HDC) "
-                                               "method",
-                                return_period=float(
-                                    hdc_form.cleaned_data['n_years']),
-                                state_duration=float(
-                                    hdc_form.cleaned_data['sea_state']),
-                                probabilistic_model=probabilistic_model
-                            )
-                            # Save the environmental contour here that it gets
-                            # a primary key.
-                            environmental_contour.save()
-                            additional_contour_options = []
-                            additional_contour_option = AdditionalContourOption(
-                                option_key="Limits of the grid",
-                                option_value=" ".join(map(str, limits)),
-                                environmental_contour=environmental_contour
-                            )
-                            additional_contour_options.append(
-                                additional_contour_option)
-                            additional_contour_option = AdditionalContourOption(
-                                option_key="Grid cell size ($\Delta x_i$)",
-                                option_value=" ".join(map(str, deltas)),
-                                environmental_contour=environmental_contour
-                            )
-                            additional_contour_options.append(
-                                additional_contour_option)
-                            save_environmental_contour(
-                                environmental_contour,
-                                additional_contour_options,
-                                contour_coordinates,
-                                str(request.user))
-                    # Catch and allocate errors caused by calculating a HDC.
-                    except (TimeoutError, ValidationError, RuntimeError,
-                            IndexError, TypeError, NameError, KeyError) as err:
-                        return render(
-                            request,
-                            'contour/error.html',
-                            {'error_message': err,
-                             'text': CONTOUR_CALCULATION_ERROR_MSG,
-                             'header': 'Calculate contour',
-                             'return_url': 'contour:probabilistic_model_select'}
-                        )
-
-                    try:
-                        plot.create_latex_report(contour_coordinates,
-                                                 str(request.user),
-                                                 environmental_contour,
-                                                 var_names,
-                                                 var_symbols)
-                    except (ValueError) as err:
-                        return render(
-                            request,
-                            'contour/error.html',
-                            {'error_message': err,
-                             'text': CONTOUR_REPORT_ERROR_MSG,
-                             'header': 'Report of the contour',
-                             'return_url': 'contour:probabilistic_model_select'}
-                        )
-                    response = ProbabilisticModelHandler.render_calculated_contour(
-                        request, environmental_contour, contour_coordinates,
-                        probabilistic_model, warn)
-                    return response
+                    parameters = {
+                        'return_period': float(
+                            hdc_form.cleaned_data['n_years']),
+                        'state_duration': float(
+                            hdc_form.cleaned_data['sea_state']),
+                        'limits': limits,
+                        'deltas': deltas}
+                    add_return_periods(
+                        parameters,
+                        hdc_form.cleaned_data['further_return_periods'])
+                    job = ComputeJob(
+                        primary_user=request.user,
+                        job_type=ComputeJob.HDC,
+                        probabilistic_model=probabilistic_model,
+                        parameters=json.dumps(parameters)
+                    )
+                    jobs.submit_job(job)
+                    return redirect('contour:compute_job_show', job.pk)
                 else:
                     return render(request, 'contour/contour_settings.html',
                                   {'form': hdc_form}
@@ -840,7 +779,7 @@ class ProbabilisticModelHandler(Handler):
         probabilistic_model : ProbabilisticModel,
             The ProbabilisticModel, which was used to calculate the
             EnvironmentalContour
-        warn : list of warning,
+        warn : list of str,
             Warnings can get raised during the calculation of the contour.
             Then the user will be presented these warnings.
 
@@ -867,7 +806,8 @@ class ProbabilisticModelHandler(Handler):
                            'z': contour_coordinates[0][2].tolist(),
                            'u': contour_coordinates[0][3].tolist(),
                            'dim': 4,
-                           'labels': labels}
+                           'labels': labels,
+                           'warn': warn}
                           )
         # If the probabilistic model is 3-dimensional send data for a 3D
         # interactive plot
@@ -885,12 +825,14 @@ class ProbabilisticModelHandler(Handler):
                            'y': contour_coordinates[0][1].tolist(),
                            'z': contour_coordinates[0][2].tolist(),
                            'dim': 3,
-                           'labels': labels})
+                           'labels': labels,
+                           'warn': warn})
 
-        elif len(contour_coordinates) < 3:
+        else:
             response = render(request,
                           'contour/environmental_contour_show.html',
-                          {'object': environmental_contour, 'dim': 2}
+                          {'object': environmental_contour, 'dim': 2,
+                           'warn': warn}
                           )
         return response
 
@@ -959,7 +901,8 @@ class EnvironmentalContourHandler(Handler):
 
     @staticmethod
     def overview(request, collection=models.EnvironmentalContour):
-        return Handler.overview(request, collection)
+        return Handler.overview(request, collection,
+                                ('primary_user', 'probabilistic_model'))
 
     @staticmethod
     def delete(request, pk, collection=models.EnvironmentalContour):
@@ -978,237 +921,122 @@ class EnvironmentalContourHandler(Handler):
         return Handler.delete(request, pk, collection)
 
 
-def save_fitted_prob_model(fit, model_title, var_names, var_symbols, user,
-                           measure_file):
+class ComputeJobHandler:
+    """
+    Handler for ComputeJob objects, i.e. computations running in the background
     """
-    Saves a probabilistic model which was fitted to measurement data.
 
-    Parameters
-    ----------
-    fit : Fit
-        Calculated fit results of a measurement file.
-    model_title : str
-        Title of the probabilistic model.
-    var_names : list of str
-        Names of the variables.
-    var_symbols : list of str
-        Names of the symbols of the probabilistic model's variables.
-    user : str
-        Name of a user.
-    measure_file : MeasureFileModel
-        MeasureFileModel object linked to the probabilistic model.
+    @staticmethod
+    def overview(request):
+        """
+        Shows the user's jobs, the newest first.
 
-    Returns
-    -------
-    ProbabilisticModel
-        Which was fitted to measurement data
+        Parameters
+        ----------
+        request : HttpRequest,
+            The HttpRequest to show the overview.
 
-    """
-    probabilistic_model = ProbabilisticModel(primary_user=user,
-                                             collection_name=model_title,
-                                             measure_file_model=measure_file)
-    probabilistic_model.save()
-
-    for i, dist in enumerate(fit.mul_var_dist.distributions):
-        if dist.name == 'Lognormal':
-            dist_name = "Lognormal_2"
-
-            distribution_model = DistributionModel(name=var_names[i],
-                                                   symbol=var_symbols[i],
-                                                   probabilistic_model=probabilistic_model,
-                                                   distribution=dist_name)
-            distribution_model.save()
-            save_parameter(dist.shape, distribution_model,
-                           fit.mul_var_dist.dependencies[i][0], 'shape')
-            save_parameter(dist.loc, distribution_model,
-                           fit.mul_var_dist.dependencies[i][1], 'loc')
-            save_parameter(dist.mu, distribution_model,
-                           fit.mul_var_dist.dependencies[i][2], 'scale')
+        Returns
+        -------
+        response : HttpResponse,
+            Renders an html response listing the jobs.
+        """
+        if request.user.is_anonymous:
+            return redirect('contour:index')
         else:
-            distribution_model = DistributionModel(name=var_names[i],
-                                                   symbol=var_symbols[i],
-                                                    probabilistic_model=probabilistic_model,
-                                                   distribution=dist.name)
-            distribution_model.save()
-            save_parameter(dist.shape, distribution_model,
-                           fit.mul_var_dist.dependencies[i][0], 'shape')
-            save_parameter(dist.loc, distribution_model,
-                           fit.mul_var_dist.dependencies[i][1], 'loc')
-            save_parameter(dist.scale, distribution_model,
-                           fit.mul_var_dist.dependencies[i][2], 'scale')
-
-    return probabilistic_model
-
-
-def save_environmental_contour(environmental_contour,
-                           additional_contour_options,
-                           contour_coordinates,
-                           user):
-    """
-    Saves an EnvironmentalContour object and its depending models to the data
-    base.
-
-
-    Parameters
-    ----------
-    environmental_contour : EnvironmentalContour,
-        The environmental contour obect that should be saved.
-    additional_contour_options : list of AdditionalContourOption,
-        Options, whch are specific to the contour and are not general
-        environmental contour options.
-    contour_coordinates : list of list of numpy.ndarray,
-        Contains the coordinates of points on the contour.
-        The outer list contains can hold multiple contour paths if the
-        distribution is multimodal. The inner list contains multiple
-        numpy arrays of the same length, one per dimension.
-        The values of the arrays are the coordinates in the corresponding
-        dimension.
-    user : str,
-        The user who should own the environmental contour.
+            user_jobs = ComputeJob.objects.filter(
+                primary_user=request.user).select_related(
+                'measure_file_model', 'probabilistic_model').order_by(
+                '-created', '-pk')
+            return render(request,
+                          'contour/compute_job_overview.html',
+                          {'context': paginate(request, user_jobs)})
 
-    Returns
-    -------
+    @staticmethod
+    def show(request, pk):
+        """
+        Shows the job's progress or, once it is finished, its result.
 
-    """
-    # Only save the object if it has not been saved yet.
-    if environmental_contour.pk is None:
-        environmental_contour.save()
-    path = settings.PATH_MEDIA + \
-           settings.PATH_USER_GENERATED + \
-           user + \
-           '/contour/' + str(environmental_contour.pk)
-    environmental_contour.path_of_statics = path
-    environmental_contour.save(
-        update_fields=['path_of_statics'])
-    for additional_contour_option in additional_contour_options:
-        # It is necessary to create a new AdditionalContourObject because the
-        # original object was created with an environmental contour, which has
-        # been saved yet and consequently does not have a primary key.
-        additional_contour_option_w_pk = AdditionalContourOption(
-            option_key=additional_contour_option.option_key,
-            option_value=additional_contour_option.option_value,
-            environmental_contour=environmental_contour)
-        additional_contour_option_w_pk.save()
-    # Saving all coordinates to the database is slow since a lot of operations
-    # might be necessary. Consequenetly, this can be turned off.
-    if DO_SAVE_CONTOUR_COORDINATES_IN_DB:
-        for i in range(len(contour_coordinates)):
-            contour_path = ContourPath(
-                environmental_contour=environmental_contour)
-            contour_path.save()
-            for j in range(len(contour_coordinates[i])):
-                EEDC = ExtremeEnvDesignCondition(
-                    contour_path=contour_path)
-                EEDC.save()
-                for k in range(len(contour_coordinates[i][j])):
-                    eedc_scalar = EEDCScalar(
-                        x=float(contour_coordinates[i][j][k]),
-                        EEDC=EEDC)
-                    eedc_scalar.save()
-    return environmental_contour
-
-
-def save_parameter(parameter, distribution_model, dependency, name):
-    """
-    Saves a fitted parameter and links it to a DistributionModel.
+        Parameters
+        ----------
+        request : HttpRequest,
+            The HttpRequest to show the job.
+        pk : int,
+            Primary key of the job.
 
-    Parameters
-    ----------
-    parameter : ConstantParam or FunctionParam
-        ConstantParam is a float value. FunctionParam contains a whole function
-        like power function or exponential.
-    distribution_model : DistributionModel
-        The parameter will be linked to this DistributionModel.
-    dependency : int
-        The dimension the dependency is based on.
-    name : str
-        Name of the parameter ('shape', 'loc' or 'scale')
-    """
-    if type(parameter) == params.ConstantParam:
-        parameter_model = ParameterModel(function='None',
-                                         x0=parameter(0),
-                                         dependency='!',
-                                         distribution=distribution_model,
-                                         name=name)
-        parameter_model.save()
-    elif type(parameter) == params.FunctionParam:
-        parameter_model = ParameterModel(function=parameter.func_name,
-                                         x0=parameter.a,
-                                         x1=parameter.b,
-                                         x2=parameter.c,
-                                         dependency=dependency,
-                                         distribution=distribution_model,
-                                         name=name)
-        parameter_model.save()
-    else:
-        parameter_model = ParameterModel(function='None',
-                                         x0=0,
-                                         dependency='!',
-                                         distribution=distribution_model,
-                                         name=name)
-        parameter_model.save()
-
-
-def get_info_from_file(url):
-    """	
-    Reads the variable names and symbols form a csv. file.
-    
-    Parameters
-    ----------
-    url : str
-        Path to the csv file.
+        Returns
+        -------
+        response : HttpResponse,
+            Renders the progress page, the calculated contour or the error
+            message.
+        """
+        if request.user.is_anonymous:
+            return redirect('contour:index')
+        else:
+            job = get_object_or_404(ComputeJob, pk=pk,
+                                    primary_user=request.user)
+            is_fit = job.job_type == ComputeJob.FIT
+            if job.status == ComputeJob.FAILED:
+                if is_fit:
+                    return render(
+                        request,
+                        'contour/error.html',
+                        {'error_message': job.error_message,
+                         'text': FITTING_ERROR_MSG,
+                         'header': 'Fit measurement file to probabilistic '
+                                   'model',
+                         'return_url': 'contour:measure_file_model_select'})
+                return render(
+                    request,
+                    'contour/error.html',
+                    {'error_message': job.error_message,
+                     'text': CONTOUR_CALCULATION_ERROR_MSG,
+                     'header': 'Calculate contour',
+                     'return_url': 'contour:probabilistic_model_select'})
+            elif job.status == ComputeJob.DONE:
+                if is_fit:
+                    return MeasureFileHandler.render_fit_results(
+                        request, job.probabilistic_model)
+                environmental_contour = job.environmental_contour
+                contour_coordinates = environmental_contour.contour_coordinates()
+                return ProbabilisticModelHandler.render_calculated_contour(
+                    request, environmental_contour, contour_coordinates,
+                    job.probabilistic_model, job.get_warning_messages())
+            elif is_fit:
+                return render(request,
+                              'contour/fit_results.html',
+                              {'job': job})
+            else:
+                return render(request,
+                              'contour/compute_job_show.html',
+                              {'job': job})
 
-    Returns
-    -------
-    var_names : list of strings
-        Names of the environmental variables used in csv file,
-        e.g. ['wind speed [m/s]', 'significant wave height [m]']
-    var_symbols : list of strings
-        Symbols of the environental variables used in the csv file,
-        e.g. ['V', 'Hs']
-    """
-    if url[0] == '/':
-        url = url[1:]
-    if url[0:8] == 'https://':
-        req = request.Request(url)
-        print('Trying to urlopen the url: ' + str(url))
-        with request.urlopen(req) as response:
-            reader = csv.reader(codecs.iterdecode(response, 'utf-8'), delimiter=';').__next__()
-            var_names, var_symbols = get_info_from_reader(reader)
-    else:
-        with open(url, 'r') as file:
-            reader = csv.reader(file, delimiter=';').__next__()
-            var_names, var_symbols = get_info_from_reader(reader)
-
-    return var_names, var_symbols
-
-
-def get_info_from_reader(reader):
-    """
-    Reads the variable names and symbols form a reader
+    @staticmethod
+    def status(request, pk):
+        """
+        Returns the job's status and progress such that its page can poll it.
 
-    Parameters
-    ----------
-    reader : csv.Reader
-        A Reader object that can read a file line by line.
-        See https://docs.python.org/2/library/csv.html#reader-objects for
-        a proper documentation.
+        Parameters
+        ----------
+        request : HttpRequest,
+            The HttpRequest to get the status.
+        pk : int,
+            Primary key of the job.
 
-    Returns
-    -------
-    var_names : list of str
-        Names of the environmental variables used in csv file,
-        e.g. ['wind speed [m/s]', 'significant wave height [m]']
-    var_symbols : list of str
-        Symbols of the environental variables used in the csv file,
-        e.g. ['V', 'Hs']
-    """
-    var_names = []
-    var_symbols = []
-    i = 0
-    while i < (len(reader)):
-        var_names.append(reader[i])
-        i += 1
-        var_symbols.append(reader[i])
-        i += 1
-    return var_names, var_symbols
+        Returns
+        -------
+        response : JsonResponse,
+            Contains the job's status, whether it is finished, its current
+            stage, the share of finished stages and the stages' durations.
+        """
+        if request.user.is_anonymous:
+            return JsonResponse({'error': 'Not logged in.'}, status=403)
+        else:
+            job = get_object_or_404(ComputeJob, pk=pk,
+                                    primary_user=request.user)
+            return JsonResponse({'status': job.status,
+                                 'is_finished': job.is_finished(),
+                                 'stage': job.stage,
+                                 'stages': job.stages(),
+                                 'progress': job.progress(),
+                                 'stage_timings': job.get_stage_timings()})
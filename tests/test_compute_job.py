@@ -0,0 +1,315 @@
+from django.test import TestCase, Client, override_settings
+from django.core.urlresolvers import reverse
+from contour.models import ComputeJob, ContourCacheEntry, \
+    ProbabilisticModel, User
+from contour import jobs
+from multiprocessing import Process, Value
+from unittest import mock
+import os
+import time
+import warnings
+import numpy as np
+
+
+# Process id of the computation, which stubborn_worker() started.
+computation_pid = Value('i', 0)
+
+
+def stubborn_worker(polling_interval, current_job, job_started):
+    """
+    Stands in for jobs.run_worker(): Starts its own process group and a
+    computation, which does not stop by itself.
+    """
+    os.setsid()
+    computation = Process(target=time.sleep, args=(60, ))
+    computation.start()
+    computation_pid.value = computation.pid
+    computation.join()
+
+
+def is_running(pid):
+    """
+    Returns if a process is running, zombies, which are not reaped yet, do
+    not count.
+    """
+    try:
+        with open('/proc/{}/stat'.format(pid)) as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out.')
+        time.sleep(0.05)
+
+
+class ComputeJobTestCase(TestCase):
+
+    def setUp(self):
+        # Login
+        self.client = Client()
+        self.client.post(reverse('user:authentication'),
+                         {'username': 'max_mustermann',
+                          'password': 'Musterpasswort2018'})
+        self.user = User.objects.get(username='max_mustermann')
+
+        # Create a form containing the information of a 2D probabilistic model
+        form_input_dict = {
+            'variable_name_0': 'significant wave height [m]',
+            'variable_symbol_0': 'Hs',
+            'distribution_0': 'Weibull',
+            'scale_0_0': '2.776',
+            'shape_0_0': '1.471',
+            'location_0_0': '0.888',
+            'variable_name_1': 'peak period [s]',
+            'variable_symbol_1': 'Tp',
+            'distribution_1': 'Lognormal_2',
+            'scale_dependency_1': '0f1',
+            'scale_1_0': '0.1',
+            'scale_1_1': '1.489',
+            'scale_1_2': '0.1901',
+            'shape_dependency_1': '0f2',
+            'shape_1_0': '0.04',
+            'shape_1_1': '0.1748',
+            'shape_1_2': '-0.2243',
+            'location_dependency_1': '!None',
+            'location_1_0': '0',
+            'location_1_1': '0',
+            'location_1_2': '0',
+            'collection_name': 'direct input Vanem2012'
+        }
+        self.client.post(reverse('contour:probabilistic_model_add',
+                                 args=['02']),
+                         form_input_dict,
+                         follow=True)
+        self.probabilistic_model = ProbabilisticModel.objects.get(pk=1)
+
+    def test_job_can_only_be_claimed_once(self):
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.IFORM,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"state_duration": 3, "n_steps": 20}')
+        job.save()
+        self.assertTrue(jobs.claim_job(job.pk))
+        self.assertFalse(jobs.claim_job(job.pk))
+        self.assertIsNone(jobs.claim_next_job())
+
+    def test_interrupted_jobs_are_failed(self):
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.IFORM,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"state_duration": 3, "n_steps": 20}')
+        job.save()
+        # The worker publishes the job, which it claims, to the pool.
+        current_job = Value('i', 0)
+        job_started = Value('d', 0.0)
+        self.assertEqual(jobs.claim_next_job(current_job, job_started), job)
+        self.assertEqual(current_job.value, job.pk)
+
+        # The pool was restarted before the job finished.
+        self.assertEqual(jobs.fail_interrupted_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ComputeJob.FAILED)
+        self.assertEqual(job.error_message, jobs.INTERRUPTED_JOB_MSG)
+        self.assertEqual(jobs.fail_interrupted_jobs(), 0)
+
+    def test_warnings_are_attached_to_the_job(self):
+        def warn_twice(job):
+            for _ in range(2):
+                warnings.warn('The limit could not be reached.',
+                              RuntimeWarning)
+
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.IFORM,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"state_duration": 3, "n_steps": 20}')
+        job.save()
+        self.assertTrue(jobs.claim_job(job.pk))
+        with mock.patch.dict(jobs.JOB_FUNCTIONS,
+                             {ComputeJob.IFORM: warn_twice}):
+            jobs.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ComputeJob.DONE)
+        self.assertEqual(job.get_warning_messages(),
+                         ['The limit could not be reached.'])
+
+    def test_worker_running_too_long_is_killed(self):
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.HDC,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"state_duration": 3}')
+        job.save()
+        self.assertTrue(jobs.claim_job(job.pk))
+
+        # A worker, whose computation does not stop by itself and runs in a
+        # process, which the worker started.
+        computation_pid.value = 0
+        with mock.patch.object(jobs, 'run_worker', stubborn_worker), \
+                mock.patch.object(jobs.connections, 'close_all'):
+            workers = [jobs.WorkerProcess(polling_interval=1).start()]
+            worker = workers[0]
+            wait_until(lambda: computation_pid.value != 0)
+            pid = computation_pid.value
+            self.assertIsNone(worker.running_time())
+            worker.job_started.value = time.monotonic() - 10
+            worker.current_job.value = job.pk
+            self.assertGreaterEqual(worker.running_time(), 10)
+
+            jobs.supervise_workers(workers, polling_interval=1, max_time=5)
+        try:
+            self.assertFalse(worker.process.is_alive())
+            wait_until(lambda: not is_running(pid))
+            job.refresh_from_db()
+            self.assertEqual(job.status, ComputeJob.FAILED)
+            self.assertIn('ran longer than 5 s', job.error_message)
+            # A job, which is not running anymore, cannot be cancelled.
+            self.assertFalse(jobs.cancel_job(job.pk, 'Cancelled again.'))
+            # A new worker took the killed worker's place.
+            self.assertIsNot(workers[0], worker)
+            self.assertTrue(workers[0].process.is_alive())
+            self.assertEqual(workers[0].current_job.value, 0)
+        finally:
+            workers[0].kill()
+
+    def test_hdc_sweep_running_too_long_fails(self):
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.HDC,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"return_periods": [1, 10], '
+                                    '"state_duration": 3, '
+                                    '"limits": [[0, 20], [0, 20]], '
+                                    '"deltas": [0.01, 0.01]}')
+        job.save()
+        self.assertTrue(jobs.claim_job(job.pk))
+        with mock.patch.object(jobs, 'computing_time', return_value=0.01):
+            jobs.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ComputeJob.FAILED)
+        self.assertIn('takes too long', job.error_message)
+
+    def test_hdc_sweep_keeps_its_warnings(self):
+        # The grid is too small for the return periods.
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.HDC,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"return_periods": [1, 10], '
+                                    '"state_duration": 3, '
+                                    '"limits": [[0, 1], [0, 1]], '
+                                    '"deltas": [0.5, 0.5]}')
+        job.save()
+        self.assertTrue(jobs.claim_job(job.pk))
+        jobs.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ComputeJob.DONE)
+        # The warning was raised in the pool's process.
+        self.assertTrue(any('could not be reached' in message
+                            for message in job.get_warning_messages()))
+
+    # Since this test is affected by whitenoise, we deactive it here, see:
+    # https://stackoverflow.com/questions/30638300/django-test-redirection-fail
+    @override_settings(STATICFILES_STORAGE=None)
+    def test_pending_job_shows_progress(self):
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.IFORM,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"state_duration": 3, "n_steps": 20}')
+        job.save()
+        response = self.client.get(reverse('contour:compute_job_show',
+                                           kwargs={'pk': job.pk}))
+        self.assertContains(response, 'runs in the background',
+                            status_code=200)
+        response = self.client.get(reverse('contour:compute_job_status',
+                                           kwargs={'pk': job.pk}))
+        self.assertEqual(response.json()['status'], 'pending')
+        self.assertFalse(response.json()['is_finished'])
+        self.assertEqual(response.json()['progress'], 0)
+
+        # Run the job like a worker process would do it.
+        job = jobs.claim_next_job()
+        jobs.run_job(job)
+        response = self.client.get(reverse('contour:compute_job_status',
+                                           kwargs={'pk': job.pk}))
+        self.assertEqual(response.json()['status'], 'done')
+        self.assertTrue(response.json()['is_finished'])
+        self.assertEqual(response.json()['progress'], 1)
+        # Each stage was timed on its own.
+        self.assertEqual(sorted(response.json()['stage_timings'].keys()),
+                         ['compute', 'persist', 'report'])
+        response = self.client.get(reverse('contour:compute_job_show',
+                                           kwargs={'pk': job.pk}))
+        self.assertContains(response, 'Download report', status_code=200)
+
+        response = self.client.get(reverse('contour:compute_job_overview'))
+        self.assertContains(response, 'IFORM contour', status_code=200)
+
+        # Delete the environmental contour to avoid amassing .png and .pdf
+        # files each time the test is run.
+        self.client.get(reverse('contour:environmental_contour_delete',
+                                kwargs={'pk': job.environmental_contour.pk}),
+                        follow=True)
+
+    # Since this test is affected by whitenoise, we deactive it here, see:
+    # https://stackoverflow.com/questions/30638300/django-test-redirection-fail
+    @override_settings(STATICFILES_STORAGE=None)
+    def test_failed_job_shows_error(self):
+        # A HDC without any grid limits cannot be computed.
+        job = ComputeJob(primary_user=self.user,
+                         job_type=ComputeJob.HDC,
+                         probabilistic_model=self.probabilistic_model,
+                         parameters='{"return_period": 1, '
+                                    '"state_duration": 3}')
+        jobs.submit_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ComputeJob.FAILED)
+        response = self.client.get(reverse('contour:compute_job_show',
+                                           kwargs={'pk': job.pk}))
+        self.assertContains(response, 'Error', status_code=200)
+
+    @override_settings(STATICFILES_STORAGE=None)
+    def test_repeated_contour_is_served_from_cache(self):
+        parameters = '{"return_period": 1, "state_duration": 3, ' \
+                     '"limits": [[0, 10], [0, 20]], "deltas": [0.5, 0.5]}'
+        first_job = jobs.submit_job(ComputeJob(
+            primary_user=self.user,
+            job_type=ComputeJob.HDC,
+            probabilistic_model=self.probabilistic_model,
+            parameters=parameters))
+        first_job.refresh_from_db()
+        self.assertEqual(first_job.status, ComputeJob.DONE)
+        self.assertEqual(ContourCacheEntry.objects.count(), 1)
+
+        second_job = jobs.submit_job(ComputeJob(
+            primary_user=self.user,
+            job_type=ComputeJob.HDC,
+            probabilistic_model=self.probabilistic_model,
+            parameters=parameters))
+        second_job.refresh_from_db()
+        self.assertEqual(second_job.status, ComputeJob.DONE)
+        self.assertEqual(second_job.environmental_contour,
+                         first_job.environmental_contour)
+        # The coordinates are loaded from the binary arrays without copying.
+        contour_coordinates = \
+            second_job.environmental_contour.contour_coordinates()
+        self.assertEqual(len(contour_coordinates[0]), 2)
+        self.assertEqual(contour_coordinates[0][0].dtype, np.float64)
+        self.assertFalse(contour_coordinates[0][0].flags.writeable)
+        response = self.client.get(reverse('contour:compute_job_show',
+                                           kwargs={'pk': second_job.pk}))
+        self.assertContains(response, 'Download report', status_code=200)
+
+        # Deleting the contour removes the cache entry.
+        self.client.get(reverse('contour:environmental_contour_delete',
+                                kwargs={'pk': first_job.environmental_contour.pk}),
+                        follow=True)
+        self.assertEqual(ContourCacheEntry.objects.count(), 0)
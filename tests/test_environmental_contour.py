@@ -1,6 +1,13 @@
 from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core.urlresolvers import reverse
-from contour.forms import HDCForm
+from django.db import connection
+from contour.compute_interface import ComputeInterface
+from contour.forms import HDCForm, IFormForm
+from contour.jobs import save_contour_path_rows
+from contour.models import EnvironmentalContour, ContourPath, EEDCScalar, \
+    ProbabilisticModel
+import numpy as np
 
 
 class EnvironmentalContourTestCase(TestCase):
@@ -218,3 +225,147 @@ class EnvironmentalContourTestCase(TestCase):
         response = self.client.get(reverse('contour:environmental_contour_delete',
                                            kwargs={'pk': 1}),
                                    follow=True)
+
+    # Since this test is affected by whitenoise, we deactive it here, see:
+    # https://stackoverflow.com/questions/30638300/django-test-redirection-fail
+    @override_settings(STATICFILES_STORAGE=None)
+    def test_2d_iform_contours_for_several_return_periods(self):
+        form_input_dict = {
+            'return_period' : '1',
+            'further_return_periods' : '50, 10',
+            'sea_state' : '3',
+            'n_steps' : '50',
+            'method' : 'IFORM'
+        }
+        response = self.client.post(reverse('contour:probabilistic_model_calc',
+                                            kwargs={'pk' : '1',
+                                                    'method': 'I'}),
+                                    form_input_dict,
+                                    follow=True)
+        self.assertContains(response, 'Download report',
+                            status_code=200)
+        environmental_contour = EnvironmentalContour.objects.get(pk=1)
+        self.assertEqual(environmental_contour.get_return_periods(),
+                         [1.0, 10.0, 50.0])
+        path_return_periods = list(ContourPath.objects.filter(
+            environmental_contour=environmental_contour).order_by(
+            'pk').values_list('return_period', flat=True))
+        self.assertEqual([float(return_period) for return_period
+                          in path_return_periods], [1.0, 10.0, 50.0])
+
+        # The 10-year contour matches the one computed on its own.
+        probabilistic_model = ProbabilisticModel.objects.get(pk=1)
+        contours_coordinates = ComputeInterface.iform_sweep(
+            probabilistic_model, [1, 10], 3, 50)
+        contour_coordinates = ComputeInterface.iform(
+            probabilistic_model, 10, 3, 50)
+        for i in range(2):
+            np.testing.assert_allclose(contours_coordinates[1][0][i],
+                                       contour_coordinates[0][i])
+
+        # Too many return periods are rejected.
+        form = IFormForm(data=dict(
+            form_input_dict,
+            further_return_periods=', '.join(str(i) for i in range(2, 20))))
+        self.assertFalse(form.is_valid())
+
+        response = self.client.get(reverse('contour:environmental_contour_delete',
+                                           kwargs={'pk': 1}),
+                                   follow=True)
+
+    # Since this test is affected by whitenoise, we deactive it here, see:
+    # https://stackoverflow.com/questions/30638300/django-test-redirection-fail
+    @override_settings(STATICFILES_STORAGE=None)
+    def test_2d_highest_density_contours_for_several_return_periods(self):
+        form_input_dict = {
+            'limit_0_1' : '0',
+            'limit_0_2' : '20',
+            'delta_0' : '0.5',
+            'limit_1_1' : '0',
+            'limit_1_2' : '20',
+            'delta_1' : '0.5',
+            'n_years' : '1',
+            'further_return_periods' : '10',
+            'sea_state' : '3',
+            'method' : 'HDC'
+        }
+        response = self.client.post(reverse('contour:probabilistic_model_calc',
+                                            kwargs={'pk' : '1',
+                                                    'method': 'H'}),
+                                    form_input_dict,
+                                    follow=True)
+        self.assertContains(response, 'Download report',
+                            status_code=200)
+        environmental_contour = EnvironmentalContour.objects.get(pk=1)
+        self.assertEqual(environmental_contour.get_return_periods(),
+                         [1.0, 10.0])
+
+        # The contours, which are extracted from one grid, match the ones
+        # computed on their own.
+        probabilistic_model = ProbabilisticModel.objects.get(pk=1)
+        limits = [(0, 20), (0, 20)]
+        deltas = [0.5, 0.5]
+        contours_coordinates = ComputeInterface.hdc_sweep(
+            probabilistic_model, [1, 10], 3, limits, deltas)
+        for return_period, sweep_coordinates in zip([1, 10],
+                                                    contours_coordinates):
+            contour_coordinates = ComputeInterface.hdc(
+                probabilistic_model, return_period, 3, limits, deltas)
+            self.assertEqual(len(sweep_coordinates), len(contour_coordinates))
+            for sweep_path, path in zip(sweep_coordinates,
+                                        contour_coordinates):
+                for i in range(2):
+                    np.testing.assert_allclose(sweep_path[i], path[i])
+
+        response = self.client.get(reverse('contour:environmental_contour_delete',
+                                           kwargs={'pk': 1}),
+                                   follow=True)
+
+    def test_contour_path_rows_in_bulk(self):
+        probabilistic_model = ProbabilisticModel.objects.get(pk=1)
+        environmental_contour = EnvironmentalContour.objects.create(
+            primary_user=probabilistic_model.primary_user,
+            fitting_method='',
+            contour_method='',
+            return_period=1,
+            state_duration=3,
+            probabilistic_model=probabilistic_model)
+        path_coordinates = [np.linspace(0, 10, 1000), np.linspace(2, 20, 1000)]
+
+        # Save the rows one by one and in bulk.
+        query_counts = []
+        contour_paths = []
+        for in_bulk in (False, True):
+            contour_path = ContourPath.objects.create(
+                environmental_contour=environmental_contour)
+            with CaptureQueriesContext(connection) as queries:
+                save_contour_path_rows(contour_path, path_coordinates, in_bulk)
+            query_counts.append(len(queries))
+            contour_paths.append(contour_path)
+
+        # Both modes save the same values, but bulk saving needs a few
+        # queries instead of one query per scalar.
+        values = [list(EEDCScalar.objects.filter(
+            EEDC__contour_path=contour_path).order_by('pk').values_list(
+            'x', flat=True)) for contour_path in contour_paths]
+        self.assertEqual(len(values[1]), 2000)
+        self.assertEqual(values[0], values[1])
+        self.assertGreater(query_counts[0], 2000)
+        self.assertLess(query_counts[1], 20)
+
+    def test_contour_path_without_coordinates(self):
+        probabilistic_model = ProbabilisticModel.objects.get(pk=1)
+        environmental_contour = EnvironmentalContour.objects.create(
+            primary_user=probabilistic_model.primary_user,
+            fitting_method='',
+            contour_method='',
+            return_period=1,
+            state_duration=3,
+            probabilistic_model=probabilistic_model)
+        # E.g. a path without points, which the migration did not convert.
+        ContourPath.objects.create(environmental_contour=environmental_contour,
+                                   n_dimensions=2)
+        contour_coordinates = environmental_contour.contour_coordinates()
+        self.assertEqual(len(contour_coordinates), 1)
+        self.assertEqual([len(coordinates) for coordinates
+                          in contour_coordinates[0]], [0, 0])
@@ -0,0 +1,116 @@
+from django.test import TestCase, Client, override_settings
+from django.core.urlresolvers import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import os
+from unittest import mock
+from contour import fit_cache
+from contour.models import FitCacheEntry, ProbabilisticModel, PlottedFigure, \
+    MeasureFileModel
+
+
+@override_settings(STATICFILES_STORAGE=None)
+class FitCacheTestCase(TestCase):
+
+    def setUp(self):
+        # Login
+        self.client = Client()
+        self.client.post(reverse('user:authentication'),
+                           {'username' : 'max_mustermann',
+                            'password': 'Musterpasswort2018'})
+
+        # Create a measurement file
+        test_files_path = os.path.abspath(os.path.join(os.path.dirname( __file__), r'test_files/'))
+        file_name = '1yeardata_vanem2012pdf_withHeader.csv'
+        test_file = open(os.path.join(test_files_path , file_name), 'rb')
+        test_file_simple_uploaded = SimpleUploadedFile(test_file.name,
+                                                       test_file.read())
+        self.client.post(reverse('contour:measure_file_model_add'),
+                                    {'title' : file_name,
+                                     'measure_file' : test_file_simple_uploaded
+                                    })
+        self.form_input_dict = {
+                'title' : 'Test fit',
+                '_significant wave height [m]' : 'significant wave height [m]',
+                'distribution_0' : 'Weibull',
+                'width_of_intervals_0' : '2',
+                '_peak period [s]': 'peak period [s]',
+                'distribution_1' : 'Lognormal_2',
+                'scale_dependency_1' : '0f2',
+                'shape_dependency_1' : '0f1',
+                'location_dependency_1' : '!None'
+            }
+
+    def test_refit_is_served_from_cache(self):
+        response = self.client.post(reverse('contour:measure_file_model_fit',
+                                            kwargs={'pk' : 1}),
+                                    self.form_input_dict,
+                                    follow=True)
+        self.assertContains(response, "visual inspection", status_code=200)
+        self.assertEqual(FitCacheEntry.objects.count(), 1)
+
+        # Fit the same file with the same settings again.
+        self.form_input_dict['title'] = 'Test fit, second time'
+        response = self.client.post(reverse('contour:measure_file_model_fit',
+                                            kwargs={'pk' : 1}),
+                                    self.form_input_dict,
+                                    follow=True)
+        self.assertContains(response, "visual inspection", status_code=200)
+        self.assertEqual(FitCacheEntry.objects.count(), 1)
+        first_model, second_model = ProbabilisticModel.objects.order_by('pk')
+        self.assertEqual(second_model.collection_name, 'Test fit, second time')
+        # The copy has its own figures.
+        self.assertEqual(
+            PlottedFigure.objects.filter(
+                probabilistic_model=first_model).count(),
+            PlottedFigure.objects.filter(
+                probabilistic_model=second_model).count())
+        # The copied figures are inserted in one query.
+        with CaptureQueriesContext(connection) as queries:
+            fit_cache.copy_fitted_prob_model(
+                first_model, 'Test fit, copy', first_model.primary_user,
+                first_model.measure_file_model)
+        figure_writes = [query for query in queries
+                         if 'contour_plottedfigure' in query['sql']
+                         and not query['sql'].startswith('SELECT')]
+        self.assertEqual(len(figure_writes), 1)
+
+        # Other settings lead to another cache entry.
+        self.form_input_dict['width_of_intervals_0'] = '1'
+        self.client.post(reverse('contour:measure_file_model_fit',
+                                 kwargs={'pk' : 1}),
+                         self.form_input_dict,
+                         follow=True)
+        self.assertEqual(FitCacheEntry.objects.count(), 2)
+
+        # The least recently used entry gets evicted.
+        fit_cache.evict(1)
+        self.assertEqual(FitCacheEntry.objects.count(), 1)
+
+        # Deleting the file invalidates the cache.
+        self.client.get(reverse('contour:measure_file_model_delete',
+                                kwargs={'pk': 1}),
+                        follow=True)
+        self.assertEqual(FitCacheEntry.objects.count(), 0)
+
+    def test_file_is_hashed_once(self):
+        measure_file = MeasureFileModel.objects.get(pk=1)
+        self.assertEqual(measure_file.content_hash,
+                         fit_cache.measure_file_hash(measure_file))
+
+        # Neither the fit nor the deletion reads the file again.
+        with mock.patch.object(fit_cache, 'measure_file_hash',
+                               side_effect=AssertionError):
+            response = self.client.post(
+                reverse('contour:measure_file_model_fit', kwargs={'pk' : 1}),
+                self.form_input_dict,
+                follow=True)
+            self.assertContains(response, "visual inspection",
+                                status_code=200)
+            self.assertEqual(FitCacheEntry.objects.get().file_hash,
+                             measure_file.content_hash)
+            self.client.get(reverse('contour:measure_file_model_delete',
+                                    kwargs={'pk': 1}),
+                            follow=True)
+        self.assertEqual(FitCacheEntry.objects.count(), 0)
@@ -3,6 +3,10 @@ from django.core.urlresolvers import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 import os
 from contour.forms import MeasureFileFitForm
+from contour.models import User, ProbabilisticModel, DistributionModel, \
+    ParameterModel, PlottedFigure
+from contour.plot import plot_pdf_with_raw_data, render_figures, \
+    save_fit_figures, sort_plotted_figures, FitModelContext, FigureTask
 
 
 # Since this test is affected by whitenoise, we deactive it here, see:
@@ -152,3 +156,58 @@ class FitProbModelTestCase(TestCase):
                                    follow=True)
         self.assertContains(response, "ploaded measurement files",
                             status_code = 200)
+
+    def test_render_figures_in_parallel(self):
+        figure_tasks = [plot_pdf_with_raw_data(0, None, i, 1.5, 0.5, 2.5,
+                                               'Weibull', [1, 2, 2, 3, 4], [],
+                                               'significant wave height [m]',
+                                               None) for i in range(3)]
+        self.assertEqual(figure_tasks[2].file_name, 'fit_00_None_02.png')
+        png_images = render_figures(figure_tasks, parallel=True)
+        self.assertEqual(len(png_images), 3)
+        for png_image in png_images:
+            self.assertTrue(png_image.startswith(b'\x89PNG'))
+
+    def test_saving_figures_needs_constant_number_of_queries(self):
+        user = User.objects.get(username='max_mustermann')
+        probabilistic_model = ProbabilisticModel.objects.create(
+            primary_user=user, collection_name='Query count')
+        for i, name in enumerate(['Hs', 'Tp']):
+            distribution_model = DistributionModel.objects.create(
+                name=name, symbol=name, distribution='Weibull',
+                probabilistic_model=probabilistic_model)
+            for param_name in ['shape', 'loc', 'scale']:
+                ParameterModel.objects.create(
+                    function='None', x0=1, name=param_name,
+                    distribution=distribution_model)
+
+        # 40 interval plots and 2 parameter overviews.
+        figure_tasks = [FigureTask(None, (), 'fit_01_00_' + str(j) + '.png', 1,
+                                   PlottedFigure.PDF) for j in range(40)]
+        figure_tasks += [FigureTask(None, (), 'fit_' + str(i) + 'scale.png', i,
+                                    PlottedFigure.PARAM_OVERVIEW, 'scale')
+                         for i in range(2)]
+        png_images = [b'\x89PNG'] * len(figure_tasks)
+
+        # Loading the context needs one query for the distributions and one
+        # for all parameters, saving the figures needs one query and counting
+        # the user's storage space another one.
+        with self.assertNumQueries(2):
+            model_context = FitModelContext.load(probabilistic_model)
+        with self.assertNumQueries(2):
+            save_fit_figures(figure_tasks, png_images, model_context)
+        self.assertEqual(PlottedFigure.objects.filter(
+            probabilistic_model=probabilistic_model).count(), 42)
+        self.assertEqual(PlottedFigure.objects.filter(
+            parameter_model__isnull=False).count(), 2)
+
+        # Sorting the figures needs one query for the distributions and one
+        # for all figures.
+        with self.assertNumQueries(2):
+            figure_collections = sort_plotted_figures(probabilistic_model)
+        self.assertEqual(len(figure_collections), 2)
+        self.assertEqual(figure_collections[1].param_name, 'α parameter')
+        self.assertEqual(len(figure_collections[1].pdf_images), 40)
+
+        # Delete the model to avoid amassing .png files.
+        probabilistic_model.delete()
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+import json
+import os
+import subprocess
+import sys
+
+# Modules, which are only needed to compute, to plot or to store files on S3.
+HEAVY_MODULES = ['viroconcom', 'scipy', 'statsmodels', 'pandas', 'shapely',
+                 'descartes', 'matplotlib', 'boto3']
+
+# Run in a fresh interpreter, prints the import time and the heavy modules,
+# which have been imported.
+IMPORT_SCRIPT = '''
+import importlib
+import json
+import os
+import sys
+import time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+start_time = time.perf_counter()
+import django
+django.setup()
+importlib.import_module({urlconf!r})
+duration = time.perf_counter() - start_time
+print(json.dumps([duration, [name for name in {heavy_modules!r}
+                             if name in sys.modules]]))
+'''
+
+
+class ImportTimeTestCase(SimpleTestCase):
+
+    def test_serving_pages_does_not_import_the_scientific_stack(self):
+        # Importing the URL configuration imports the views of all apps, like
+        # a web worker does before it serves the first page.
+        script = IMPORT_SCRIPT.format(settings_module=settings.SETTINGS_MODULE,
+                                      urlconf=settings.ROOT_URLCONF,
+                                      heavy_modules=HEAVY_MODULES)
+        output = subprocess.check_output(
+            [sys.executable, '-c', script], universal_newlines=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        duration, imported_modules = json.loads(output.strip().splitlines()[-1])
+        self.assertEqual(imported_modules, [],
+                         'Setting up Django and importing the views took '
+                         '{:.2f} s.'.format(duration))
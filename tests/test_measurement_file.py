@@ -1,8 +1,14 @@
 from django.test import TestCase, Client, override_settings
 from django.core.urlresolvers import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 import os
+from unittest import mock
+from io import BytesIO, StringIO
+import numpy as np
+from contour import measure_data
 from contour.forms import MeasureFileForm
+from contour.models import MeasureFileModel
 
 
 class UploadFileTestCase(TestCase):
@@ -43,6 +49,35 @@ class UploadFileTestCase(TestCase):
                                     follow=True)
         self.assertContains(response, "scatter plot", status_code = 200)
 
+        # The upload stored a binary copy of the file, which includes the
+        # first data row. Before, the fit parsed the file with header=1 and
+        # dropped this row, the plots kept it.
+        measure_file_model = MeasureFileModel.objects.get(pk=1)
+        self.assertTrue(measure_file_model.data_array)
+        data = measure_data.load_data(measure_file_model)
+        self.assertEqual(data.shape, (70128, 2))
+        self.assertEqual(data.dtype, np.float64)
+        self.assertFalse(data.flags.writeable)
+        np.testing.assert_array_equal(data[0], [3.593, 7.7756])
+        samples = measure_data.load_columns(measure_file_model)
+        self.assertEqual(len(samples), 2)
+        for sample in samples:
+            self.assertEqual(len(sample), 70128)
+            self.assertIsInstance(sample, np.ndarray)
+            self.assertTrue(sample.flags.c_contiguous)
+            self.assertFalse(sample.flags.writeable)
+        var_names = ['significant wave height [m]', 'peak period [s]']
+        self.assertEqual(measure_file_model.get_var_names(), var_names)
+        self.assertEqual(measure_file_model.get_var_symbols(), ['Hs', 'Tp'])
+
+        # Headers, which are missing in the data base, can be backfilled.
+        MeasureFileModel.objects.filter(pk=1).update(var_names='[]',
+                                                     var_symbols='[]')
+        call_command('backfill_measure_file_headers', stdout=StringIO())
+        measure_file_model.refresh_from_db()
+        self.assertEqual(measure_file_model.get_var_names(), var_names)
+        self.assertEqual(measure_file_model.get_var_symbols(), ['Hs', 'Tp'])
+
         # Then share the file with another user. First show the view.
         response = self.client.get(reverse('contour:measure_file_model_update',
                                            kwargs={'pk': 1}),
@@ -74,3 +109,83 @@ class UploadFileTestCase(TestCase):
                                    follow=True)
         self.assertContains(response, "Uploaded measurement files",
                             status_code = 200)
+
+    def test_every_data_row_is_parsed(self):
+        f = BytesIO(b'significant wave height [m];Hs;peak period [s];Tp\r\n'
+                    b'3.593;7.7756\r\n'
+                    b'2.4158;6.5312\r\n'
+                    b'2.0475;8.1647\r\n')
+        data, var_names, var_symbols = measure_data.parse_csv(f)
+        self.assertEqual(data.shape, (3, 2))
+        np.testing.assert_array_equal(data[:, 0], [3.593, 2.4158, 2.0475])
+        self.assertEqual(var_symbols, ['Hs', 'Tp'])
+
+    def test_missing_value_is_not_parsed_as_nan(self):
+        f = BytesIO(b'significant wave height [m];Hs;peak period [s];Tp\n'
+                    b'3.593;7.7756\n'
+                    b'2.4158\n')
+        with self.assertRaises(ValueError):
+            measure_data.parse_csv(f)
+
+    def test_comma_decimal_file_is_rejected(self):
+        file_content = b'significant wave height [m];Hs;peak period [s];Tp\n' \
+                       b'3,5;7,2\n'
+        response = self.client.post(
+            reverse('contour:measure_file_model_add'),
+            {'title' : 'Comma decimals',
+             'measure_file' : SimpleUploadedFile('comma.csv', file_content)})
+        self.assertContains(response, 'Error in the following line (line 2)',
+                            status_code=200)
+        self.assertEqual(MeasureFileModel.objects.count(), 0)
+
+    def test_unreadable_file_is_not_kept(self):
+        test_file_path = os.path.join(self.test_files_path,
+                                      '1yeardata_vanem2012pdf_withHeader.csv')
+        with open(test_file_path, 'rb') as f:
+            uploaded_file = SimpleUploadedFile('unreadable.csv', f.read())
+        with mock.patch.object(measure_data, 'parse_csv',
+                               side_effect=ValueError('Unreadable.')):
+            response = self.client.post(
+                reverse('contour:measure_file_model_add'),
+                {'title' : 'Unreadable', 'measure_file' : uploaded_file})
+        self.assertContains(response, 'could not be read', status_code=200)
+        self.assertEqual(MeasureFileModel.objects.count(), 0)
+
+    def test_invalid_file_reports_first_bad_line(self):
+        file_content = b'significant wave height [m];Hs;peak period [s];Tp\r\n' \
+                       b'3.593;7.7756\r\n' \
+                       b'2.4158;6.5312\r\n' \
+                       b'2.0;abc\r\n' \
+                       b'2.0;x\r\n'
+        uploaded_file = SimpleUploadedFile('invalid.csv', file_content)
+        form = MeasureFileForm({'title' : 'Invalid file'},
+                               {'measure_file' : uploaded_file})
+        self.assertFalse(form.is_valid())
+        self.assertIn('Error in the following line (line 4): 2.0;abc',
+                      form.errors['measure_file'][0])
+
+    def test_long_invalid_line_is_rejected(self):
+        # A long line of digits, which ends with a letter, used to make the
+        # validator backtrack for about a second, see the command
+        # benchmark_csv_validator.
+        file_content = b'significant wave height [m];Hs;peak period [s];Tp\n' \
+                       b'3.593;7.7756\n' + b'1' * 10000 + b'x\n'
+        uploaded_file = SimpleUploadedFile('invalid.csv', file_content)
+        form = MeasureFileForm({'title' : 'Invalid file'},
+                               {'measure_file' : uploaded_file})
+        self.assertFalse(form.is_valid())
+        self.assertIn('Error in the following line (line 3): 111',
+                      form.errors['measure_file'][0])
+
+    def test_each_line_needs_one_number_per_variable(self):
+        for body in (b'3.593;7.7756\n2.4158\n',
+                     b'3.593;7.7756\n2.4158;6.5312;1.0\n',
+                     b'3.593;7.7756\n2,4158;6,5312\n'):
+            uploaded_file = SimpleUploadedFile(
+                'invalid.csv',
+                b'significant wave height [m];Hs;peak period [s];Tp\n' + body)
+            form = MeasureFileForm({'title' : 'Invalid file'},
+                                   {'measure_file' : uploaded_file})
+            self.assertFalse(form.is_valid())
+            self.assertIn('Error in the following line (line 3)',
+                          form.errors['measure_file'][0])
@@ -0,0 +1,105 @@
+from django.test import TestCase, Client, override_settings
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from contour.models import User, MeasureFileModel, ProbabilisticModel, \
+    ComputeJob
+from contour.settings import ITEMS_PER_PAGE
+
+
+@override_settings(STATICFILES_STORAGE=None)
+class OverviewPagesTestCase(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.client.post(reverse('user:authentication'),
+                           {'username' : 'max_mustermann',
+                            'password' : 'Musterpasswort2018'})
+        self.user = User.objects.get(username='max_mustermann')
+        self.other_user = User.objects.get(username='sabine_mustermann')
+
+    def create_items(self, n_items):
+        """
+        Creates n_items measurement files and probabilistic models of the
+        user, the same number of the other user and shares every second
+        item of the other user, which is not shared yet, with the user.
+        """
+        for model, title_field in ((MeasureFileModel, 'title'),
+                                   (ProbabilisticModel, 'collection_name')):
+            model.objects.bulk_create(
+                [model(primary_user=user, **{title_field: 'Item ' + str(i)})
+                 for user in (self.user, self.other_user)
+                 for i in range(n_items)])
+            shared_items = model.objects.filter(
+                primary_user=self.other_user).exclude(
+                secondary_user=self.user).order_by('pk')[::2]
+            through = model.secondary_user.through
+            through.objects.bulk_create(
+                [through(**{model.__name__.lower() + '_id': item.pk,
+                            'user_id': self.user.pk})
+                 for item in shared_items])
+
+    def count_queries(self, url_name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_constant_number_of_queries(self):
+        url_names = ('contour:measure_file_model_overview',
+                     'contour:measure_file_model_select',
+                     'contour:probabilistic_model_overview',
+                     'contour:probabilistic_model_select')
+        self.create_items(2)
+        few_items_queries = {url_name: self.count_queries(url_name)[0]
+                             for url_name in url_names}
+
+        self.create_items(2000)
+        for url_name in url_names:
+            n_queries, response = self.count_queries(url_name)
+            self.assertEqual(n_queries, few_items_queries[url_name])
+            page = response.context['context']
+            self.assertEqual(len(page), ITEMS_PER_PAGE)
+
+        # The overview lists the user's and the shared items, once each.
+        n_queries, response = self.count_queries(
+            'contour:measure_file_model_overview')
+        self.assertEqual(response.context['context'].paginator.count,
+                         2002 + 1002)
+        response = self.client.get(
+            reverse('contour:measure_file_model_overview'), {'page': 'last'})
+        self.assertEqual(response.context['context'].number, 1)
+        response = self.client.get(
+            reverse('contour:measure_file_model_overview'), {'page': 1000})
+        self.assertEqual(response.context['context'].number,
+                         response.context['context'].paginator.num_pages)
+
+    def test_new_fit_lists_one_page_of_files(self):
+        self.create_items(2000)
+        response = self.client.get(reverse(
+            'contour:measure_file_model_new_fit', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, 200)
+        page = response.context['context']
+        self.assertEqual(len(page), ITEMS_PER_PAGE)
+        # The user's and the shared files are listed like on the select page.
+        self.assertEqual(page.paginator.count, 2000 + 1000)
+
+    def test_compute_job_overview_is_paginated(self):
+        measure_file = MeasureFileModel.objects.create(
+            primary_user=self.user, title='Measurements')
+        ComputeJob.objects.create(primary_user=self.user,
+                                  job_type=ComputeJob.FIT,
+                                  measure_file_model=measure_file)
+        few_jobs_queries = self.count_queries(
+            'contour:compute_job_overview')[0]
+
+        ComputeJob.objects.bulk_create(
+            [ComputeJob(primary_user=user, job_type=ComputeJob.FIT,
+                        measure_file_model=measure_file)
+             for user in (self.user, self.other_user) for i in range(200)])
+        n_queries, response = self.count_queries(
+            'contour:compute_job_overview')
+        self.assertEqual(n_queries, few_jobs_queries)
+        page = response.context['context']
+        self.assertEqual(len(page), ITEMS_PER_PAGE)
+        self.assertEqual(page.paginator.count, 201)
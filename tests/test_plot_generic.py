@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase
+import numpy as np
+from contour.plot_generic import alpha_shape, \
+    convert_ndarray_list_to_multipoint
+
+
+class AlphaShapeTestCase(SimpleTestCase):
+
+    def setUp(self):
+        # Points on a 11 x 11 grid, which covers a 10 x 10 square.
+        x, y = np.meshgrid(np.arange(11.0), np.arange(11.0))
+        self.ndarray_list = [x.ravel(), y.ravel()]
+
+    def test_alpha_shape_of_square(self):
+        concave_hull, edge_points = alpha_shape(
+            np.column_stack(self.ndarray_list), alpha=0.1)
+        self.assertAlmostEqual(concave_hull.area, 100)
+        self.assertEqual(edge_points.shape[1:], (2, 2))
+
+    def test_ndarray_and_multipoint_give_same_shape(self):
+        multipoint = convert_ndarray_list_to_multipoint(self.ndarray_list)
+        self.assertEqual(len(multipoint), 121)
+        hull_from_multipoint, _ = alpha_shape(multipoint, alpha=0.1)
+        hull_from_ndarray, _ = alpha_shape(np.column_stack(self.ndarray_list),
+                                           alpha=0.1)
+        self.assertTrue(hull_from_multipoint.equals(hull_from_ndarray))
+
+    def test_alpha_shape_of_few_or_collinear_points(self):
+        concave_hull, edge_points = alpha_shape(
+            np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]), alpha=0.1)
+        self.assertAlmostEqual(concave_hull.area, 0.5)
+        self.assertEqual(edge_points.shape, (3, 2, 2))
+
+        # Points on a line do not enclose an area.
+        concave_hull, edge_points = alpha_shape(
+            np.column_stack([np.arange(10.0), np.arange(10.0)]), alpha=0.1)
+        self.assertEqual(concave_hull.geom_type, 'LineString')
+        self.assertEqual(edge_points.shape, (1, 2, 2))
+
+        concave_hull, edge_points = alpha_shape(np.array([[1.0, 2.0]]),
+                                                alpha=0.1)
+        self.assertEqual(concave_hull.geom_type, 'Point')
+        self.assertEqual(edge_points.shape, (0, 2, 2))
@@ -1,5 +1,8 @@
 from django.test import TestCase, Client
 from django.core.urlresolvers import reverse
+from contour.compute_interface import setup_mul_dist
+from contour.models import ProbabilisticModel, ParameterModel
+from contour.signals import versions_in_batch
 
 
 class ShowProbModelTestCase(TestCase):
@@ -51,3 +54,47 @@ class ShowProbModelTestCase(TestCase):
         self.assertContains(response, '<span class="django-latexify'
                                       ' math inline">f_{H_{s}}(h_{s})=',
                             status_code=200)
+
+    def test_setup_mul_dist_is_cached(self):
+        probabilistic_model = ProbabilisticModel.objects.get(pk=1)
+        mul_dist = setup_mul_dist(probabilistic_model)
+        self.assertEqual(len(mul_dist.distributions), 2)
+
+        # The second call is served from the cache without any query.
+        with self.assertNumQueries(0):
+            self.assertIs(setup_mul_dist(probabilistic_model), mul_dist)
+
+        # Changing a parameter gives the model a new version stamp such that
+        # the distribution is built again.
+        parameter = ParameterModel.objects.filter(
+            distribution__probabilistic_model=probabilistic_model,
+            name='scale').first()
+        parameter.x0 = 3
+        parameter.save()
+        probabilistic_model.refresh_from_db()
+        # One query for the distributions and one for all their parameters.
+        with self.assertNumQueries(2):
+            self.assertIsNot(setup_mul_dist(probabilistic_model), mul_dist)
+
+    def test_version_changes_with_the_distribution_only(self):
+        probabilistic_model = ProbabilisticModel.objects.get(pk=1)
+        version = probabilistic_model.version
+
+        # Renaming or sharing the model keeps its version.
+        probabilistic_model.collection_name = 'Renamed model'
+        probabilistic_model.save()
+        probabilistic_model.refresh_from_db()
+        self.assertEqual(probabilistic_model.version, version)
+
+        # Changing several parameters in a batch renews the version once:
+        # One query per parameter and one for the version.
+        parameters = list(ParameterModel.objects.filter(
+            distribution__probabilistic_model=probabilistic_model,
+            name='scale').select_related('distribution'))
+        with self.assertNumQueries(len(parameters) + 1):
+            with versions_in_batch():
+                for parameter in parameters:
+                    parameter.x0 = 3
+                    parameter.save()
+        probabilistic_model.refresh_from_db()
+        self.assertNotEqual(probabilistic_model.version, version)
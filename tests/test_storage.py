@@ -0,0 +1,169 @@
+from django.test import TestCase, SimpleTestCase, Client, override_settings
+from django.core.urlresolvers import reverse
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+import hashlib
+import os
+import shutil
+import tempfile
+from io import StringIO
+import numpy as np
+from contour import measure_data
+from contour.media_cache import MediaCache
+from contour.models import User, MeasureFileModel
+from contour.storage import LocalMediaStorage, FakeS3Storage
+from user.views import user_storage_space
+
+
+class MediaStorageTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.content = b'0123456789' * 1000
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_reads(self):
+        for storage_class in (LocalMediaStorage, FakeS3Storage):
+            storage = storage_class(location=os.path.join(self.directory,
+                                                          'media'))
+            name = storage.save('file.txt', ContentFile(self.content))
+            self.assertEqual(storage.read_range(name, 5, 10), b'5678901234')
+            chunks = list(storage.iter_chunks(name, chunk_size=4096))
+            self.assertEqual([len(chunk) for chunk in chunks],
+                             [4096, 4096, 1808])
+            self.assertEqual(storage.read_bytes(name), self.content)
+            if storage_class is FakeS3Storage:
+                storage._media_cache = MediaCache(
+                    os.path.join(self.directory, 'cache'), 10**6)
+                self.assertIsNone(storage.local_path(name))
+            cached_path = storage.cached_path(name)
+            with open(cached_path, 'rb') as f:
+                self.assertEqual(f.read(), self.content)
+            if storage_class is FakeS3Storage:
+                self.assertEqual(os.path.dirname(cached_path),
+                                 os.path.join(self.directory, 'cache'))
+            else:
+                self.assertEqual(cached_path, storage.path(name))
+            storage.delete(name)
+            self.assertFalse(os.path.exists(cached_path))
+
+    def test_media_cache(self):
+        media_cache = MediaCache(self.directory, max_bytes=25000)
+        path = media_cache.store('a.txt', [self.content])
+        etag = '"{}"'.format(hashlib.md5(self.content).hexdigest())
+        self.assertEqual(media_cache.lookup('a.txt', etag), path)
+        # A copy with another ETag is outdated.
+        self.assertIsNone(media_cache.lookup('a.txt', '"outdated"'))
+        # A download, which does not match its ETag, is not cached.
+        with self.assertRaises(IOError):
+            media_cache.store('b.txt', [self.content], etag='"corrupt"')
+        self.assertIsNone(media_cache.lookup('b.txt', '"corrupt"'))
+
+        # The least recently used copy is evicted first.
+        os.utime(path, (1, 1))
+        media_cache.store('b.txt', [self.content])
+        os.utime(media_cache.entry_path('b.txt'), (2, 2))
+        self.assertEqual(media_cache.lookup('a.txt', etag), path)
+        content_c = self.content + self.content[:5000]
+        media_cache.store('c.txt', [content_c])
+        self.assertIsNotNone(media_cache.lookup('a.txt', etag))
+        self.assertIsNone(media_cache.lookup('b.txt', etag))
+        self.assertIsNotNone(media_cache.lookup('c.txt', '"{}"'.format(
+            hashlib.md5(content_c).hexdigest())))
+
+
+@override_settings(STATICFILES_STORAGE=None,
+                   DEFAULT_FILE_STORAGE='contour.storage.FakeS3Storage')
+class FakeS3TestCase(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.client.post(reverse('user:authentication'),
+                           {'username' : 'max_mustermann',
+                            'password': 'Musterpasswort2018'})
+
+    def test_measurement_file_on_s3(self):
+        self.assertIsInstance(default_storage, FakeS3Storage)
+        test_files_path = os.path.abspath(os.path.join(os.path.dirname( __file__), r'test_files/'))
+        file_name = '1yeardata_vanem2012pdf_withHeader.csv'
+        with open(os.path.join(test_files_path, file_name), 'rb') as f:
+            test_file_simple_uploaded = SimpleUploadedFile(file_name,
+                                                           f.read())
+        self.client.post(reverse('contour:measure_file_model_add'),
+                         {'title' : file_name,
+                          'measure_file' : test_file_simple_uploaded})
+        measure_file_model = MeasureFileModel.objects.get(pk=1)
+
+        # Without a local path, the copy in the media cache is memory-mapped.
+        data = measure_data.load_data(measure_file_model)
+        self.assertIsInstance(data, np.memmap)
+        self.assertFalse(data.flags.writeable)
+        cached_path = default_storage.media_cache.entry_path(
+            measure_file_model.data_array.name)
+        self.assertEqual(os.path.abspath(data.filename),
+                         os.path.abspath(cached_path))
+        np.testing.assert_array_equal(data[0], [3.593, 7.7756])
+
+        # The header is read with a ranged read.
+        measure_data.store_header(measure_file_model)
+        self.assertEqual(measure_file_model.get_var_symbols(), ['Hs', 'Tp'])
+
+        # Deleting the model deletes its files from the storage.
+        names = [measure_file_model.measure_file.name,
+                 measure_file_model.data_array.name]
+        self.client.get(reverse('contour:measure_file_model_delete',
+                                kwargs={'pk': 1}))
+        for name in names:
+            self.assertFalse(default_storage.exists(name))
+        self.assertFalse(os.path.exists(cached_path))
+
+
+@override_settings(STATICFILES_STORAGE=None)
+class StorageSpaceTestCase(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.client.post(reverse('user:authentication'),
+                           {'username' : 'max_mustermann',
+                            'password': 'Musterpasswort2018'})
+        self.user = User.objects.get(username='max_mustermann')
+
+    def stored_bytes(self, measure_file_model):
+        return sum(getattr(measure_file_model, field_name).size
+                   for field_name in ('measure_file', 'scatter_plot',
+                                      'data_array'))
+
+    def test_storage_space_is_counted(self):
+        test_files_path = os.path.abspath(os.path.join(os.path.dirname( __file__), r'test_files/'))
+        file_name = '1yeardata_vanem2012pdf_withHeader.csv'
+        with open(os.path.join(test_files_path, file_name), 'rb') as f:
+            test_file_simple_uploaded = SimpleUploadedFile(file_name,
+                                                           f.read())
+        self.client.post(reverse('contour:measure_file_model_add'),
+                         {'title' : file_name,
+                          'measure_file' : test_file_simple_uploaded},
+                         follow=True)
+        measure_file_model = MeasureFileModel.objects.get(pk=1)
+        stored_bytes = self.stored_bytes(measure_file_model)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_bytes, stored_bytes)
+
+        # The profile page reads the counted size with one query.
+        with self.assertNumQueries(1):
+            user_storage_space(self.user)
+
+        # The reconciliation corrects a wrong count.
+        User.objects.filter(pk=self.user.pk).update(storage_bytes=0)
+        call_command('reconcile_storage_space', stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_bytes, stored_bytes)
+
+        # Deleting the file counts its size down.
+        self.client.get(reverse('contour:measure_file_model_delete',
+                                kwargs={'pk': 1}))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.storage_bytes, 0)
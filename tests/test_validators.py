@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+from django.core.exceptions import ValidationError
+import numpy as np
+from contour.validators import validate_contour_coordinates
+
+
+class ContourCoordinatesTestCase(SimpleTestCase):
+
+    def setUp(self):
+        # Two paths of a 3-dimensional contour with 20000 points each.
+        self.contour_coordinates = [np.random.RandomState(i).rand(3, 20000)
+                                    for i in range(2)]
+
+    def test_finite_coordinates_are_valid(self):
+        validate_contour_coordinates(self.contour_coordinates)
+        # Lists, e.g. of coordinates loaded from the data base, are valid too.
+        validate_contour_coordinates([path.tolist() for path in
+                                      self.contour_coordinates])
+
+    def test_path_and_point_are_reported(self):
+        self.contour_coordinates[1][2, 1234] = np.nan
+        self.contour_coordinates[1][0, 5678] = np.inf
+        with self.assertRaisesMessage(ValidationError,
+                                      'NaN (path 1, point 1234)'):
+            validate_contour_coordinates(self.contour_coordinates)
+        self.contour_coordinates[1][2, 1234] = 1
+        with self.assertRaisesMessage(ValidationError,
+                                      'inf (Infinity) (path 1, point 5678)'):
+            validate_contour_coordinates(self.contour_coordinates)
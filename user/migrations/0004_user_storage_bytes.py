@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-16 16:31
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def count_storage_bytes(apps, schema_editor):
+    """
+    Counts the media files, which existing users have stored, like the
+    command reconcile_storage_space does.
+    """
+    from contour.signals import stored_bytes_per_user
+
+    User = apps.get_model('user', 'User')
+    storage_bytes = stored_bytes_per_user(
+        [apps.get_model('contour', model_name) for model_name in
+         ('MeasureFileModel', 'PlottedFigure', 'EnvironmentalContour')])
+    for username, size in storage_bytes.items():
+        User.objects.filter(username=username).update(storage_bytes=size)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_auto_20180222_1924'),
+        ('contour', '0020_measurefilemodel_var_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='storage_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(count_storage_bytes, migrations.RunPython.noop),
+    ]
@@ -23,6 +23,9 @@ class User(AbstractUser):
         the organisation (e.g. company or university name) of the user.
     type_of_use : CharField
         for which purpose the user uses ViroCon.
+    storage_bytes : BigIntegerField
+        the number of bytes, which the user's media files occupy. It is
+        updated whenever a media file is saved or deleted.
 
     """
     TYPES = (('academic', 'academic'), ('commercial', 'commercial'))
@@ -44,3 +47,4 @@ class User(AbstractUser):
                                   'unique': "A user with that email already exists."})
     organisation = models.CharField(max_length=100)
     type_of_use = models.CharField(choices=TYPES, max_length=11)
+    storage_bytes = models.BigIntegerField(default=0)
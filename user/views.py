@@ -11,11 +11,7 @@ from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.views import PasswordResetView, PasswordResetDoneView, \
     PasswordResetCompleteView, PasswordResetConfirmView
 
-import os
 import math
-from contour.settings import PATH_MEDIA, PATH_USER_GENERATED
-from viroconweb.settings import USE_S3
-from contour.models import MeasureFileModel, EnvironmentalContour
 
 
 def authentication(request):
@@ -283,25 +279,13 @@ def user_storage_space(user):
     total_size : str
         The total size of the user's used storage space.
     """
-    total_size = 0
-    if USE_S3:
-        measure_models = MeasureFileModel.objects.filter(
-            primary_user=user)
-        for measure_model in measure_models:
-            total_size = total_size + \
-                            measure_model.measure_file.file.size
-        environmental_contours = EnvironmentalContour.objects.filter(
-            primary_user=user)
-        for environmental_contour in environmental_contours:
-            total_size = total_size + \
-                            environmental_contour.latex_report.file.size
-    else:
-        start_path = PATH_MEDIA + PATH_USER_GENERATED + str(user)
-        for dirpath, dirnames, filenames in os.walk(start_path):
-            for f in filenames:
-                fp = os.path.join(dirpath, f)
-                total_size += os.path.getsize(fp)
-    total_size = convert_size(total_size)
+    # The size is counted whenever a media file is saved or deleted (see
+    # contour/signals.py), thus it is read with a single query.
+    total_size = User.objects.filter(pk=user.pk).values_list(
+        'storage_bytes', flat=True).get()
+    # Deleted files, which were saved before the size was counted, could
+    # make it negative until reconcile_storage_space is run.
+    total_size = convert_size(max(total_size, 0))
     return total_size
 
 
@@ -57,12 +57,13 @@ elif RUN_MODE == 'online-dev' or 'production':
     S3_URL = 'https://s3.eu-central-1.amazonaws.com/%s' % AWS_STORAGE_BUCKET_NAME
 
 if USE_S3:
-    DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+    DEFAULT_FILE_STORAGE = 'contour.storage.S3MediaStorage'
     THUMBNAIL_DEFAULT_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
     MEDIA_URL = S3_URL + '/media/'
     # Needed for S3 Frankfurt, see https://github.com/boto/boto/issues/2916
     os.environ['S3_USE_SIGV4'] = 'True'
 else:
+    DEFAULT_FILE_STORAGE = 'contour.storage.LocalMediaStorage'
     MEDIA_URL = '/contour/media/user_generated/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'contour/media/user_generated')